@@ -0,0 +1,77 @@
+"""
+Benchmark: monthly aggregation of a large intraday CSV.
+Writes a synthetic tick-style file, then compares a whole-file pd.read_csv +
+resample (the previous load_local_csv approach) with the chunked reader,
+reporting wall time and peak traced memory for each.
+
+    python -m benchmarks.bench_csv_ingest --rows 5000000
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.data_collection import load_local_csv
+
+def write_synthetic_csv(path, rows, seed=0):
+    """
+    Minute-level prices with a few extra columns, written in blocks so the
+    generator itself stays small.
+    """
+    rng = np.random.default_rng(seed)
+    block = 500_000
+    start = pd.Timestamp("2010-01-01 09:30")
+    level = 100.0
+    with open(path, "w") as f:
+        f.write("TradeDate,Symbol,Price,Volume,Venue\n")
+        for i in range(0, rows, block):
+            n = min(block, rows - i)
+            times = start + pd.to_timedelta(np.arange(i, i + n), unit="min")
+            prices = level + np.cumsum(rng.normal(0, 0.05, n))
+            level = prices[-1]
+            pd.DataFrame({
+                "TradeDate": times.strftime("%Y-%m-%d %H:%M:%S"),
+                "Symbol": "CL",
+                "Price": prices.round(4),
+                "Volume": rng.integers(1, 500, n),
+                "Venue": "NYMEX",
+            }).to_csv(f, header=False, index=False)
+    return path
+
+def read_full(path):
+    df = pd.read_csv(path)
+    df["TradeDate"] = pd.to_datetime(df["TradeDate"])
+    return df.set_index("TradeDate")[["Price"]].resample("M").mean()
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    wall = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, wall, peak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    opts = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_csv(Path(tmp) / "ticks.csv", opts.rows)
+        size_mb = path.stat().st_size / 2**20
+        print(f"{opts.rows:,} rows, {size_mb:.1f} MiB")
+
+        full, t_full, m_full = measure(read_full, path)
+        chunked, t_chunk, m_chunk = measure(load_local_csv, path.name, tmp,
+                                            chunksize=opts.chunksize, date_format="%Y-%m-%d %H:%M:%S")
+        same = np.allclose(full.to_numpy(), chunked.to_numpy(), equal_nan=True)
+        print(f"  full read : {t_full:7.2f} s  peak {m_full / 2**20:8.1f} MiB")
+        print(f"  chunked   : {t_chunk:7.2f} s  peak {m_chunk / 2**20:8.1f} MiB  (chunksize {opts.chunksize:,})")
+        print(f"  results match: {same}")
+
+if __name__ == "__main__":
+    main()
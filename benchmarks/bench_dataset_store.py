@@ -0,0 +1,59 @@
+"""
+Benchmark: Parquet dataset store vs CSV for a wide daily panel.
+Writes the same synthetic panel both ways, then times full reads and a
+selective read (a few columns over a short date range), reporting seconds,
+throughput (MiB/s of the in-memory panel) and size on disk.
+
+    python -m benchmarks.bench_dataset_store --series 50 --years 20
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+from benchmarks.synthetic import daily_panel
+from src.dataset_store import write_panel, read_panel
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+def disk_size(path):
+    return Path(path).stat().st_size
+
+def read_csv_subset(path, columns, start, end):
+    df = pd.read_csv(path, usecols=["Date"] + columns, index_col="Date", parse_dates=["Date"])
+    return df.loc[start:end]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--years", type=float, default=20)
+    parser.add_argument("--subset", type=int, default=3, help="columns in the selective read")
+    opts = parser.parse_args(argv)
+
+    df = daily_panel(opts.series, years=opts.years)
+    mib = df.memory_usage(deep=True).sum() / 2**20
+    cols = list(df.columns[:opts.subset])
+    start, end = df.index[len(df) // 2], df.index[len(df) // 2 + 260]
+    print(f"{opts.series} series x {len(df):,} days ({mib:.1f} MiB in memory)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "panel.csv"
+        _, t_csv_w = timed(df.to_csv, csv_path)
+        _, t_pq_w = timed(write_panel, df, "panel", tmp)
+        _, t_csv_r = timed(pd.read_csv, csv_path, index_col="Date", parse_dates=["Date"])
+        _, t_pq_r = timed(read_panel, "panel", root=tmp)
+        _, t_csv_s = timed(read_csv_subset, csv_path, cols, start, end)
+        _, t_pq_s = timed(read_panel, "panel", columns=cols, start=start, end=end, root=tmp)
+        size_csv, size_pq = disk_size(csv_path), disk_size(Path(tmp) / "panel.parquet")
+
+    print(f"  {'':18s} {'CSV':>16s} {'Parquet':>16s}")
+    print(f"  {'write':18s} {t_csv_w:7.3f} s {mib / t_csv_w:6.0f}/s {t_pq_w:7.3f} s {mib / t_pq_w:6.0f}/s")
+    print(f"  {'read all':18s} {t_csv_r:7.3f} s {mib / t_csv_r:6.0f}/s {t_pq_r:7.3f} s {mib / t_pq_r:6.0f}/s")
+    print(f"  {'read subset':18s} {t_csv_s:7.3f} s {'':8s} {t_pq_s:7.3f} s")
+    print(f"  {'size on disk':18s} {size_csv / 2**20:7.1f} MiB {'':4s} {size_pq / 2**20:7.1f} MiB")
+
+if __name__ == "__main__":
+    main()
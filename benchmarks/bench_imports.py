@@ -0,0 +1,68 @@
+"""
+Import-time benchmark for the CLI.
+Runs `python -X importtime main.py <args>` in a fresh interpreter, prints the
+slowest top-level imports and fails (exit 1) if a heavy library is imported or
+the total import time exceeds the budget.
+
+    python -m benchmarks.bench_imports                 # checks `main.py --help`
+    python -m benchmarks.bench_imports --args "report --help"
+"""
+import argparse
+import re
+import shlex
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# must never be imported just to parse the command line
+HEAVY = ["yfinance", "statsmodels", "sklearn", "seaborn", "matplotlib", "scipy", "pandas"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def import_profile(args):
+    """
+    [(module, self_us, cumulative_us, depth)] for `main.py args`, in import order.
+    """
+    cmd = [sys.executable, "-X", "importtime", str(ROOT / "main.py")] + list(args)
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+def summarize(rows, top=10):
+    top_level = [r for r in rows if r[3] == 0]
+    total = sum(r[2] for r in top_level) / 1e6
+    slowest = sorted(top_level, key=lambda r: r[2], reverse=True)[:top]
+    heavy = sorted({r[0].split(".")[0] for r in rows} & set(HEAVY))
+    return total, slowest, heavy
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--args", default="--help", help="arguments passed to main.py (one string)")
+    parser.add_argument("--budget", type=float, default=0.5, help="max total import seconds")
+    parser.add_argument("--allow", nargs="*", default=[], help="heavy modules allowed for these args")
+    opts = parser.parse_args(argv)
+
+    args = shlex.split(opts.args)
+    total, slowest, heavy = summarize(import_profile(args))
+    print(f"main.py {' '.join(args)}: {total:.3f}s total import time")
+    for mod, _, cum, _ in slowest:
+        print(f"  {cum / 1e3:9.1f} ms  {mod}")
+
+    failures = []
+    unexpected = [m for m in heavy if m not in opts.allow]
+    if unexpected:
+        failures.append(f"heavy modules imported: {', '.join(unexpected)}")
+    if total > opts.budget:
+        failures.append(f"import time {total:.3f}s exceeds budget {opts.budget:.3f}s")
+    for f in failures:
+        print("FAIL:", f)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Benchmark: fit time, predict time, model size and holdout error of each ML backend.
+Builds the lag matrix of a synthetic monthly panel once and fits every backend
+(src/ml_backends.py, settings from config.ML_PARAMS) on the same targets,
+reporting the best of --repeat runs per target, summed over targets.
+
+    python -m benchmarks.bench_ml_backends --series 50 --months 240 --targets 5
+"""
+import argparse
+import pickle
+import time
+import warnings
+import numpy as np
+from benchmarks.synthetic import monthly_panel
+from src.features import panel_lags
+from src.ml_backends import BACKENDS, make_model
+from config import LAGS
+
+warnings.filterwarnings("ignore")
+
+def best_of(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return out, best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=50, help="panel width (features = series x lags)")
+    parser.add_argument("--months", type=int, default=240)
+    parser.add_argument("--targets", type=int, default=5, help="columns fitted per backend")
+    parser.add_argument("--holdout", type=int, default=12)
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--jobs", type=int, default=None, help="threads per fit (default: ML_PARAMS)")
+    parser.add_argument("--repeat", type=int, default=1)
+    opts = parser.parse_args(argv)
+
+    df = monthly_panel(opts.series, opts.months)
+    X = panel_lags(df.to_numpy(), LAGS)[LAGS:]
+    Y = df.to_numpy()[LAGS:]
+    X_train, X_test = X[:-opts.holdout], X[-opts.holdout:]
+    print(f"{opts.series} series x {LAGS} lags = {X.shape[1]} features, {len(X_train)} training rows, "
+          f"{opts.targets} targets")
+    print(f"  {'backend':8s} {'fit s':>9s} {'predict ms':>11s} {'size KiB':>10s} {'rmse':>9s}")
+    for name in opts.backends:
+        fit_s = pred_s = size = sq = 0.0
+        for j in range(min(opts.targets, opts.series)):
+            y_train, y_test = Y[:-opts.holdout, j], Y[-opts.holdout:, j]
+            model, t_fit = best_of(lambda: make_model(name, n_jobs=opts.jobs).fit(X_train, y_train), opts.repeat)
+            preds, t_pred = best_of(lambda: model.predict(X_test), opts.repeat)
+            fit_s += t_fit
+            pred_s += t_pred
+            size += len(pickle.dumps(model))
+            sq += float(np.mean((preds - y_test) ** 2))
+        n = min(opts.targets, opts.series)
+        print(f"  {name:8s} {fit_s:9.3f} {pred_s * 1000:11.2f} {size / n / 1024:10.1f} {np.sqrt(sq / n):9.3f}")
+
+if __name__ == "__main__":
+    main()
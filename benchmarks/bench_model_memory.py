@@ -0,0 +1,53 @@
+"""
+Benchmark: memory retained by run_modeling_pipeline results.
+Fits a synthetic panel once with compact result records and once with
+keep_models=True, each in a fresh interpreter, and reports peak RSS and the
+pickled size of the returned results.
+
+    python -m benchmarks.bench_model_memory --series 20
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHILD = r"""
+import json, pickle, resource, sys, tempfile, warnings
+warnings.filterwarnings("ignore")
+import numpy as np, pandas as pd
+from src.modeling import run_modeling_pipeline
+n_series, n_months, keep = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3] == "1"
+rng = np.random.default_rng(0)
+idx = pd.date_range("2000-01-31", periods=n_months, freq="M")
+df = pd.DataFrame(100 + rng.normal(size=(n_months, n_series)).cumsum(axis=0), index=idx,
+                  columns=[f"S{i:03d}" for i in range(n_series)])
+# the parameter store lives in the temp dir too: every run is a cold fit and outputs/models is untouched
+with tempfile.TemporaryDirectory() as tmp:
+    res = run_modeling_pipeline(df, forecast_periods=12, out_dir=tmp, n_jobs=1, plots=False, keep_models=keep,
+                                store_dir=tmp)
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(json.dumps({"peak_rss": rss, "pickled": len(pickle.dumps(res))}))
+"""
+
+def run(series, months, keep):
+    proc = subprocess.run([sys.executable, "-c", CHILD, str(series), str(months), "1" if keep else "0"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--months", type=int, default=144)
+    opts = parser.parse_args(argv)
+
+    print(f"{opts.series} series x {opts.months} months")
+    for label, keep in (("compact records", False), ("keep_models=True", True)):
+        r = run(opts.series, opts.months, keep)
+        print(f"  {label:17s}: peak RSS {r['peak_rss'] / 2**20:8.1f} MiB, "
+              f"pickled results {r['pickled'] / 2**20:8.2f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark: wall time and peak memory of each pipeline stage on synthetic data.
+Runs offline on generated panels (benchmarks/synthetic.py), writes the results
+to JSON, and can compare a run against an earlier JSON file.
+
+    python -m benchmarks.bench_pipeline --series 20 --months 240 --out bench.json
+    python -m benchmarks.bench_pipeline --series 20 --months 240 --compare bench.json
+
+Wall time is the best of --repeat untraced runs; peak memory comes from one
+extra run under tracemalloc (Python allocations in this process only, so
+modeling runs serially by default: --jobs 1).
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import daily_panel, monthly_panel
+
+warnings.filterwarnings("ignore")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+STAGES = ["prepare", "stats", "model", "cognitive", "eda", "report"]
+
+def _prepare(ctx, tmp):
+    from src.data_prep import prepare_dataset
+    return prepare_dataset(ctx["daily"])
+
+def _stats(ctx, tmp):
+    from src.stats_analysis import run_stats
+    # empty lag cache each time, so every run includes the lag search
+    return run_stats(ctx["monthly"], out_dir=tmp, cache_dir=tempfile.mkdtemp(dir=tmp))
+
+def _model(ctx, tmp):
+    from src.modeling import run_modeling_pipeline
+    # fresh parameter store each time, so every run is a cold fit
+    store = tempfile.mkdtemp(dir=tmp)
+    return run_modeling_pipeline(ctx["monthly"], forecast_periods=12, out_dir=tmp, n_jobs=ctx["jobs"],
+                                 plots=False, store_dir=store, adf=ctx["stats"]["adf"])
+
+def _cognitive(ctx, tmp):
+    from src.cognitive_model import evaluate_signals
+    return evaluate_signals(ctx["monthly"])
+
+def _eda(ctx, tmp):
+    from src.eda import run_eda
+    return run_eda(ctx["monthly"], out_dir=tmp)
+
+def _report(ctx, tmp):
+    from src.reporting import generate_report
+    return generate_report(ctx["monthly"], ctx["stats"], ctx["model"], ctx["cognitive"], out_dir=tmp)
+
+RUNNERS = {"prepare": _prepare, "stats": _stats, "model": _model,
+           "cognitive": _cognitive, "eda": _eda, "report": _report}
+
+# stages whose output later stages read
+DEPENDS = {"model": ["stats"], "report": ["stats", "model", "cognitive"]}
+
+def measure(fn, ctx, repeat):
+    """
+    (output, best wall seconds, CPU seconds of that run, peak traced bytes).
+    """
+    best, cpu, out = None, None, None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            t0, c0 = time.perf_counter(), time.process_time()
+            out = fn(ctx, tmp)
+            wall, used = time.perf_counter() - t0, time.process_time() - c0
+        if best is None or wall < best:
+            best, cpu = wall, used
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        fn(ctx, tmp)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return out, best, cpu, peak
+
+def _git_commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return proc.stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(stages, series, months, years, jobs, repeat, seed=0):
+    ctx = {
+        "daily": daily_panel(series, years=years, seed=seed),
+        "monthly": monthly_panel(series, months, seed=seed),
+        "jobs": jobs,
+    }
+    # run prerequisites once (unmeasured) when only later stages were asked for
+    todo = []
+    for st in stages:
+        for dep in DEPENDS.get(st, []) + [st]:
+            if dep not in todo:
+                todo.append(dep)
+    results = {}
+    for st in STAGES:
+        if st not in todo:
+            continue
+        if st not in stages:
+            with tempfile.TemporaryDirectory() as tmp:
+                ctx[st] = RUNNERS[st](ctx, tmp)
+            continue
+        out, wall, cpu, peak = measure(RUNNERS[st], ctx, repeat)
+        ctx[st] = out
+        results[st] = {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4), "peak_bytes": int(peak)}
+        print(f"  {st:10s} wall {wall:8.3f} s  cpu {cpu:8.3f} s  peak {peak / 2**20:8.1f} MiB")
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__},
+        "params": {"series": series, "months": months, "years": years, "jobs": jobs, "repeat": repeat,
+                   "seed": seed},
+        "stages": results,
+    }
+
+def compare(current, baseline, threshold):
+    """
+    Print per-stage ratios (current / baseline); returns the stages slower than 1 + threshold.
+    """
+    if current["params"] != baseline["params"]:
+        print("Warning: parameters differ from the baseline:", baseline["params"])
+    print(f"Compared with {baseline.get('commit') or '?'} ({baseline.get('created')}):")
+    slower = []
+    for st, cur in current["stages"].items():
+        old = baseline["stages"].get(st)
+        if old is None:
+            continue
+        t_ratio = cur["wall_s"] / old["wall_s"] if old["wall_s"] else float("nan")
+        m_ratio = cur["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("nan")
+        flag = "  <-- slower" if t_ratio > 1 + threshold else ""
+        print(f"  {st:10s} time x{t_ratio:5.2f}  memory x{m_ratio:5.2f}{flag}")
+        if flag:
+            slower.append(st)
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=9, help="panel width")
+    parser.add_argument("--months", type=int, default=144, help="monthly panel length")
+    parser.add_argument("--years", type=float, default=12, help="daily panel length (prepare stage)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for modeling")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    opts = parser.parse_args(argv)
+
+    print(f"{opts.series} series, {opts.months} months / {opts.years:g} years daily")
+    res = run_suite(opts.stages, opts.series, opts.months, opts.years, opts.jobs, opts.repeat, opts.seed)
+    if opts.out:
+        opts.out.write_text(json.dumps(res, indent=2))
+        print("Results written to:", opts.out)
+    if opts.compare:
+        slower = compare(res, json.loads(opts.compare.read_text()), opts.threshold)
+        if slower:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
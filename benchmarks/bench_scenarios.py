@@ -0,0 +1,60 @@
+"""
+Benchmark: Monte Carlo scenario throughput and peak memory.
+Gives every series of a synthetic monthly panel an ARIMA(1,1,0)-style
+ForecastResult (random AR coefficient, residuals from the data) instead of
+fitting SARIMA, then times run_scenarios for each chunk size. Peak memory is
+tracked with tracemalloc and should follow the chunk size, not --paths.
+
+    python -m benchmarks.bench_scenarios --series 200 --paths 10000 --chunks 250 1000 4000
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import monthly_panel
+from src.modeling import ForecastResult
+from src.scenarios import run_scenarios
+
+def synthetic_results(df, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(df.index[-1], periods=periods + 1, freq="M")[1:]
+    out = {}
+    for col in df.columns:
+        resid = df[col].diff().dropna()
+        phi = rng.uniform(0, 0.6)
+        # psi weights of (1 - phi L)(1 - L) x_t = e_t
+        impulse = np.cumsum(phi ** np.arange(periods))
+        forecast = pd.Series(df[col].iloc[-1] + np.cumsum(np.full(periods, resid.mean())), index=index)
+        out[col] = ForecastResult(aic=None, forecast=forecast, conf=None,
+                                  params=pd.Series({"sigma2": float(resid.var())}), impulse=impulse, resid=resid)
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--months", type=int, default=240)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[250, 1000, 4000])
+    parser.add_argument("--method", choices=["gaussian", "bootstrap"], default="gaussian")
+    opts = parser.parse_args(argv)
+
+    df = monthly_panel(opts.series, opts.months)
+    model_res = {"sarima": synthetic_results(df, opts.periods)}
+    full = opts.paths * opts.periods * opts.series * 8 / 2 ** 20
+    print(f"{opts.paths:,} paths x {opts.series} series x {opts.periods} periods "
+          f"({full:,.0f} MiB if held at once)")
+    run_scenarios(df, model_res, n_paths=10, method=opts.method)   # warm-up: imports stay out of the peak
+    print(f"  {'chunk':>7s} {'seconds':>9s} {'paths/s':>10s} {'peak MiB':>9s}")
+    for chunk in opts.chunks:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        run_scenarios(df, model_res, n_paths=opts.paths, chunk=chunk, method=opts.method)
+        t = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        print(f"  {chunk:7d} {t:9.2f} {opts.paths / t:10,.0f} {peak:9.1f}")
+
+if __name__ == "__main__":
+    main()
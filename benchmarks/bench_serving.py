@@ -0,0 +1,128 @@
+"""
+Benchmark: request latency and throughput of the forecast service.
+Writes a synthetic analysis summary (--series indicators, --horizon points per
+model, all Granger pairs), serves it on a free local port and drives it from
+--clients threads over keep-alive connections with a mix of forecast, stats
+and Granger queries. Then rewrites the summary and times how long the server
+takes to pick up the new run.
+
+    python -m benchmarks.bench_serving --series 200 --clients 8 --requests 2000
+"""
+import argparse
+import http.client
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.reporting import write_summary
+from src.serving import make_server
+
+def synthetic_summary(n_series, horizon, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"S{i:03d}" for i in range(n_series)]
+    dates = pd.date_range("2025-01-31", periods=horizon, freq="M").strftime("%Y-%m-%d")
+    def points():
+        mean = 100 + rng.normal(size=horizon).cumsum()
+        half = np.linspace(1, 5, horizon)
+        return [{"horizon": h + 1, "date": d, "mean": float(m), "lower": float(m - w), "upper": float(m + w)}
+                for h, (d, m, w) in enumerate(zip(dates, mean, half))]
+    return {
+        "generated": datetime.now().isoformat(timespec="microseconds"),
+        "indicators": names,
+        "forecasts": {n: {"sarima": {"order": [1, 1, 1], "points": points()}, "var": {"order": 2, "points": points()}}
+                      for n in names},
+        "ml": {n: {"mse": float(rng.random())} for n in names},
+        "adf": {n: {"adf_stat": float(rng.normal()), "pvalue": float(rng.random()), "d": 1} for n in names},
+        "granger": [{"cause": a, "effect": b, "pvalue": float(rng.random())} for a in names for b in names if a != b],
+        "cognitive": {n: {"score": float(rng.random()), "label": "structural"} for n in names},
+    }
+
+def routes(names, horizon, n, seed):
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        name, kind = names[rng.integers(len(names))], rng.random()
+        if kind < 0.6:
+            out.append(f"/forecast/{name}/{rng.integers(1, horizon + 1)}")
+        elif kind < 0.8:
+            out.append(f"/forecast/{name}")
+        elif kind < 0.95:
+            out.append(f"/stats/{name}")
+        else:
+            out.append(f"/granger?cause={name}")
+    return out
+
+def client(port, paths, latencies):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for path in paths:
+        t0 = time.perf_counter()
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append(time.perf_counter() - t0)
+        if resp.status != 200:
+            raise RuntimeError(f"{path}: HTTP {resp.status}")
+    conn.close()
+
+def get_json(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path)
+    out = json.loads(conn.getresponse().read())
+    conn.close()
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--horizon", type=int, default=12)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per client")
+    parser.add_argument("--reload-interval", type=float, default=0.2)
+    opts = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "analysis_summary.json"
+        summary = synthetic_summary(opts.series, opts.horizon)
+        write_summary(path, summary)
+        t0 = time.perf_counter()
+        server = make_server(path, host="127.0.0.1", port=0, reload_interval=opts.reload_interval)
+        load_s = time.perf_counter() - t0
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"{opts.series} series x {opts.horizon} horizons, {path.stat().st_size / 2**20:.1f} MiB summary, "
+              f"index built in {load_s * 1000:.0f} ms")
+        try:
+            names = summary["indicators"]
+            per_client = [routes(names, opts.horizon, opts.requests, seed) for seed in range(opts.clients)]
+            lists = [[] for _ in range(opts.clients)]
+            threads = [threading.Thread(target=client, args=(port, p, l)) for p, l in zip(per_client, lists)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall = time.perf_counter() - t0
+            lat = np.concatenate([np.asarray(l) for l in lists]) * 1000
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            print(f"  {len(lat):,} requests from {opts.clients} clients in {wall:.2f} s: {len(lat) / wall:,.0f} req/s")
+            print(f"  latency ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {lat.max():.2f}")
+
+            # hot reload: a new run replaces the file; time until /health reports it
+            time.sleep(0.01)
+            fresh = synthetic_summary(opts.series, opts.horizon, seed=1)
+            t0 = time.perf_counter()
+            write_summary(path, fresh)
+            while get_json(port, "/health")["generated"] != fresh["generated"]:
+                time.sleep(0.005)
+            print(f"  new run served {(time.perf_counter() - t0) * 1000:.0f} ms after the summary was written "
+                  f"(reload interval {opts.reload_interval:g} s)")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    main()
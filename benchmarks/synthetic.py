@@ -0,0 +1,40 @@
+"""
+Synthetic indicator panels for the benchmarks (no network access needed).
+Series are log-normal random walks with drift, a seasonal component and a
+shared market factor, so correlation, Granger and SARIMA code paths see
+realistic-looking data. Optional gaps exercise the fill / NaN handling.
+"""
+import numpy as np
+import pandas as pd
+
+def _panel(index, n_series, period, seed, gap_frac, prefix):
+    rng = np.random.default_rng(seed)
+    T = len(index)
+    market = rng.normal(0, 0.01, T)
+    beta = rng.uniform(0, 1.5, n_series)
+    drift = rng.normal(0.0002, 0.0005, n_series)
+    noise = rng.normal(0, 0.01, (T, n_series))
+    log_level = np.cumsum(drift + market[:, None] * beta + noise, axis=0)
+    phase = rng.uniform(0, 2 * np.pi, n_series)
+    season = 0.02 * np.sin(2 * np.pi * np.arange(T)[:, None] / period + phase)
+    values = rng.uniform(20, 200, n_series) * np.exp(log_level + season)
+    if gap_frac:
+        values[rng.random(values.shape) < gap_frac] = np.nan
+    columns = [f"{prefix}{i:03d}" for i in range(n_series)]
+    df = pd.DataFrame(values, index=index, columns=columns)
+    df.index.name = "Date"
+    return df
+
+def daily_panel(n_series=9, years=12, start="2013-01-01", seed=0, gap_frac=0.01):
+    """
+    Business-day prices shaped like collect_all_indicators() output.
+    """
+    index = pd.bdate_range(start, periods=int(years * 261))
+    return _panel(index, n_series, 261, seed, gap_frac, "D")
+
+def monthly_panel(n_series=9, n_months=144, start="2013-01-31", seed=0, gap_frac=0.0):
+    """
+    Month-end panel shaped like prepare_dataset() output.
+    """
+    index = pd.date_range(start, periods=n_months, freq="M")
+    return _panel(index, n_series, 12, seed, gap_frac, "M")
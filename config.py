@@ -17,10 +17,13 @@ PROCESSED_DIR = DATA_DIR / "processed"
 OUTPUT_DIR = BASE_DIR / "outputs"
 PLOTS_DIR = OUTPUT_DIR / "plots"
 REPORT_DIR = OUTPUT_DIR / "report"
+CHECKPOINT_DIR = OUTPUT_DIR / "checkpoints"
+MODEL_STORE_DIR = OUTPUT_DIR / "models"
 
-# Create folders if missing
-for p in [DATA_DIR, RAW_DIR, PROCESSED_DIR, OUTPUT_DIR, PLOTS_DIR, REPORT_DIR]:
-    p.mkdir(parents=True, exist_ok=True)
+def ensure_dirs():
+    """Create folders if missing (called by the CLI, not at import time)."""
+    for p in [DATA_DIR, RAW_DIR, PROCESSED_DIR, OUTPUT_DIR, PLOTS_DIR, REPORT_DIR, CHECKPOINT_DIR, MODEL_STORE_DIR]:
+        p.mkdir(parents=True, exist_ok=True)
 
 # -------------------------
 # PROJECT SCOPE
@@ -29,8 +32,45 @@ GEO_SCOPE = "US"
 TIMEFRAME_START = "2013-01-01"
 TIMEFRAME_END   = "2024-12-31"
 FREQ = "M"
+# Element type of the prepared panel (src/panel.py): "float32" halves its memory,
+# "float64" keeps full precision. Model code converts to float64 where it needs to.
+PANEL_DTYPE = "float32"
 FORECAST_PERIODS = 12  # forecast next 12 months
 
+# Daily Yahoo prices are cached under RAW_DIR/yahoo_cache; repeat runs only
+# download dates that are not on disk yet. Set False to always refetch.
+YAHOO_CACHE = True
+
+# Write the collected ("raw") and prepared ("prepared") panels to
+# PROCESSED_DIR/<name>.parquet, one column per indicator and one row group
+# per year (src/dataset_store.py; read back with read_panel).
+DATASET_STORE = True
+
+# The collect stage is not checkpointed: every command fetches (cache-aware)
+# before reusing downstream checkpoints. OFFLINE (main.py --offline) skips the
+# fetch and reuses the last collected panel, PROCESSED_DIR/raw.parquet.
+OFFLINE = False
+
+# Concurrent collection (src/data_collection.py). Network fetches run on a
+# thread pool with at most `concurrency[source]` requests per source in flight;
+# local CSVs are parsed alongside them. Yahoo tickers go out in batches of
+# `yahoo_chunk` (yf.download keeps module-level state, so keep yahoo at 1 unless
+# an injected downloader is thread-safe). Failed requests are retried `retries`
+# times with exponential backoff starting at `backoff` seconds; `timeout` limits
+# each request and `deadline` the whole collection (seconds).
+COLLECTION = {
+    "concurrency": {"yahoo": 1, "fred": 4, "csv": 2},
+    "yahoo_chunk": 25,
+    "retries": 3,
+    "backoff": 1.0,
+    "timeout": 30,
+    "deadline": 600,
+}
+
+# Rows per chunk when aggregating local CSV indicators to monthly means.
+# CSV indicators may also set "date_format" (e.g. "%Y-%m-%d %H:%M:%S").
+CSV_CHUNKSIZE = 500_000
+
 # -------------------------
 # INDICATORS — MACRO + MARKET (Yahoo)
 # -------------------------
@@ -52,6 +92,37 @@ INDICATORS = [
     {"name": "GOLD",          "type": "yahoo", "ticker": "GC=F"}         # gold futures
 ]
 
+# -------------------------
+# UNIVERSES (python main.py batch)
+# -------------------------
+# Several universes in one process: tickers shared between universes are
+# downloaded once, identical prepared series are tested and fitted once, and
+# all fits share one worker pool. Each universe gets BATCH_DIR/<name>/.
+# "start" / "end" default to the TIMEFRAME above. `python main.py batch
+# --universes FILE` reads the same list from a JSON file instead.
+UNIVERSES = [
+    {"name": "US", "geo_scope": GEO_SCOPE, "indicators": INDICATORS},
+    {"name": "EU", "geo_scope": "EU", "indicators": [
+        {"name": "EUROSTOXX50", "type": "yahoo", "ticker": "^STOXX50E"},
+        {"name": "DAX",         "type": "yahoo", "ticker": "^GDAXI"},
+        {"name": "CAC40",       "type": "yahoo", "ticker": "^FCHI"},
+        {"name": "FTSE100",     "type": "yahoo", "ticker": "^FTSE"},
+        {"name": "EURUSD",      "type": "yahoo", "ticker": "EURUSD=X"},
+        {"name": "VIX",         "type": "yahoo", "ticker": "^VIX"},
+        {"name": "CRUDE_OIL",   "type": "yahoo", "ticker": "CL=F"},
+        {"name": "GOLD",        "type": "yahoo", "ticker": "GC=F"},
+    ]},
+    {"name": "APAC", "geo_scope": "APAC", "indicators": [
+        {"name": "NIKKEI225",   "type": "yahoo", "ticker": "^N225"},
+        {"name": "HANGSENG",    "type": "yahoo", "ticker": "^HSI"},
+        {"name": "ASX200",      "type": "yahoo", "ticker": "^AXJO"},
+        {"name": "USDJPY",      "type": "yahoo", "ticker": "JPY=X"},
+        {"name": "SP500",       "type": "yahoo", "ticker": "^GSPC"},
+        {"name": "CRUDE_OIL",   "type": "yahoo", "ticker": "CL=F"},
+        {"name": "GOLD",        "type": "yahoo", "ticker": "GC=F"},
+    ]},
+]
+
 # -------------------------
 # MODEL CONFIG
 # -------------------------
@@ -61,8 +132,122 @@ SARIMA_DEFAULTS = {
     "enforce_stationarity": False
 }
 
+# Order selection: "fixed" uses SARIMA_DEFAULTS for every series, "auto" searches
+# the SARIMA_SEARCH grid per series (d from the ADF test at ADF_ALPHA; D and s
+# from SARIMA_DEFAULTS). Candidates get prune_iter optimiser iterations first and
+# only the best `keep` are fitted to convergence. Selections are cached per series
+# and data fingerprint in MODEL_STORE_DIR.
+SARIMA_ORDER_SELECTION = "fixed"
+SARIMA_SEARCH = {
+    "max_p": 2, "max_q": 2, "max_P": 1, "max_Q": 1,
+    "criterion": "aic",
+    "prune_iter": 15,
+    "keep": 3,
+    "n_jobs": None,  # processes for the search when models are fitted serially
+}
+ADF_ALPHA = 0.05
+
+# Correlation engine (src/correlation.py). Correlations are computed in
+# `block` x `block` column blocks; the report lists the `top_k` strongest pairs
+# and lead/lag relations up to `max_lag` periods. The full matrix is kept (and
+# drawn) only up to `full_max` series; heatmap cells are annotated up to `annot_max`.
+CORRELATION = {"top_k": 3, "max_lag": 3, "block": 256, "full_max": 200, "annot_max": 30}
+
+# Stationarity tests in run_stats (src/stationarity.py).
+# mode "aic": search the ADF lag by AIC, skipped for series whose data and
+# cached lag are unchanged; "fixed": never search (last cached lag, else
+# fixed_lag, else (nobs-1)^(1/3)). kpss=True also runs KPSS, and then d=0
+# needs both tests to agree. n_jobs: worker processes (None = one per core).
+STATIONARITY = {"mode": "aic", "kpss": False, "fixed_lag": None, "alpha": ADF_ALPHA, "n_jobs": None}
+
+# Incremental SARIMA refits: fitted parameters are stored per indicator in
+# MODEL_STORE_DIR and reused when new months are appended.
+#   "filter": apply the stored parameters to the new data (no optimisation)
+#   "warm":   re-optimise starting from the stored parameters
+# A cold refit runs every SARIMA_REFIT_EVERY updates, or when the new months'
+# log-likelihood falls SARIMA_DRIFT_Z standard deviations below the fit's.
+SARIMA_INCREMENTAL = True
+SARIMA_UPDATE_MODE = "filter"
+SARIMA_REFIT_EVERY = 12
+SARIMA_DRIFT_Z = 3.0
+
 LAGS = 6
-ML_MODEL = "rf"  # "rf" or "lr"
+ML_MODEL = "rf"  # any backend in src/ml_backends.py: "rf", "hgb", "ridge" or "lr"
+
+# Estimator settings per ML backend. n_jobs is the thread count for fits that run
+# serially (MODEL_WORKERS=1, backtest n_jobs=1); fits already spread over worker
+# processes use one thread each. Depth and leaf limits keep the forests small.
+ML_PARAMS = {
+    "rf": {"n_estimators": 200, "max_depth": 12, "min_samples_leaf": 2, "max_features": 1.0,
+           "random_state": 42, "n_jobs": -1},
+    "hgb": {"max_iter": 100, "learning_rate": 0.1, "max_leaf_nodes": 15, "min_samples_leaf": 5,
+            "l2_regularization": 0.0, "early_stopping": False, "random_state": 42},
+    "ridge": {"alpha": 1.0},
+    "lr": {},
+}
+
+# Joint VAR over the whole panel (src/var_model.py), fitted in the model stage.
+# The lag order p <= maxlags minimises `ic` ("aic", "bic" or "hqic").
+# difference: "auto" models first differences when any series has d=1 in the
+# stationarity results (True / False to force); forecasts are integrated back
+# to levels. Bands are at `alpha`; orthogonalised impulse responses (Cholesky,
+# column order) run `irf_horizon` periods.
+VAR = {"enabled": True, "maxlags": 6, "ic": "aic", "difference": "auto", "alpha": 0.05, "irf_horizon": 24}
+
+# Monte Carlo scenarios (python main.py scenarios, src/scenarios.py): n_paths
+# joint paths per indicator from the SARIMA fits, simulated `chunk` paths at a
+# time. method: "gaussian" draws shocks with the (shrunk) correlation of the
+# models' residuals, "bootstrap" resamples whole dates of those residuals.
+# thresholds are changes vs the last observation (-0.1 = 10% below) whose
+# crossing probabilities go to scenario_tails.csv; downside / upside scenarios
+# average the tail_share most extreme joint paths; bins sets the quantile
+# resolution.
+SCENARIOS = {"n_paths": 10000, "chunk": 1000, "method": "gaussian", "quantiles": [0.05, 0.25, 0.5, 0.75, 0.95],
+             "thresholds": [-0.2, -0.1, 0.1, 0.2], "tail_share": 0.05, "bins": 512, "seed": 0}
+SCENARIO_DIR = OUTPUT_DIR / "scenarios"
+
+# Worker processes for per-indicator SARIMA / ML fits.
+# None = one per CPU core, 1 = fit serially in the main process.
+MODEL_WORKERS = None
+
+# Keep full SARIMAXResults / fitted ML estimators in the modeling results.
+# Off by default: the report only needs AIC, forecasts, intervals and MSE.
+KEEP_MODEL_OBJECTS = False
+
+# Rolling-origin backtest (python main.py backtest): forecast `horizon` steps
+# from every `step`-th origin once `min_train` lag rows are available.
+# SARIMA parameters are re-estimated every `sarima_refit_every` origins.
+# n_jobs: worker processes (None = one per CPU core, 1 = serial).
+BACKTEST = {"horizon": 3, "min_train": 60, "step": 1, "sarima_refit_every": 12, "n_jobs": None}
+BACKTEST_DIR = OUTPUT_DIR / "backtest"
+BATCH_DIR = OUTPUT_DIR / "universes"
+
+# -------------------------
+# PLOTTING
+# -------------------------
+PLOT_MODE = "all"     # "all", "summary" (skip per-series figures) or "none"
+PLOT_DPI = 150
+PLOT_FORMAT = "png"
+# Worker processes for rendering figures; None = one per CPU core, 1 = render inline.
+PLOT_WORKERS = None
+
+# -------------------------
+# SERVING (python main.py serve)
+# -------------------------
+# Forecasts, bands and test results from REPORT_DIR/analysis_summary.json over
+# HTTP/JSON; the file is re-read when it changes, checked at most every
+# reload_interval seconds.
+SERVING = {"host": "127.0.0.1", "port": 8765, "reload_interval": 1.0}
+
+# -------------------------
+# INSTRUMENTATION (python main.py --instrument / --profile)
+# -------------------------
+# Timings, trace.json and per-stage .prof files are written here.
+PROFILE_DIR = OUTPUT_DIR / "profile"
+# Trace peak memory with tracemalloc (slows numeric code noticeably).
+INSTRUMENT_MEMORY = True
 
 # Not used (no FRED)
 FRED_API_ENVVAR = "FRED_API_KEY"
+# FRED API root; point it at a local server to test collection offline.
+FRED_URL = "https://api.stlouisfed.org/fred"
@@ -1,53 +1,243 @@
-# main.py
 """
 Orchestrator for macro_analysis pipeline.
 Runs: data collection -> prep -> eda -> stats -> modeling -> cognitive -> reporting
+Stages whose inputs, config and code are unchanged are skipped (see src/pipeline.py).
+Collection always runs (it only fetches what its caches lack); --offline reuses
+the last collected panel instead, so no source is contacted.
+
+Usage: python main.py [collect|prepare|stats|model|report|backtest|scenarios|all] [options]
+       python main.py batch [--universes FILE] [--jobs N]
+       python main.py serve [--host HOST] [--port PORT]
+Heavy libraries (yfinance, statsmodels, sklearn, matplotlib, ...) are imported
+inside the stage that needs them, so --help and checkpointed reruns start fast.
 """
-import os
+import argparse
 from pathlib import Path
+from contextlib import nullcontext
 import warnings
 warnings.filterwarnings("ignore")
 
-from config import RAW_DIR, OUTPUT_DIR, PLOTS_DIR, REPORT_DIR, TIMEFRAME_START, TIMEFRAME_END, FORECAST_PERIODS
-
-# Local imports
-from src.data_collection import collect_all_indicators
-from src.data_prep import prepare_dataset
-from src.eda import run_eda
-from src.stats_analysis import run_stats
-from src.modeling import run_modeling_pipeline
-from src.cognitive_model import evaluate_signals
-from src.reporting import generate_report
+import config
+from config import RAW_DIR, OUTPUT_DIR, BACKTEST_DIR, SCENARIO_DIR, PLOTS_DIR, REPORT_DIR, TIMEFRAME_START, TIMEFRAME_END, FORECAST_PERIODS
+from src.pipeline import Stage, run_stages
 
 def ensure_outputs():
-    for p in (OUTPUT_DIR, PLOTS_DIR, REPORT_DIR):
-        Path(p).mkdir(parents=True, exist_ok=True)
+    config.ensure_dirs()
 
-def main():
-    ensure_outputs()
+def stage_collect():
+    if config.OFFLINE:
+        from src.dataset_store import read_panel
+        print("1) Loading the last collected data (offline)...")
+        try:
+            raw = read_panel("raw")
+        except FileNotFoundError as e:
+            raise SystemExit(f"{e}: run a command without --offline (with DATASET_STORE on) first")
+        print("Data loaded. Columns:", raw.columns.tolist())
+        return raw
+    from src.data_collection import collect_all_indicators
     print("1) Collecting data...")
     raw = collect_all_indicators(RAW_DIR)
     print("Data collected. Columns:", raw.columns.tolist())
+    if config.DATASET_STORE:
+        from src.dataset_store import store_panel
+        store_panel(raw, "raw")
+    return raw
 
+def stage_prepare(raw):
+    from src.data_prep import prepare_dataset
     print("2) Preparing dataset...")
     df = prepare_dataset(raw, start=TIMEFRAME_START, end=TIMEFRAME_END)
     print("Prepared dataset shape:", df.shape)
+    if config.DATASET_STORE:
+        from src.dataset_store import store_panel
+        store_panel(df, "prepared")
+    return df
 
+def stage_eda(df):
+    from src.eda import run_eda
     print("3) Running EDA & visuals...")
     run_eda(df, out_dir=PLOTS_DIR)
 
+def stage_stats(df):
+    from src.stats_analysis import run_stats
     print("4) Running statistical analysis...")
-    stats_res = run_stats(df, out_dir=OUTPUT_DIR)
+    return run_stats(df, out_dir=OUTPUT_DIR)
 
+def stage_model(df, stats_res):
+    from src.modeling import run_modeling_pipeline
     print("5) Modeling & forecasting...")
-    model_res = run_modeling_pipeline(df, forecast_periods=FORECAST_PERIODS, out_dir=OUTPUT_DIR)
+    return run_modeling_pipeline(df, forecast_periods=FORECAST_PERIODS, out_dir=OUTPUT_DIR, plots=False,
+                                 adf=stats_res.get("adf"))
+
+def stage_backtest(df):
+    from src.backtest import run_backtests
+    print("Backtesting SARIMA and ML baselines (rolling origin)...")
+    return run_backtests(df, out_dir=BACKTEST_DIR)
+
+def stage_scenarios(df, model_res):
+    from src.scenarios import run_scenarios
+    print("Simulating forecast scenarios (Monte Carlo)...")
+    return run_scenarios(df, model_res, out_dir=SCENARIO_DIR)
+
+def stage_model_plots(df, model_res):
+    from src.modeling import plot_model_results
+    plot_model_results(df, model_res, out_dir=OUTPUT_DIR)
 
+def stage_cognitive(df):
+    from src.cognitive_model import evaluate_signals
     print("6) Cognitive heuristics (hype vs structural)...")
-    cognitive_flags = evaluate_signals(df)
+    return evaluate_signals(df)
 
+def stage_report(df, stats_res, model_res, cognitive_flags):
+    from src.reporting import generate_report
     print("7) Generating report...")
-    generate_report(df, stats_res, model_res, cognitive_flags, out_dir=REPORT_DIR)
+    return generate_report(df, stats_res, model_res, cognitive_flags, out_dir=REPORT_DIR)
 
+PLOT_KEYS = ["PLOT_MODE", "PLOT_DPI", "PLOT_FORMAT"]
+
+STAGES = [
+    Stage("collect", stage_collect, checkpoint=False),
+    Stage("prepare", stage_prepare, inputs=["collect"],
+          config_keys=["TIMEFRAME_START", "TIMEFRAME_END", "FREQ", "PANEL_DTYPE", "DATASET_STORE"],
+          modules=["src/data_prep.py", "src/panel.py", "src/utils.py", "src/dataset_store.py"]),
+    Stage("eda", stage_eda, inputs=["prepare"],
+          config_keys=PLOT_KEYS + ["CORRELATION"],
+          modules=["src/eda.py", "src/utils.py", "src/render.py", "src/correlation.py"]),
+    Stage("stats", stage_stats, inputs=["prepare"],
+          config_keys=["STATIONARITY", "CORRELATION"],
+          modules=["src/stats_analysis.py", "src/features.py", "src/stationarity.py", "src/correlation.py"]),
+    Stage("model", stage_model, inputs=["prepare", "stats"],
+          config_keys=["FORECAST_PERIODS", "SARIMA_DEFAULTS", "LAGS", "ML_MODEL", "ML_PARAMS", "KEEP_MODEL_OBJECTS",
+                       "SARIMA_INCREMENTAL", "SARIMA_UPDATE_MODE", "SARIMA_REFIT_EVERY", "SARIMA_DRIFT_Z",
+                       "SARIMA_ORDER_SELECTION", "SARIMA_SEARCH", "ADF_ALPHA", "VAR"],
+          modules=["src/modeling.py", "src/features.py", "src/model_store.py", "src/order_search.py",
+                   "src/var_model.py", "src/ml_backends.py"]),
+    Stage("backtest", stage_backtest, inputs=["prepare"],
+          config_keys=["BACKTEST", "LAGS", "ML_MODEL", "ML_PARAMS", "SARIMA_DEFAULTS"],
+          modules=["src/backtest.py", "src/features.py", "src/ml_backends.py"]),
+    Stage("scenarios", stage_scenarios, inputs=["prepare", "model"],
+          config_keys=["SCENARIOS"],
+          modules=["src/scenarios.py"]),
+    Stage("model_plots", stage_model_plots, inputs=["prepare", "model"],
+          config_keys=PLOT_KEYS,
+          modules=["src/modeling.py", "src/utils.py", "src/render.py"]),
+    Stage("cognitive", stage_cognitive, inputs=["prepare"],
+          modules=["src/cognitive_model.py", "src/utils.py"]),
+    Stage("report", stage_report, inputs=["prepare", "stats", "model", "cognitive"],
+          config_keys=["CORRELATION", "VAR"],
+          modules=["src/reporting.py", "src/correlation.py", "src/var_model.py"]),
+]
+
+# subcommand -> (stages to bring up to date, whether it draws figures)
+COMMANDS = {
+    "collect": (["collect"], False),
+    "prepare": (["prepare"], False),
+    "stats": (["stats"], False),
+    "model": (["model", "model_plots"], True),
+    "report": (["report"], False),
+    "backtest": (["backtest"], False),
+    "scenarios": (["scenarios"], False),
+    "all": (["eda", "model_plots", "scenarios", "report"], True),
+}
+
+def add_common_options(parser, suppress=False):
+    """
+    Options accepted both before and after the subcommand. The subcommand copies use
+    SUPPRESS defaults so they do not overwrite values given before it.
+    """
+    names = [st.name for st in STAGES]
+    default = (lambda value: argparse.SUPPRESS) if suppress else (lambda value: value)
+    parser.add_argument("--force", action="append", default=default([]), choices=names, metavar="STAGE",
+                        help="rerun STAGE even if its checkpoint is current (repeatable)")
+    parser.add_argument("--force-from", action="append", default=default([]), choices=names, metavar="STAGE",
+                        help="rerun STAGE and every stage downstream of it (repeatable)")
+    parser.add_argument("--force-all", action="store_true", default=default(False),
+                        help="ignore all checkpoints and run every stage")
+    parser.add_argument("--offline", action="store_true", default=default(False),
+                        help="reuse the last collected raw data instead of fetching; otherwise every command "
+                             "re-runs collection (cached Yahoo prices, all FRED series) first")
+    parser.add_argument("--plots", choices=["all", "summary", "none"], default=default(config.PLOT_MODE),
+                        help=f"all figures, summary figures only, or none (default: {config.PLOT_MODE})")
+    parser.add_argument("--no-plots", dest="plots", action="store_const", const="none",
+                        default=default(config.PLOT_MODE), help="same as --plots=none")
+    parser.add_argument("--instrument", action="store_true", default=default(False),
+                        help="record time and memory per stage and series (timings.json, trace.json)")
+    parser.add_argument("--profile", action="store_true", default=default(False),
+                        help="also cProfile each stage that runs (implies --instrument)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Macroeconomic analysis pipeline.")
+    add_common_options(parser)
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+    helps = {
+        "collect": "download / load raw indicators",
+        "prepare": "collect and prepare the monthly panel",
+        "stats": "stationarity, correlation and Granger tests",
+        "model": "SARIMA, VAR and ML baseline forecasts",
+        "report": "write the markdown/JSON report (reuses checkpoints)",
+        "backtest": "rolling-origin backtest of the SARIMA and ML baselines",
+        "scenarios": "Monte Carlo forecast paths: quantiles, tail probabilities, scenarios",
+        "all": "run every stage except backtest (default)",
+    }
+    for name, text in helps.items():
+        add_common_options(sub.add_parser(name, help=text), suppress=True)
+    batch = sub.add_parser("batch", help="run several universes (config.UNIVERSES) sharing fetches and fits")
+    batch.add_argument("--universes", type=Path, metavar="FILE",
+                       help="JSON list of universe definitions (default: config.UNIVERSES)")
+    batch.add_argument("--jobs", type=int, default=None, help="worker processes shared by all universes")
+    batch.add_argument("--plots", choices=["all", "summary", "none"], default=config.PLOT_MODE)
+    batch.add_argument("--no-plots", dest="plots", action="store_const", const="none")
+    serve = sub.add_parser("serve", help="serve the last run's forecasts and tests over HTTP/JSON")
+    serve.add_argument("--host", default=config.SERVING["host"])
+    serve.add_argument("--port", type=int, default=config.SERVING["port"])
+    args = parser.parse_args(argv)
+    args.command = args.command or "all"
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "serve":
+        from src.serving import serve
+        serve(host=args.host, port=args.port)
+        return
+    ensure_outputs()
+    if args.command == "batch":
+        from src.batch import load_universes, run_batch
+        config.PLOT_MODE = args.plots
+        universes = load_universes(args.universes)
+        if args.plots != "none":
+            from src.render import render_pool
+            ctx = render_pool()
+        else:
+            ctx = nullcontext()
+        with ctx:
+            run_batch(universes, n_jobs=args.jobs, plots=args.plots != "none")
+        print("All done. Reports are under", config.BATCH_DIR)
+        return
+    config.PLOT_MODE = args.plots
+    config.OFFLINE = args.offline
+    targets, draws = COMMANDS[args.command]
+    force = [st.name for st in STAGES] if args.force_all else list(args.force)
+    instrumented = args.instrument or args.profile
+    if instrumented:
+        from src import instrument
+        # the report carries this run's timing table, so it is always rewritten
+        force.append("report")
+        recorder = instrument.recording(memory=config.INSTRUMENT_MEMORY,
+                                        profile_dir=config.PROFILE_DIR if args.profile else None)
+    else:
+        recorder = nullcontext()
+    if draws and args.plots != "none":
+        from src.render import render_pool
+        ctx = render_pool()
+    else:
+        ctx = nullcontext()
+    with recorder as rec:
+        with ctx:
+            run_stages(STAGES, targets=targets, force=force, force_from=args.force_from)
+    if instrumented:
+        timings, trace = rec.write(config.PROFILE_DIR)
+        print("Timings written to:", timings, "and", trace)
     print("All done. Check outputs/ for visuals and report.")
 
 if __name__ == "__main__":
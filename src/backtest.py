@@ -0,0 +1,214 @@
+"""
+Rolling-origin (walk-forward) backtests for the SARIMA and ML lag baselines.
+The lag matrix is built once for the whole panel and every fold slices views
+into it. ML baselines forecast step h directly (one model per step, trained on the
+target h-1 periods ahead of each lag row), matching SARIMA's true multi-step
+forecasts. Origins are split into contiguous blocks that run in parallel: within an ML
+block the linear models are updated incrementally (running normal equations), and
+each SARIMA block is estimated once and its state extended through the next
+`sarima_refit_every` origins.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.features import panel_lags
+from config import LAGS, ML_MODEL, SARIMA_DEFAULTS, BACKTEST
+
+def rolling_origins(n, min_train, horizon, step=1):
+    """
+    Train-set sizes for each fold: the model sees rows [0, o) and forecasts o .. o+horizon-1.
+    """
+    return list(range(min_train, n - horizon + 1, step))
+
+def split_blocks(origins, n_blocks):
+    n_blocks = max(1, min(n_blocks, len(origins)))
+    return [b.tolist() for b in np.array_split(np.asarray(origins), n_blocks) if len(b)]
+
+def _lr_block(X, y, origins, horizon, alpha=0.0):
+    """
+    Direct multi-step OLS (ridge with alpha > 0, intercept unpenalised): step h has its
+    own model of y[t+h-1] on the lags in row t, fitted on the pairs whose target is
+    known at the origin. Each step's X'X / X'y sums are refreshed at every origin by
+    adding only the rows that became usable since the previous one.
+    """
+    k = X.shape[1]
+    A = np.zeros((horizon, k + 1, k + 1))
+    rhs = np.zeros((horizon, k + 1))
+    penalty = alpha * np.diag(np.r_[0.0, np.ones(k)])
+    seen = np.zeros(horizon, dtype=int)
+    preds = []
+    for o in origins:
+        x_o = X[o].astype(np.float64)
+        p = np.empty(horizon)
+        for h in range(horizon):
+            # rows t < o - h: their step-h targets y[t+h] are observed by the origin
+            stop = o - h
+            Xn = X[seen[h]:stop].astype(np.float64)
+            yn = y[seen[h] + h:stop + h]
+            A[h, 0, 0] += len(yn)
+            A[h, 0, 1:] += Xn.sum(axis=0)
+            A[h, 1:, 1:] += Xn.T @ Xn
+            rhs[h, 0] += yn.sum()
+            rhs[h, 1:] += Xn.T @ yn
+            A[h, 1:, 0] = A[h, 0, 1:]
+            seen[h] = stop
+            coef = np.linalg.lstsq(A[h] + penalty if alpha else A[h], rhs[h], rcond=None)[0]
+            p[h] = coef[0] + x_o @ coef[1:]
+        preds.append(p)
+    return preds
+
+def _refit_block(X, y, origins, horizon, model_type, n_jobs=None):
+    from src.ml_backends import make_model
+    preds = []
+    for o in origins:
+        p = np.empty(horizon)
+        for h in range(horizon):
+            model = make_model(model_type, n_jobs=n_jobs)
+            model.fit(X[:o - h], y[h:o])
+            p[h] = model.predict(X[o:o + 1])[0]
+        preds.append(p)
+    return preds
+
+def ml_block_task(origins, X, y, horizon, model_type, n_jobs=None):
+    """
+    Holdout predictions for a block of origins (one array of `horizon` values per origin).
+    Every step is forecast directly from the lags known at the origin (one model per
+    step), so no step sees values observed after it. Linear backends are updated
+    incrementally; the others are refitted at every origin.
+    """
+    from src.ml_backends import ridge_alpha
+    alpha = ridge_alpha(model_type)
+    if alpha is not None:
+        return _lr_block(X, y, origins, horizon, alpha=alpha)
+    return _refit_block(X, y, origins, horizon, model_type, n_jobs)
+
+def sarima_block_task(origins, series, horizon, order=None, seasonal_order=None):
+    """
+    SARIMA forecasts for a block of origins. Parameters are estimated once at the
+    first origin; later origins extend the fitted state with the new observations
+    without re-optimising.
+    """
+    import warnings
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    order = order or SARIMA_DEFAULTS["order"]
+    seasonal_order = seasonal_order or SARIMA_DEFAULTS["seasonal_order"]
+    values = np.asarray(series, dtype=np.float64)
+    preds, fit, seen = [], None, 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for o in origins:
+            try:
+                if fit is None:
+                    model = SARIMAX(values[:o], order=order, seasonal_order=seasonal_order,
+                                    enforce_stationarity=False, enforce_invertibility=False)
+                    fit = model.fit(disp=False)
+                else:
+                    # continue the filter from the last state with the fitted parameters
+                    fit = fit.extend(values[seen:o])
+                seen = o
+                preds.append(np.asarray(fit.forecast(horizon)))
+            except Exception:
+                fit, seen = None, 0
+                preds.append(np.full(horizon, np.nan))
+    return preds
+
+def _run_blocks(fn, blocks, args, executor=None):
+    """
+    fn(block, *args) for every block of origins; results come back in origin order.
+    """
+    if executor is None or len(blocks) == 1:
+        out = [fn(b, *args) for b in blocks]
+    else:
+        futures = [executor.submit(fn, b, *args) for b in blocks]
+        out = [f.result() for f in futures]
+    return [p for block in out for p in block]
+
+def _long_frame(index, y, origins, horizon, preds, model):
+    rows = []
+    for o, p in zip(origins, preds):
+        for step in range(horizon):
+            rows.append((index[o - 1], step + 1, index[o + step], y[o + step], p[step]))
+    df = pd.DataFrame(rows, columns=["origin", "step", "date", "actual", f"{model}_pred"])
+    df[f"{model}_err"] = df["actual"] - df[f"{model}_pred"]
+    return df
+
+def run_backtests(df, out_dir, horizon=None, min_train=None, step=None, sarima_refit_every=None,
+                  model_type=ML_MODEL, lags=LAGS, n_jobs=None, models=("sarima", "ml")):
+    """
+    Walk-forward evaluation of every column. Writes backtest_<col>.csv (one row per
+    origin and forecast step with actuals, predictions and errors) and
+    backtest_summary.csv (RMSE per indicator, model and step) to out_dir.
+    Returns the summary DataFrame.
+    """
+    n_jobs = BACKTEST["n_jobs"] if n_jobs is None else n_jobs
+    cfg = {
+        "horizon": horizon or BACKTEST["horizon"],
+        "min_train": min_train or BACKTEST["min_train"],
+        "step": step or BACKTEST["step"],
+        "sarima_refit_every": sarima_refit_every or BACKTEST["sarima_refit_every"],
+        "model_type": model_type,
+        "models": [m for m in ("sarima", "ml") if m in models],
+        "n_blocks": n_jobs or os.cpu_count() or 1,
+    }
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # one lag matrix for the whole panel; every target and fold slices into it
+    X_full = panel_lags(df.to_numpy(), lags)
+    keep = ~np.isnan(X_full).any(axis=1)
+    X, index = X_full[keep], df.index[keep]
+    summaries = []
+    pool = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs != 1 else None
+    try:
+        for col in df.columns:
+            summaries += _backtest_column(df, col, X, keep, index, cfg, pool, out_dir)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    summary = pd.DataFrame(summaries)
+    summary.to_csv(out_dir / "backtest_summary.csv", index=False)
+    print("Backtest written to:", out_dir)
+    return summary
+
+def _backtest_column(df, col, X, keep, index, cfg, pool, out_dir):
+    """
+    Backtest one indicator; writes backtest_<col>.csv and returns its summary rows.
+    """
+    y = df[col].to_numpy(dtype=np.float64)[keep]
+    if np.isnan(y).any():
+        print("Backtest skipped (missing values):", col)
+        return []
+    horizon = cfg["horizon"]
+    origins = rolling_origins(len(y), cfg["min_train"], horizon, cfg["step"])
+    if not origins:
+        print("Backtest skipped (not enough data):", col)
+        return []
+    frames = []
+    if "sarima" in cfg["models"]:
+        # SARIMA sees the full history, so shift origins past the rows dropped for lags
+        offset = int(np.argmax(keep))
+        series = df[col].to_numpy(dtype=np.float64)
+        # one block per refit, so results do not depend on the number of workers
+        every = cfg["sarima_refit_every"]
+        s_origins = [o + offset for o in origins]
+        s_blocks = [s_origins[i:i + every] for i in range(0, len(s_origins), every)]
+        preds = _run_blocks(sarima_block_task, s_blocks, (series, horizon), pool)
+        frames.append(_long_frame(index, y, origins, horizon, preds, "sarima"))
+    if "ml" in cfg["models"]:
+        blocks = split_blocks(origins, cfg["n_blocks"])
+        threads = None if pool is None else 1
+        preds = _run_blocks(ml_block_task, blocks, (X, y, horizon, cfg["model_type"], threads), pool)
+        frames.append(_long_frame(index, y, origins, horizon, preds, "ml"))
+    result = frames[0]
+    for f in frames[1:]:
+        result = result.merge(f, on=["origin", "step", "date", "actual"])
+    result.to_csv(out_dir / f"backtest_{col}.csv", index=False)
+    rows = []
+    for model in cfg["models"]:
+        err = result[f"{model}_err"]
+        rmse = np.sqrt((err ** 2).groupby(result["step"]).mean())
+        rows += [{"indicator": col, "model": model, "step": int(s), "rmse": float(v),
+                  "origins": len(origins)} for s, v in rmse.items()]
+    return rows
@@ -0,0 +1,211 @@
+"""
+Batch runs over several universes (regions, sectors) in one process.
+Indicators are identified by their source (e.g. "yahoo:^GSPC"), so a ticker
+listed in several universes is collected once, over the union of their
+timeframes. Universes with the same timeframe are prepared together, and each
+distinct prepared series gets one stationarity test and one SARIMA fit however
+many universes list it; the ML baseline is shared between universes whose
+panels are identical. All of these fits run on one worker pool. The
+panel-wide steps (correlations, Granger, VAR, cognitive scores, report) then
+run per universe, writing to BATCH_DIR/<universe>/.
+"""
+import json
+import os
+from pathlib import Path
+import pandas as pd
+from config import (UNIVERSES, GEO_SCOPE, TIMEFRAME_START, TIMEFRAME_END, RAW_DIR, BATCH_DIR, FORECAST_PERIODS,
+                    MODEL_WORKERS, KEEP_MODEL_OBJECTS, VAR, LAGS)
+
+SOURCE_FIELDS = {"yahoo": "ticker", "fred": "fred_id", "csv": "filename"}
+
+def source_key(ind):
+    return f"{ind['type']}:{ind[SOURCE_FIELDS[ind['type']]]}"
+
+def load_universes(path=None):
+    """
+    Universe definitions from a JSON file (a list shaped like config.UNIVERSES), or
+    config.UNIVERSES. Each gets name, geo_scope, indicators, start and end.
+    """
+    defs = json.loads(Path(path).read_text()) if path else UNIVERSES
+    out, seen = [], set()
+    for d in defs:
+        name = d.get("name")
+        if not name or name in seen:
+            raise ValueError(f"Universe names must be unique and non-empty: {name!r}")
+        if not d.get("indicators"):
+            raise ValueError(f"Universe {name} has no indicators")
+        unknown = [ind for ind in d["indicators"] if ind.get("type") not in SOURCE_FIELDS]
+        if unknown:
+            raise ValueError(f"Universe {name}: unknown indicator type in {unknown}")
+        seen.add(name)
+        out.append({
+            "name": name,
+            "geo_scope": d.get("geo_scope", GEO_SCOPE if name == "US" else name),
+            "indicators": list(d["indicators"]),
+            "start": str(d.get("start", TIMEFRAME_START)),
+            "end": str(d.get("end", TIMEFRAME_END)),
+        })
+    return out
+
+def collect_union(universes, raw_dir=None, downloader=None):
+    """
+    Raw monthly panel with one column per distinct source (named by source_key),
+    covering the earliest start to the latest end of the universes.
+    """
+    from src.data_collection import collect_all_indicators
+    union = {}
+    refs = 0
+    for u in universes:
+        for ind in u["indicators"]:
+            refs += 1
+            union.setdefault(source_key(ind), dict(ind, name=source_key(ind)))
+    start = min(pd.Timestamp(u["start"]) for u in universes)
+    end = max(pd.Timestamp(u["end"]) for u in universes)
+    print(f"Batch: {len(universes)} universes, {refs} indicators, {len(union)} distinct sources")
+    return collect_all_indicators(raw_dir or RAW_DIR, downloader=downloader, indicators=list(union.values()),
+                                  start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"))
+
+def _series_id(key, start, end):
+    # names the prepared series in the lag / parameter caches: same source and timeframe, same series
+    return f"{key}@{start}..{end}"
+
+def prepare_universes(raw, universes):
+    """
+    {timeframe: prepared panel over every source its universes use (columns named
+    by _series_id)} and {universe name: (series ids, display names)}.
+    prepare_dataset works column by column, so a universe's panel is the
+    corresponding columns of its timeframe's shared panel.
+    """
+    from src.data_prep import prepare_dataset
+    groups = {}
+    for u in universes:
+        groups.setdefault((u["start"], u["end"]), []).append(u)
+    shared, members = {}, {}
+    for (start, end), us in groups.items():
+        keys = list(dict.fromkeys(source_key(ind) for u in us for ind in u["indicators"]))
+        keys = [k for k in keys if k in raw.columns]
+        panel = prepare_dataset(raw[keys], start=start, end=end)
+        panel.columns = [_series_id(k, start, end) for k in panel.columns]
+        shared[(start, end)] = panel
+        for u in us:
+            ids, names = [], []
+            for ind in u["indicators"]:
+                sid = _series_id(source_key(ind), start, end)
+                if sid in panel.columns and sid not in ids:
+                    ids.append(sid)
+                    names.append(ind["name"])
+            missing = len(u["indicators"]) - len(ids)
+            if missing:
+                print(f"Batch: {u['name']} is missing {missing} indicator(s) (no data or duplicates)")
+            members[u["name"]] = (ids, names)
+    return shared, members
+
+def _universe_dirs(out_root, name):
+    base = Path(out_root) / name
+    dirs = {"base": base, "plots": base / "plots", "report": base / "report"}
+    for p in dirs.values():
+        p.mkdir(parents=True, exist_ok=True)
+    return dirs
+
+def run_batch(universes=None, out_root=None, n_jobs=None, downloader=None, plots=True, store_dir=None,
+              periods=FORECAST_PERIODS):
+    """
+    Run every universe (default load_universes()) and return {name: report path}.
+    n_jobs: worker processes shared by all universes (default config.MODEL_WORKERS).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.pipeline import content_hash
+    from src.features import panel_lags
+    from src.stationarity import run_stationarity
+    from src.modeling import (run_tasks, fit_sarima_task, fit_ml_block_task, ml_blocks, unpack_blocks,
+                              sarima_options, ml_holdout_periods, plot_model_results)
+    from src.stats_analysis import run_stats
+    from src.cognitive_model import evaluate_signals
+    from src.reporting import generate_report
+    universes = universes or load_universes()
+    out_root = Path(out_root or BATCH_DIR)
+    n_jobs = MODEL_WORKERS if n_jobs is None else n_jobs
+
+    raw = collect_union(universes, downloader=downloader)
+    shared, members = prepare_universes(raw, universes)
+    panels = {u["name"]: shared[(u["start"], u["end"])][members[u["name"]][0]] for u in universes}
+    store_dir, order = sarima_options(store_dir)
+
+    pool = ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) if n_jobs != 1 else None
+    try:
+        # one stationarity pass per timeframe panel covers every universe in it
+        adf = {}
+        for panel in shared.values():
+            adf.update(run_stationarity(panel, executor=pool))
+
+        # one SARIMA fit per distinct series, one ML baseline per distinct panel
+        fit_ids = list(dict.fromkeys(sid for panel in panels.values() for sid in panel.columns))
+        series = {sid: panel[sid] for panel in shared.values() for sid in panel.columns}
+        tasks = [(fit_sarima_task, (sid, series[sid], periods, KEEP_MODEL_OBJECTS, store_dir, order, adf.get(sid), 1))
+                 for sid in fit_ids]
+        # each distinct panel's targets go out in blocks, so its lag matrix is pickled once per block
+        ml_keys = []
+        for h, panel in {content_hash(p): p for p in panels.values()}.items():
+            X = panel_lags(panel.to_numpy(), LAGS)
+            for block in ml_blocks(list(panel.columns), n_jobs or os.cpu_count() or 1):
+                ml_keys += [(h, sid) for sid in block]
+                tasks.append((fit_ml_block_task, (block, panel, ml_holdout_periods(len(panel), periods),
+                                                  KEEP_MODEL_OBJECTS, None if pool is None else 1, X)))
+        refs = sum(p.shape[1] for p in panels.values())
+        print(f"Batch: {refs} series across universes -> {len(fit_ids)} SARIMA fits, {len(ml_keys)} ML fits")
+        outs = run_tasks(tasks, pool)
+        ml_outs = dict(zip(ml_keys, unpack_blocks(outs[len(fit_ids):])))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    sarima = {}
+    for sid, res, err in outs[:len(fit_ids)]:
+        if err is not None:
+            print("SARIMA failed:", sid, err)
+        else:
+            sarima[sid] = res
+
+    reports = {}
+    for u in universes:
+        name = u["name"]
+        ids, names = members[name]
+        rename = dict(zip(ids, names))
+        panel = panels[name]
+        if panel.empty:
+            print(f"Batch: no data for {name}, skipping")
+            continue
+        print(f"Batch: {name} ({len(ids)} series)")
+        dirs = _universe_dirs(out_root, name)
+        df = panel.rename(columns=rename)
+        h = content_hash(panel)
+        ml = {}
+        for sid in ids:
+            _, res, err = ml_outs[(h, sid)]
+            if err is not None:
+                print("ML baseline failed for", rename[sid], err)
+            else:
+                ml[rename[sid]] = res
+        stats_res = run_stats(df, out_dir=dirs["base"], adf={rename[s]: adf[s] for s in ids if s in adf})
+        model_res = {"sarima": {rename[s]: sarima[s] for s in ids if s in sarima}, "ml": ml, "var": None}
+        if VAR["enabled"]:
+            from src.var_model import run_var
+            try:
+                model_res["var"] = run_var(df, periods, adf=stats_res["adf"], out_dir=dirs["base"])
+            except Exception as e:
+                print("VAR skipped:", e)
+        cognitive = evaluate_signals(df)
+        if plots:
+            from src.eda import run_eda
+            run_eda(df, out_dir=dirs["plots"])
+            plot_model_results(df, model_res, out_dir=dirs["plots"])
+        reports[name] = generate_report(df, stats_res, model_res, cognitive, out_dir=dirs["report"], universe=u)
+
+    (out_root / "batch_summary.json").write_text(json.dumps({
+        "universes": [{k: u[k] for k in ("name", "geo_scope", "start", "end")}
+                      | {"indicators": members[u["name"]][1], "report": str(reports.get(u["name"]))}
+                      for u in universes],
+        "sources": int(raw.shape[1]),
+        "sarima_fits": len(fit_ids),
+        "ml_fits": len(ml_keys),
+    }, indent=2))
+    return reports
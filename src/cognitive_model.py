@@ -1,11 +1,17 @@
-
 """
 Simple heuristics to flag temporary hype vs structural trends.
 Uses persistence (autocorrelation), rolling volatility, and SNR.
+hype_vs_structural scores one series; panel_scores does the same for every
+gap-free column of a panel in one NumPy pass, and score_history gives the
+score at every month in O(T) from cumulative sums.
 """
 import numpy as np
+import pandas as pd
+from src import instrument
 from src.utils import rolling_snr
 
+STRUCTURAL_THRESHOLD = 0.2
+
 def hype_vs_structural(series, window=6):
     s = series.dropna()
     if len(s) < window + 2:
@@ -23,13 +29,104 @@ def hype_vs_structural(series, window=6):
     s_score = 0.5 * p + 0.3 * v + 0.2 * np.tanh(snr if snr is not None else 0)
     return float(s_score)
 
-def evaluate_signals(df):
+def combine_scores(persistence, vol, snr):
+    """
+    Elementwise version of the hype_vs_structural weighting (NaN persistence/vol count as 0).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.where(np.isnan(persistence), 0.0, np.tanh(persistence))
+        v = np.where(np.isnan(vol), 0.0, np.tanh(1 / (1 + vol)))
+        return 0.5 * p + 0.3 * v + 0.2 * np.tanh(snr)
+
+def panel_signals(values, window=6):
+    """
+    Lag-1 autocorrelation, trailing std of the last `window` changes and SNR for
+    every column of a gap-free (T, N) array, as three length-N arrays.
+    """
+    X = np.asarray(values, dtype=np.float64)
+    a, b = X[1:], X[:-1]
+    a = a - a.mean(axis=0)
+    b = b - b.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        persistence = (a * b).sum(axis=0) / np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+    last = np.diff(X, axis=0)[-window:]
+    vol = last.std(axis=0, ddof=1)
+    snr = np.abs(last.mean(axis=0)) / (vol + 1e-9)
+    return persistence, vol, snr
+
+def panel_scores(df, window=6):
+    """
+    hype_vs_structural for every column at once. Columns must be free of gaps;
+    panels shorter than window + 2 rows score NaN.
+    """
+    if len(df) < window + 2:
+        return pd.Series(np.nan, index=df.columns)
+    return pd.Series(combine_scores(*panel_signals(df.to_numpy(), window)), index=df.columns)
+
+def _window_sums(c, window):
+    # sums over the trailing `window` rows from a cumulative sum with a leading zero row
+    return c[window:] - c[:-window]
+
+def score_history(df, window=6):
+    """
+    Score of every gap-free column at every date, using only data up to that date:
+    expanding lag-1 autocorrelation plus trailing-window volatility and SNR of the
+    changes, all from running sums (O(T) per column). Rows before window + 1
+    observations are NaN; the last row equals panel_scores(df).
+    """
+    X = np.asarray(df.to_numpy(), dtype=np.float64)
+    T, N = X.shape
+    out = np.full((T, N), np.nan)
+    if T < window + 2:
+        return pd.DataFrame(out, index=df.index, columns=df.columns)
+    # correlations are shift invariant; centring keeps the running sums well conditioned
+    Xc = X - X.mean(axis=0)
+    a, b = Xc[1:], Xc[:-1]
+    n = np.arange(1, T)[:, None].astype(np.float64)
+    Sa, Sb = np.cumsum(a, axis=0), np.cumsum(b, axis=0)
+    Saa, Sbb, Sab = np.cumsum(a * a, axis=0), np.cumsum(b * b, axis=0), np.cumsum(a * b, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = Sab - Sa * Sb / n
+        var_a = np.maximum(Saa - Sa * Sa / n, 0)
+        var_b = np.maximum(Sbb - Sb * Sb / n, 0)
+        persistence = cov / np.sqrt(var_a * var_b)        # row k: data up to t = k + 1
+
+    D = np.diff(X, axis=0)
+    D = D - D.mean(axis=0)
+    zero = np.zeros((1, N))
+    S1 = _window_sums(np.vstack([zero, np.cumsum(D, axis=0)]), window)
+    S2 = _window_sums(np.vstack([zero, np.cumsum(D * D, axis=0)]), window)
+    vol = np.sqrt(np.maximum((S2 - S1 * S1 / window) / (window - 1), 0))   # row k: diffs up to t = k + window
+    mean = S1 / window + np.diff(X, axis=0).mean(axis=0)
+    snr = np.abs(mean) / (vol + 1e-9)
+
+    # first date with window + 2 observations is t = window + 1
+    t = np.arange(window + 1, T)
+    out[t] = combine_scores(persistence[t - 1], vol[t - window], snr[t - window])
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+def label(score):
+    return "structural" if score is not None and score > STRUCTURAL_THRESHOLD else "temporary/hype"
+
+def evaluate_signals(df, window=6):
+    """
+    {col: {"score", "label"}}. Gap-free columns are scored together with
+    panel_scores; columns with missing values go through hype_vs_structural.
+    """
+    gaps = df.isna().any()
+    dense = [c for c in df.columns if not gaps[c]]
+    with instrument.span("cognitive", series=f"panel[{len(dense)}]"):
+        scores = panel_scores(df[dense], window) if dense else pd.Series(dtype=float)
     flags = {}
     for col in df.columns:
-        try:
-            score = hype_vs_structural(df[col])
-            label = "structural" if score is not None and score > 0.2 else "temporary/hype"
-            flags[col] = {"score": score, "label": label}
-        except Exception as e:
-            flags[col] = {"score": None, "label": "unknown", "error": str(e)}
+        if col in scores.index:
+            score = None if np.isnan(scores[col]) else float(scores[col])
+            flags[col] = {"score": score, "label": label(score)}
+            continue
+        with instrument.span("cognitive", series=col):
+            try:
+                score = hype_vs_structural(df[col], window=window)
+                flags[col] = {"score": score, "label": label(score)}
+            except Exception as e:
+                flags[col] = {"score": None, "label": "unknown", "error": str(e)}
     return flags
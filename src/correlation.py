@@ -0,0 +1,189 @@
+"""
+Correlation engine for wide panels.
+Pearson correlations are computed block by block as matrix products: of
+standardized columns when the panel has no gaps, otherwise of masked sums
+(pairwise-complete observations, the same result as DataFrame.corr()).
+Callers that only need the strongest pairs stream the blocks through a
+partial selection (argpartition), so the full N x N matrix and its sort are
+never materialised. Lead/lag cross-correlations reuse the same blocks on
+shifted copies of the panel.
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from config import CORRELATION
+
+class _Operand:
+    """
+    One side of a correlation product: standardized values (gap-free panels),
+    or mean-centred values with NaN set to 0 plus the observation mask.
+    """
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        mask = ~np.isnan(values)
+        self.n = values.shape[0]
+        self.Z = self.X = self.M = None
+        if mask.all():
+            sd = values.std(axis=0, ddof=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                Z = (values - values.mean(axis=0)) / sd
+            Z[:, ~(sd > 0)] = np.nan
+            self.Z = Z
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+                centred = values - np.nanmean(values, axis=0)
+            self.X = np.where(mask, centred, 0.0)
+            self.M = mask.astype(np.float64)
+
+    def dense(self):
+        return self.Z is not None
+
+    def masked(self):
+        # (X, M) view of a gap-free operand, for products with a gappy one
+        if self.X is None:
+            self.X = np.nan_to_num(self.Z)
+            self.M = np.ones_like(self.X)
+        return self.X, self.M
+
+def corr_block(a, b, rows, cols):
+    """
+    Correlations between columns `rows` of operand a and `cols` of operand b.
+    """
+    if a.dense() and b.dense():
+        return a.Z[:, rows].T @ b.Z[:, cols] / (a.n - 1)
+    Xa, Ma = a.masked()
+    Xb, Mb = b.masked()
+    Xi, Mi, Xj, Mj = Xa[:, rows], Ma[:, rows], Xb[:, cols], Mb[:, cols]
+    n = Mi.T @ Mj
+    si, sj = Xi.T @ Mj, Mi.T @ Xj
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = Xi.T @ Xj - si * sj / n
+        vi = (Xi * Xi).T @ Mj - si * si / n
+        vj = Mi.T @ (Xj * Xj) - sj * sj / n
+        r = cov / np.sqrt(vi * vj)
+    r[(n < 2) | ~(vi > 0) | ~(vj > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+def iter_blocks(n_cols, block, upper=True):
+    """
+    (rows, cols) slices covering the matrix; with upper=True only blocks on or above the diagonal.
+    """
+    starts = range(0, n_cols, block)
+    for i in starts:
+        for j in starts:
+            if upper and j < i:
+                continue
+            yield slice(i, min(i + block, n_cols)), slice(j, min(j + block, n_cols))
+
+def _operands(df, lag=0):
+    values = df.to_numpy(dtype=np.float64)
+    if lag == 0:
+        a = _Operand(values)
+        return a, a
+    # a[t] paired with b[t + lag]: positive lag means the row series leads
+    return _Operand(values[:-lag]), _Operand(values[lag:])
+
+def correlation_matrix(df, block=None, lag=0):
+    """
+    Full correlation matrix as a DataFrame (equal to df.corr() for lag=0).
+    With lag > 0, entry [x, y] is corr(x_t, y_{t+lag}).
+    """
+    block = block or CORRELATION["block"]
+    N = df.shape[1]
+    a, b = _operands(df, lag)
+    out = np.empty((N, N))
+    for rows, cols in iter_blocks(N, block, upper=(lag == 0)):
+        r = corr_block(a, b, rows, cols)
+        out[rows, cols] = r
+        if lag == 0:
+            out[cols, rows] = r.T
+    if lag == 0:
+        # the diagonal is 1 wherever a column has any variance, as in DataFrame.corr()
+        d = np.diag(out).copy()
+        np.fill_diagonal(out, np.where(np.isnan(d), np.nan, 1.0))
+    return pd.DataFrame(out, index=df.columns, columns=df.columns)
+
+class _TopK:
+    """
+    Running selection of the k largest (and, with both_ends, k smallest) scores,
+    keeping each value and its (i, j, lag) label.
+    """
+    def __init__(self, k, both_ends=True):
+        self.k = k
+        self.both_ends = both_ends
+        self.vals = np.empty(0)
+        self.scores = np.empty(0)
+        self.keys = np.empty((0, 3), dtype=np.int64)
+
+    def add(self, vals, keys, scores):
+        vals = np.concatenate([self.vals, vals])
+        scores = np.concatenate([self.scores, scores])
+        keys = np.concatenate([self.keys, keys])
+        limit = 2 * self.k if self.both_ends else self.k
+        if len(vals) > limit:
+            keep = np.argpartition(scores, len(scores) - self.k)[-self.k:]
+            if self.both_ends:
+                lo = np.argpartition(scores, self.k - 1)[:self.k]
+                keep = np.unique(np.concatenate([lo, keep]))
+            vals, scores, keys = vals[keep], scores[keep], keys[keep]
+        self.vals, self.scores, self.keys = vals, scores, keys
+
+    def ranked(self):
+        """
+        Values and keys, highest score first.
+        """
+        order = np.argsort(-self.scores, kind="stable")
+        return self.vals[order], self.keys[order]
+
+def _scan(df, lags, k, block, both_ends=True, score=None):
+    block = block or CORRELATION["block"]
+    N = df.shape[1]
+    top = _TopK(k, both_ends)
+    for lag in lags:
+        a, b = _operands(df, lag)
+        for rows, cols in iter_blocks(N, block, upper=(lag == 0)):
+            r = corr_block(a, b, rows, cols)
+            i, j = np.meshgrid(np.arange(rows.start, rows.stop), np.arange(cols.start, cols.stop), indexing="ij")
+            # lag 0: each unordered pair once (i < j); other lags: every ordered pair except i == j
+            valid = ~np.isnan(r) & ((i < j) if lag == 0 else (i != j))
+            vals = r[valid]
+            if len(vals):
+                keys = np.stack([i[valid], j[valid], np.full(len(vals), lag)], axis=1)
+                top.add(vals, keys, vals if score is None else score(vals))
+    return top
+
+def top_pairs(df, k=None, block=None):
+    """
+    The k most positively and k most negatively correlated pairs, each unordered
+    pair counted once: {"positive": [(a, b, r), ...], "negative": [...]}, strongest first.
+    """
+    k = k or CORRELATION["top_k"]
+    vals, keys = _scan(df, [0], k, block).ranked()
+    cols = list(df.columns)
+    pairs = [(cols[i], cols[j], float(v)) for v, (i, j, _) in zip(vals, keys)]
+    return {"positive": pairs[:k], "negative": pairs[::-1][:k]}
+
+def lead_lag(df, max_lag=None, k=None, block=None):
+    """
+    The k ordered pairs x != y with the strongest cross-correlation |corr(x_t, y_{t+lag})|
+    over lag = 1..max_lag (best lag per pair), strongest first, as dicts with
+    leader, follower, lag, corr.
+    """
+    max_lag = CORRELATION["max_lag"] if max_lag is None else max_lag
+    k = k or CORRELATION["top_k"]
+    lags = [lag for lag in range(1, max_lag + 1) if lag < len(df) - 2]
+    if not lags:
+        return []
+    # keep enough candidates that k distinct pairs survive when one pair wins at several lags
+    vals, keys = _scan(df, lags, k * len(lags), block, both_ends=False, score=np.abs).ranked()
+    cols = list(df.columns)
+    out, seen = [], set()
+    for v, (i, j, lag) in zip(vals, keys):
+        if (i, j) in seen:
+            continue
+        seen.add((i, j))
+        out.append({"leader": cols[i], "follower": cols[j], "lag": int(lag), "corr": float(v)})
+        if len(out) == k:
+            break
+    return out
@@ -3,59 +3,212 @@
 Data collectors: Yahoo, FRED, CSV local.
 Returns a wide DataFrame with Date index and columns per indicator name.
 """
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
+from urllib.parse import urlencode
+from urllib.request import urlopen
 import pandas as pd
-import yfinance as yf
 import numpy as np
 from dotenv import load_dotenv
-from config import INDICATORS, TIMEFRAME_START, TIMEFRAME_END, FRED_API_ENVVAR
-from fredapi import Fred
+from config import (INDICATORS, TIMEFRAME_START, TIMEFRAME_END, FRED_API_ENVVAR, FRED_URL, YAHOO_CACHE,
+                    CSV_CHUNKSIZE, COLLECTION)
+from src.raw_cache import read_cached, write_cached, missing_windows
 
 load_dotenv()
 
-def fetch_yahoo(ticker, start, end):
+PRICE_CANDIDATES = ["Adj Close", "Close", "Value"]
+QUIET_TAIL_DAYS = 5
+
+def _extract_prices(df, tickers):
     """
-    Fetch monthly time-series data from Yahoo Finance.
-    Handles MultiIndex columns and missing 'Adj Close'.
+    Pull one daily price column per ticker out of a yf.download frame.
+    Handles MultiIndex columns (batched or single ticker) and missing 'Adj Close'.
     """
-    df = yf.download(ticker, start=start, end=end, progress=False)
-
+    prices = {}
     if df is None or df.empty:
-        print(f"[Yahoo] No data returned for {ticker}. Skipping.")
-        return None
-
-    # Handle multi-index columns (some tickers like DX-Y.NYB, ^TNX, CL=F)
+        return prices
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [col[0] for col in df.columns]
+        fields = df.columns.get_level_values(0)
+        for ticker in tickers:
+            for candidate in PRICE_CANDIDATES:
+                if (candidate, ticker) in df.columns:
+                    s = df[(candidate, ticker)].dropna()
+                    if not s.empty:
+                        prices[ticker] = s
+                        break
+            else:
+                print(f"[Yahoo] No valid price column found for {ticker}. Columns: {sorted(set(fields))}")
+    else:
+        # flat columns only happen for a single ticker
+        for candidate in PRICE_CANDIDATES:
+            if candidate in df.columns:
+                s = df[candidate].dropna()
+                if not s.empty:
+                    prices[tickers[0]] = s
+                    break
+        else:
+            print(f"[Yahoo] No valid price column found for {tickers[0]}. Columns: {df.columns.tolist()}")
+    for ticker, s in prices.items():
+        s.index = pd.to_datetime(s.index)
+        if s.index.tz is not None:
+            s.index = s.index.tz_localize(None)
+        s.name = ticker
+    return prices
 
-    # Choose the best available column for pricing/value
-    price_col = None
-    for candidate in ["Adj Close", "Close", "Value"]:
-        if candidate in df.columns:
-            price_col = candidate
-            break
+def yahoo_downloader(timeout=None):
+    """
+    yf.download, with a per-request timeout when one is given. yfinance is only
+    imported on the first call, so runs served entirely from the cache never load it.
+    """
+    def download(tickers, **kwargs):
+        import yfinance as yf
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return yf.download(tickers, **kwargs)
+    return download
 
-    if not price_col:
-        print(f"[Yahoo] No valid price column found for {ticker}. Columns: {df.columns.tolist()}")
+def business_days(start, end):
+    return len(pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end) - pd.Timedelta(days=1)))
+
+def quiet_window(start, end):
+    """
+    True when an empty download for [start, end) is expected rather than a failure:
+    the window has no business days (a weekend), or it is a tail of at most
+    QUIET_TAIL_DAYS business days ending today (holidays, prices not published yet).
+    """
+    days = business_days(start, end)
+    return days == 0 or (days <= QUIET_TAIL_DAYS and pd.Timestamp(end) >= pd.Timestamp.today().normalize())
+
+def require_rows(download):
+    """
+    Wrap a yf.download-style callable so an all-empty (or all-NaN) result raises.
+    yfinance reports failed tickers that way instead of raising, which would
+    otherwise skip the retries. Empty results for a quiet_window are returned as is.
+    """
+    def call(tickers, **kwargs):
+        df = download(tickers, **kwargs)
+        if df is None or df.dropna(how="all").empty:
+            if kwargs.get("start") is not None and kwargs.get("end") is not None \
+                    and quiet_window(kwargs["start"], kwargs["end"]):
+                return df
+            raise ValueError(f"no rows returned for {list(tickers)}")
+        return df
+    return call
+
+def download_yahoo_daily(tickers, start, end, downloader=None):
+    """
+    One batched yf.download round trip for all tickers. Returns {ticker: daily Series}.
+    """
+    if downloader is None:
+        downloader = yahoo_downloader()
+    tickers = list(tickers)
+    df = downloader(tickers, start=start, end=end, progress=False, group_by="column")
+    return _extract_prices(df, tickers)
+
+def fetch_yahoo_batch(tickers, start, end, cache_dir=None, downloader=None):
+    """
+    Fetch monthly time-series data for several Yahoo tickers at once.
+    With a cache_dir, daily prices are kept on disk and only missing date windows are
+    downloaded; tickers that need the same window share one batched request.
+    Returns a wide monthly DataFrame with one column per ticker that returned data.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    daily = {}
+    if cache_dir is None:
+        daily = download_yahoo_daily(tickers, start, end, downloader=downloader)
+    else:
+        # group tickers by the windows they are missing
+        cached, metas, pending = {}, {}, {}
+        for ticker in tickers:
+            s, meta = read_cached(cache_dir, ticker)
+            cached[ticker], metas[ticker] = s, meta
+            for window in missing_windows(meta, start, end):
+                pending.setdefault(window, []).append(ticker)
+
+        fetched = {}
+        for (w_start, w_end), group in pending.items():
+            print(f"[Yahoo] Downloading {len(group)} ticker(s) for {w_start.date()} .. {w_end.date()}")
+            try:
+                got = download_yahoo_daily(group, w_start, w_end, downloader=downloader)
+            except Exception as e:
+                print(f"[Yahoo] Batched download failed for {group}: {e}")
+                continue
+            # nothing can trade in a window without business days: covered, even though empty
+            empty = pd.Series(dtype=float, index=pd.DatetimeIndex([])) if business_days(w_start, w_end) == 0 else None
+            for ticker in group:
+                fetched.setdefault(ticker, []).append(((w_start, w_end), got.get(ticker, empty)))
+
+        for ticker in tickers:
+            s, meta = cached[ticker], metas[ticker]
+            if ticker in fetched:
+                parts = [p for _, p in fetched[ticker] if p is not None]
+                if s is not None:
+                    parts.insert(0, s)
+                if parts:
+                    # newer downloads win on overlapping dates
+                    s = pd.concat(parts)
+                    s = s[~s.index.duplicated(keep="last")].sort_index()
+                if s is not None:
+                    # only windows that returned data count as covered; failed ones are retried next run
+                    windows = [w for w, p in fetched[ticker] if p is not None]
+                    c_start = min([w[0] for w in windows] + ([pd.Timestamp(meta["start"])] if meta else []))
+                    c_end = max([w[1] for w in windows] + ([pd.Timestamp(meta["end"])] if meta else []))
+                    write_cached(cache_dir, ticker, s, c_start, c_end)
+            if s is not None:
+                daily[ticker] = s
+
+    frames = []
+    for ticker in tickers:
+        s = daily.get(ticker)
+        if s is not None:
+            s = s[(s.index >= pd.Timestamp(start)) & (s.index < pd.Timestamp(end))]
+        if s is None or s.empty:
+            print(f"[Yahoo] No data returned for {ticker}. Skipping.")
+            continue
+        frames.append(s.to_frame(ticker).resample("M").last())
+    if not frames:
         return None
+    return pd.concat(frames, axis=1)
 
-    # Clean and resample to monthly frequency
-    df = df[[price_col]].rename(columns={price_col: ticker})
-    df.index = pd.to_datetime(df.index)
-    df = df.resample("M").last()
+def fetch_yahoo(ticker, start, end, cache_dir=None, downloader=None):
+    """
+    Fetch monthly time-series data from Yahoo Finance for a single ticker.
+    """
+    return fetch_yahoo_batch([ticker], start, end, cache_dir=cache_dir, downloader=downloader)
 
-    return df
+def fred_observations(series_id, api_key, start=None, end=None, timeout=None, url=None):
+    """
+    One request to the FRED observations endpoint. Returns the raw daily/monthly
+    Series (missing values, sent as ".", become NaN). Raises on HTTP or network errors.
+    """
+    params = {"series_id": series_id, "api_key": api_key, "file_type": "json"}
+    if start is not None:
+        params["observation_start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        params["observation_end"] = pd.Timestamp(end).strftime("%Y-%m-%d")
+    with urlopen(f"{url or FRED_URL}/series/observations?{urlencode(params)}", timeout=timeout) as resp:
+        obs = json.load(resp)["observations"]
+    values = pd.to_numeric(pd.Series([o["value"] for o in obs], dtype=object), errors="coerce")
+    values.index = pd.to_datetime([o["date"] for o in obs])
+    return values.rename(series_id)
 
-def fetch_fred(series_id, api_key=None, start=None, end=None):
+def fetch_fred(series_id, api_key=None, start=None, end=None, fetcher=None):
+    """
+    Monthly (month-end, last value) FRED series as a one-column DataFrame, or None.
+    fetcher has the signature of fred_observations and defaults to it.
+    """
     api_key = api_key or os.getenv(FRED_API_ENVVAR)
     if not api_key:
         print(f"[FRED] No API key. Skipping {series_id}.")
         return None
 
     try:
-        fred = Fred(api_key=api_key)
-        series = fred.get_series(series_id, observation_start=start, observation_end=end)
+        series = (fetcher or fred_observations)(series_id, api_key, start=start, end=end)
     except Exception as e:
         print(f"[FRED] Failed for {series_id}: {e}")
         return None
@@ -65,75 +218,217 @@ def fetch_fred(series_id, api_key=None, start=None, end=None):
     df = df.resample("M").last()
     return df
 
-def load_local_csv(filename, raw_dir):
-    p = Path(raw_dir) / filename
-    if not p.exists():
-        print("Local CSV not found:", p)
-        return None
-
-    df = pd.read_csv(p)
+def _guess_date_format(values):
+    try:
+        from pandas.tseries.api import guess_datetime_format
+    except ImportError:  # pandas < 2.2
+        from pandas._libs.tslibs.parsing import guess_datetime_format
+    for v in values:
+        if isinstance(v, str) and v.strip():
+            return guess_datetime_format(v.strip())
+    return None
 
+def detect_csv_layout(path, sample_rows=1000):
+    """
+    Apply the Date / Year+Month rules to the first rows of a CSV.
+    Returns (date_col, value_col) where date_col is a column name or ("Year", "Month"),
+    or None if the file has no usable date or numeric column.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows)
+    date_col = None
     # 1. If any column contains 'date' (case-insensitive)
-    for c in df.columns:
+    for c in sample.columns:
         if "date" in c.lower():
-            df = df.rename(columns={c: "Date"})
+            date_col = c
             break
-
     # 2. If no Date column but has Year & Month
-    if "Date" not in df.columns:
-        if {"Year", "Month"}.issubset(df.columns):
-            df["Date"] = pd.to_datetime(
-                df["Year"].astype(str) + "-" + df["Month"].astype(str) + "-01"
-            )
+    if date_col is None:
+        if {"Year", "Month"}.issubset(sample.columns):
+            date_col = ("Year", "Month")
         else:
-            # 3. Last fallback — use index as date if numeric
-            if df.index.dtype != "datetime64[ns]":
-                print(f"[CSV] No Date, Year, Month columns found in {filename}. Skipping file.")
-                return None
-
-    df["Date"] = pd.to_datetime(df["Date"])
-    df = df.set_index("Date")
-
-    # Find first numeric column
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+            # 3. No usable index to fall back on for a freshly read CSV
+            print(f"[CSV] No Date, Year, Month columns found in {Path(path).name}. Skipping file.")
+            return None
+    # Find first numeric column (the date column itself becomes the index)
+    rest = sample.drop(columns=[date_col] if isinstance(date_col, str) else [])
+    numeric_cols = rest.select_dtypes(include=[np.number]).columns
     if len(numeric_cols) == 0:
         print("[CSV] No numeric columns found. Skipping.")
         return None
+    return date_col, numeric_cols[0]
 
-    col = numeric_cols[0]
+def load_local_csv(filename, raw_dir, chunksize=CSV_CHUNKSIZE, date_format=None):
+    """
+    Monthly mean of the first numeric column of a local CSV, read in chunks.
+    Only the date and value columns are parsed; per-month sums and counts are
+    accumulated chunk by chunk, so peak memory is bounded by chunksize rather
+    than file size. date_format is an explicit strptime format for the date
+    column (guessed once from the first rows if omitted). Column detection uses
+    the first rows of the file.
+    """
+    p = Path(raw_dir) / filename
+    if not p.exists():
+        print("Local CSV not found:", p)
+        return None
 
-    # Convert to monthly
-    monthly = df[[col]].resample("M").mean().rename(columns={col: filename.replace(".csv","")})
+    layout = detect_csv_layout(p)
+    if layout is None:
+        return None
+    date_col, col = layout
+
+    if isinstance(date_col, str):
+        usecols = [date_col, col]
+        dtype = {date_col: str}
+        if date_format is None:
+            head = pd.read_csv(p, usecols=[date_col], dtype=str, nrows=100)[date_col]
+            date_format = _guess_date_format(head)
+    else:
+        usecols = list(date_col) + ([col] if col not in date_col else [])
+        dtype = {"Year": "int64", "Month": "int64"}
+    if col not in dtype:
+        dtype[col] = "float64"
+
+    sums, counts = None, None
+    for chunk in pd.read_csv(p, usecols=usecols, dtype=dtype, chunksize=chunksize or 10**12):
+        if isinstance(date_col, str):
+            dates = pd.to_datetime(chunk[date_col], format=date_format)
+            codes = dates.dt.year * 12 + dates.dt.month - 1
+        else:
+            codes = chunk["Year"] * 12 + chunk["Month"] - 1
+        grouped = chunk[col].astype("float64").groupby(codes.to_numpy())
+        part_sum, part_count = grouped.sum(), grouped.count()
+        if sums is None:
+            sums, counts = part_sum, part_count
+        else:
+            sums = sums.add(part_sum, fill_value=0)
+            counts = counts.add(part_count, fill_value=0)
+
+    if sums is None or sums.empty:
+        print("[CSV] No rows found. Skipping.")
+        return None
+
+    # Convert to monthly (month-end labels, empty months as NaN, like resample("M").mean())
+    codes = np.arange(int(sums.index.min()), int(sums.index.max()) + 1)
+    sums, counts = sums.reindex(codes), counts.reindex(codes, fill_value=0)
+    means = (sums / counts.where(counts > 0)).to_numpy()
+    first = pd.Timestamp(year=int(codes[0] // 12), month=int(codes[0] % 12 + 1), day=1) + pd.offsets.MonthEnd(0)
+    index = pd.date_range(start=first, periods=len(codes), freq="M", name="Date")
+    monthly = pd.DataFrame({filename.replace(".csv",""): means}, index=index)
     return monthly
 
-def collect_all_indicators(raw_dir):
+def retrying(fn, label, retries=None, backoff=None, sleep=time.sleep):
+    """
+    Wrap fn so failed calls are retried `retries` times, waiting backoff * 2**attempt
+    seconds (plus up to 25% jitter) in between. The last error is re-raised.
+    """
+    retries = COLLECTION["retries"] if retries is None else retries
+    backoff = COLLECTION["backoff"] if backoff is None else backoff
+    def call(*args, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = backoff * 2 ** attempt * (1 + 0.25 * random.random())
+                print(f"[{label}] Attempt {attempt + 1} failed ({e}); retrying in {delay:.1f} s")
+                sleep(delay)
+    return call
+
+def _limited(sem, fn, *args, **kwargs):
+    with sem:
+        return fn(*args, **kwargs)
+
+def _collection_jobs(indicators, raw_dir, downloader, fred_fetcher, settings, start, end):
+    """
+    [(source, label, callable, [(indicator, column)])]: one job per Yahoo batch,
+    FRED series and CSV file. Each callable returns a monthly DataFrame (or None)
+    whose `column`s hold the listed indicators.
+    """
+    cache_dir = Path(raw_dir) / "yahoo_cache" if YAHOO_CACHE else None
+    timeout = settings["timeout"]
+    retry = dict(retries=settings["retries"], backoff=settings["backoff"])
+    jobs = []
+
+    yahoo = [ind for ind in indicators if ind['type'] == 'yahoo']
+    if yahoo:
+        # retry at the download, which fetch_yahoo_batch would otherwise just report;
+        # an empty result counts as a failure
+        dl = retrying(require_rows(downloader or yahoo_downloader(timeout)), "Yahoo", **retry)
+        chunk = settings["yahoo_chunk"] or len(yahoo)
+        for i in range(0, len(yahoo), chunk):
+            group = yahoo[i:i + chunk]
+            tickers = [ind['ticker'] for ind in group]
+            fn = lambda t=tickers: fetch_yahoo_batch(t, start=start, end=end,
+                                                     cache_dir=cache_dir, downloader=dl)
+            jobs.append(("yahoo", f"Yahoo batch {i // chunk + 1}", fn, [(ind, ind['ticker']) for ind in group]))
+
+    def fred_call(series_id, api_key, start=None, end=None):
+        if fred_fetcher is not None:
+            return fred_fetcher(series_id, api_key, start=start, end=end)
+        return fred_observations(series_id, api_key, start=start, end=end, timeout=timeout)
+
+    fred_get = retrying(fred_call, "FRED", **retry)
+    for ind in indicators:
+        if ind['type'] == 'fred':
+            fn = lambda sid=ind['fred_id']: fetch_fred(sid, start=start, end=end, fetcher=fred_get)
+            jobs.append(("fred", ind['fred_id'], fn, [(ind, ind['fred_id'])]))
+        elif ind['type'] == 'csv':
+            fn = lambda i=ind: load_local_csv(i['filename'], raw_dir, date_format=i.get('date_format'))
+            jobs.append(("csv", ind['filename'], fn, [(ind, ind['filename'].replace(".csv", ""))]))
+        elif ind['type'] != 'yahoo':
+            print("Unknown indicator type:", ind)
+    return jobs
+
+def collect_all_indicators(raw_dir, downloader=None, fred_fetcher=None, indicators=None, settings=None,
+                           start=None, end=None):
+    """
+    Fetch every indicator concurrently and return the wide monthly panel (columns
+    in `indicators` order, default config.INDICATORS) for start..end (default
+    config.TIMEFRAME_START / TIMEFRAME_END).
+    Yahoo batches, FRED series and local CSVs run as separate jobs on one thread
+    pool, at most settings["concurrency"][source] at a time per source, so network
+    waits overlap with each other and with CSV parsing. Jobs still running at the
+    deadline are reported and left out. downloader (yf.download signature) and
+    fred_fetcher (fred_observations signature) replace the network calls, e.g. for
+    offline runs; both are retried like the defaults.
+    """
     raw_dir = Path(raw_dir)
-    frames = []
-    for ind in INDICATORS:
-        try:
-            if ind['type'] == 'yahoo':
-                df = fetch_yahoo(
-                    ticker=ind['ticker'],
-                    start=TIMEFRAME_START,
-                    end=TIMEFRAME_END
-                )
-                df = df.rename(columns={ind['ticker']: ind['name']})
-                frames.append(df)
-            elif ind['type'] == 'fred':
-                try:
-                    df = fetch_fred(ind['fred_id'])
-                    df = df.rename(columns={ind['fred_id']: ind['name']})
-                    frames.append(df)
-                except Exception as e:
-                    print("FRED fetch failed for", ind['fred_id'], e)
-            elif ind['type'] == 'csv':
-                df = load_local_csv(ind['filename'], raw_dir)
-                if df is not None:
-                    df = df.rename(columns={df.columns[0]: ind['name']})
-                    frames.append(df)
-        except Exception as e:
-            print("Failed to load indicator", ind, e)
+    indicators = INDICATORS if indicators is None else indicators
+    settings = {**COLLECTION, **(settings or {})}
+    start = TIMEFRAME_START if start is None else start
+    end = TIMEFRAME_END if end is None else end
+    jobs = _collection_jobs(indicators, raw_dir, downloader, fred_fetcher, settings, start, end)
+    limits = {src: max(1, settings["concurrency"].get(src, 1)) for src, _, _, _ in jobs}
+    sems = {src: threading.BoundedSemaphore(n) for src, n in limits.items()}
+
+    t0 = time.perf_counter()
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, sum(limits.values())), thread_name_prefix="collect")
+    try:
+        futures = {pool.submit(_limited, sems[src], fn): (src, label, cols) for src, label, fn, cols in jobs}
+        done, pending = wait(futures, timeout=settings["deadline"])
+        for fut in pending:
+            print(f"Collection deadline ({settings['deadline']} s) passed; dropping {futures[fut][1]}")
+        for fut in done:
+            src, label, cols = futures[fut]
+            try:
+                df = fut.result()
+            except Exception as e:
+                print(f"Failed to load {label}:", e)
+                continue
+            if df is None:
+                continue
+            for ind, col in cols:
+                if col in df.columns:
+                    results[ind['name']] = df[[col]].rename(columns={col: ind['name']})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
+    frames = [results[ind['name']] for ind in indicators if ind['name'] in results]
+    counts = {src: sum(1 for s, *_ in jobs if s == src) for src in limits}
+    print(f"Collected {len(frames)}/{len(indicators)} indicators in {time.perf_counter() - t0:.1f} s "
+          f"({', '.join(f'{src}: {n} job(s)' for src, n in counts.items())})")
     if not frames:
         raise RuntimeError("No data collected. Provide CSVs or FRED/Yahoo access.")
     # merge
@@ -2,26 +2,39 @@
 """
 Cleaning, resampling, merging, handling missing values.
 """
-import pandas as pd
 import numpy as np
 from src.utils import ensure_index_datetime
+from src.panel import Panel, row_window, period_bins, bin_means
 from config import FREQ
 
-def prepare_dataset(df_raw, start=None, end=None):
-    df = df_raw.copy()
-    df = ensure_index_datetime(df)
+def prepare_panel(df_raw, start=None, end=None, dtype=None):
+    """
+    Monthly (FREQ) Panel of the raw frame between start and end: bin means, gaps
+    forward- then back-filled, columns with fewer than half the dates dropped.
+    Each raw column is reduced straight into the panel's array, so the only full-size
+    allocation is the result (df_raw is neither copied nor modified).
+    """
+    df = ensure_index_datetime(df_raw)
+    order = None if df.index.is_monotonic_increasing else np.argsort(df.index.to_numpy(), kind="stable")
+    index = df.index if order is None else df.index[order]
     # Restrict timeframe
-    if start:
-        df = df[df.index >= pd.to_datetime(start)]
-    if end:
-        df = df[df.index <= pd.to_datetime(end)]
+    rows = row_window(index, start, end)
+    index = index[rows]
     # Resample to monthly (or FREQ)
-    df = df.resample(FREQ).mean()
+    labels, starts, sizes = period_bins(index, FREQ)
+    # Standardize column names
+    panel = Panel.empty(labels, [c.strip() for c in df.columns], dtype)
+    for j, (_, s) in enumerate(df.items()):
+        x = s.to_numpy()
+        x = x[rows] if order is None else x[order[rows]]
+        panel.values[:, j] = bin_means(x, starts, sizes)
     # Forward fill then backward fill for small gaps
-    df = df.ffill().bfill()
+    panel.fill()
     # Drop columns with too many NaNs
-    threshold = int(len(df) * 0.5)
-    df = df.dropna(axis=1, thresh=threshold)
-    # Standardize column names
-    df.columns = [c.strip() for c in df.columns]
-    return df
+    return panel.drop_sparse(int(len(panel) * 0.5))
+
+def prepare_dataset(df_raw, start=None, end=None, dtype=None):
+    """
+    prepare_panel as a DataFrame (a view of the panel's array).
+    """
+    return prepare_panel(df_raw, start=start, end=end, dtype=dtype).to_frame()
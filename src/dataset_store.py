@@ -0,0 +1,117 @@
+"""
+Columnar store for collected and prepared panels.
+A wide panel is written to PROCESSED_DIR/<name>.parquet with one column per
+indicator and one row group per calendar year, so every (indicator, year) pair
+is its own column chunk; PROCESSED_DIR/<name>.json records the column order,
+frequency and the year of each row group. Readers memory-map the file and
+decode only the column chunks a column / date-range selection needs.
+The files are plain Parquet, so pd.read_parquet works on them too.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from config import PROCESSED_DIR
+
+def dataset_paths(name, root=None):
+    root = Path(root or PROCESSED_DIR)
+    return root / f"{name}.parquet", root / f"{name}.json"
+
+def read_meta(name, root=None):
+    _, meta_path = dataset_paths(name, root)
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def write_panel(df, name, root=None):
+    """
+    Replace dataset `name` with the wide panel `df` (DatetimeIndex, one column per
+    indicator). The data file is written under a temporary name and renamed into place.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    data_path, meta_path = dataset_paths(name, root)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    frame = df.sort_index()
+    frame.columns = [str(c) for c in frame.columns]
+    frame = frame.rename_axis("date").reset_index()
+    years = frame["date"].dt.year.to_numpy()
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+
+    tmp = data_path.with_name(f".{data_path.name}.tmp")
+    row_groups = []
+    with pq.ParquetWriter(tmp, schema) as writer:
+        # frame is sorted, so each year is one contiguous block -> one row group
+        bounds = [0] + [i for i in range(1, len(years)) if years[i] != years[i - 1]] + [len(years)]
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if b > a:
+                writer.write_table(pa.Table.from_pandas(frame.iloc[a:b], schema=schema, preserve_index=False))
+                row_groups.append(int(years[a]))
+    meta = {
+        "name": name,
+        "columns": list(frame.columns[1:]),
+        "index_name": df.index.name,
+        "freq": getattr(df.index, "freqstr", None),
+        "rows": int(len(frame)),
+        "start": df.index.min().strftime("%Y-%m-%d") if len(df) else None,
+        "end": df.index.max().strftime("%Y-%m-%d") if len(df) else None,
+        "row_group_years": row_groups,
+        "written": datetime.now().isoformat(timespec="seconds"),
+    }
+    os.replace(tmp, data_path)
+    meta_path.write_text(json.dumps(meta, indent=2))
+    print("Dataset written to:", data_path)
+    return data_path
+
+def read_panel(name, columns=None, start=None, end=None, root=None):
+    """
+    Load dataset `name` as a wide panel, optionally only `columns` and dates in [start, end].
+    Only the row groups (years) overlapping the range are read. Column order and
+    index frequency are restored from the metadata.
+    """
+    import pyarrow.parquet as pq
+    data_path, _ = dataset_paths(name, root)
+    if not data_path.exists():
+        raise FileNotFoundError(f"No dataset '{name}' at {data_path}")
+    meta = read_meta(name, root) or {}
+    pf = pq.ParquetFile(data_path, memory_map=True)
+    names = [c for c in pf.schema_arrow.names if c != "date"]
+    wanted = names if columns is None else [str(c) for c in columns]
+    missing = [c for c in wanted if c not in names]
+    if missing:
+        raise KeyError(f"Dataset '{name}' has no column(s): {', '.join(missing)}")
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    years = meta.get("row_group_years")
+    if years is None or len(years) != pf.num_row_groups:
+        groups = list(range(pf.num_row_groups))
+    else:
+        groups = [i for i, y in enumerate(years)
+                  if (start is None or y >= start.year) and (end is None or y <= end.year)]
+    table = pf.read_row_groups(groups, columns=["date"] + wanted)
+    wide = table.to_pandas().set_index("date")
+    if start is not None or end is not None:
+        wide = wide.loc[start:end]
+    wide.columns.name = None
+    wide.index.name = meta.get("index_name", "Date")
+    if meta.get("freq"):
+        try:
+            wide.index.freq = meta["freq"]
+        except ValueError:
+            pass  # a date subset with gaps need not be regular
+    return wide
+
+def store_panel(df, name):
+    """
+    write_panel for the pipeline stages; a failed write never stops the run.
+    """
+    try:
+        return write_panel(df, name)
+    except Exception as e:
+        print(f"Dataset store: could not write '{name}':", e)
+        return None
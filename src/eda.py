@@ -1,38 +1,61 @@
-
 """
 Exploratory Data Analysis and visualizations.
-Saves plots to out_dir.
+Saves plots to out_dir. Figures are built by the *_figure functions below and
+written through utils.savefig_obj, so they can render in the background pool.
 """
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-from statsmodels.tsa.seasonal import seasonal_decompose
 from src.utils import savefig_obj
+from src.correlation import correlation_matrix
+from config import CORRELATION
 
-def run_eda(df, out_dir):
-    # 1) time series overview
-    fig, axes = plt.subplots(len(df.columns), 1, figsize=(12, 3*len(df.columns)), sharex=True)
-    if len(df.columns) == 1:
-        axes = [axes]
+def overview_figure(df):
+    from src.render import new_figure
+    fig, axes = new_figure(figsize=(12, 3*len(df.columns)), nrows=len(df.columns), sharex=True)
     for ax, col in zip(axes, df.columns):
-        df[col].plot(ax=ax, title=col)
+        ax.plot(df.index, df[col])
+        ax.set_title(col)
         ax.set_ylabel(col)
-    plt.tight_layout()
-    savefig_obj(fig, out_dir, "time_series_overview.png")
+    fig.tight_layout()
+    return fig
 
-    # 2) correlation heatmap
-    corr = df.corr()
-    fig, ax = plt.subplots(figsize=(8,6))
-    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
+def correlation_figure(corr, annot=True):
+    import seaborn as sns
+    from src.render import new_figure
+    n = len(corr)
+    size = (8, 6) if n <= 30 else (min(4 + 0.12 * n, 30),) * 2
+    fig, (ax,) = new_figure(figsize=size, nrows=1)
+    sns.heatmap(corr, annot=annot, cmap="coolwarm", vmin=-1, vmax=1, ax=ax,
+                xticklabels=n <= 100, yticklabels=n <= 100)
     ax.set_title("Correlation matrix")
-    savefig_obj(fig, out_dir, "correlation_matrix.png")
+    return fig
+
+def decompose_figure(series, col):
+    from statsmodels.tsa.seasonal import seasonal_decompose
+    from src.render import new_figure
+    comp = seasonal_decompose(series.dropna(), period=12, model='additive', extrapolate_trend='freq')
+    fig, axes = new_figure(figsize=(10,8), nrows=4, sharex=True)
+    parts = [(comp.observed, col), (comp.trend, "Trend"), (comp.seasonal, "Seasonal")]
+    for ax, (values, label) in zip(axes, parts):
+        ax.plot(values.index, values)
+        ax.set_ylabel(label)
+    axes[-1].plot(comp.resid.index, comp.resid, marker="o", linestyle="none")
+    axes[-1].axhline(0, color="k", linewidth=0.8)
+    axes[-1].set_ylabel("Resid")
+    fig.tight_layout()
+    return fig
+
+def run_eda(df, out_dir):
+    # 1) time series overview
+    savefig_obj(overview_figure, out_dir, "time_series_overview.png", df)
+
+    # 2) correlation heatmap (skipped for panels too wide to read as one matrix)
+    n = df.shape[1]
+    if n <= CORRELATION["full_max"]:
+        corr = correlation_matrix(df)
+        savefig_obj(correlation_figure, out_dir, "correlation_matrix.png", corr, n <= CORRELATION["annot_max"])
+    else:
+        print(f"Correlation heatmap skipped: {n} series > CORRELATION['full_max']")
 
     # 3) seasonal decomposition for each series
     for col in df.columns:
-        try:
-            comp = seasonal_decompose(df[col].dropna(), period=12, model='additive', extrapolate_trend='freq')
-            fig = comp.plot()
-            fig.set_size_inches(10,8)
-            savefig_obj(fig, out_dir, f"decompose_{col}.png")
-        except Exception as e:
-            print("Decompose failed for", col, e)
+        savefig_obj(decompose_figure, out_dir, f"decompose_{col}.png", df[col], col, per_series=True)
@@ -0,0 +1,84 @@
+"""
+Lag-feature construction for the ML baseline, Granger tests and the VAR.
+Builds the whole lag design matrix with one strided NumPy view and a single copy,
+instead of inserting shifted columns into a DataFrame one at a time.
+lag_tensor memoises that build per panel contents, whatever the panel's dtype,
+so Granger, the VAR and the ML baseline in a run slice the same float64 array
+instead of rebuilding it.
+"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config import LAGS, VAR
+
+# built at least this deep, so one tensor serves ML (LAGS), Granger (4 lags) and
+# VAR order selection (one extra lag to difference the lags)
+LAG_DEPTH = max(LAGS, VAR["maxlags"] + 1, 4)
+MEMO_SIZE = 2   # panels kept; a run normally has one
+_memo = OrderedDict()
+
+def lag_names(columns, lags):
+    return [f"{col}_lag_{lag}" for col in columns for lag in range(1, lags+1)]
+
+def lag_matrix(values, lags, dtype=np.float32):
+    """
+    (T, N) array -> (T, N*lags) lag matrix. Column j*lags + (l-1) holds series j
+    shifted by l periods; its first l rows are NaN (same layout as lag_names).
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    T, N = values.shape
+    padded = np.full((T + lags, N), np.nan, dtype=dtype)
+    padded[lags:] = values
+    # windows[t, j, k] = padded[t+k, j]; reversing k gives [t, j, l-1] = values[t-l, j]
+    windows = sliding_window_view(padded, lags, axis=0)[:T, :, ::-1]
+    return np.ascontiguousarray(windows).reshape(T, N * lags)
+
+def _fingerprint(values):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((values.shape, values.dtype.str)).encode())
+    h.update(np.ascontiguousarray(values).data)
+    return h.hexdigest()
+
+def lag_tensor(values, lags, dtype=np.float64):
+    """
+    Read-only (T, N, depth) tensor with [t, j, l-1] = values[t-l, j] (NaN before the
+    start), depth >= lags; slice [:, :, :lags] for fewer lags. The build is memoised
+    per panel contents and output dtype, and made LAG_DEPTH deep, so Granger, the VAR
+    and the ML baseline share it (they all use the float64 default).
+    """
+    # keyed on the float64 values (exact for float32 panels), so a float32 panel and
+    # a float64 copy of it share one entry
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    key = (_fingerprint(values), np.dtype(dtype).str)
+    hit = _memo.get(key)
+    if hit is not None and hit.shape[2] >= lags:
+        _memo.move_to_end(key)
+        return hit
+    T, N = values.shape
+    depth = max(lags, LAG_DEPTH)
+    tensor = lag_matrix(values, depth, dtype=dtype).reshape(T, N, depth)
+    tensor.flags.writeable = False
+    _memo[key] = tensor
+    _memo.move_to_end(key)
+    while len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return tensor
+
+def panel_lags(values, lags, dtype=np.float64):
+    """
+    lag_matrix(values, lags, dtype) taken from the shared lag_tensor: a read-only
+    view when the tensor is exactly `lags` deep, otherwise one copy of the slice.
+    """
+    tensor = lag_tensor(values, lags, dtype=dtype)
+    T, N, depth = tensor.shape
+    if depth == lags:
+        return tensor.reshape(T, N * lags)
+    return np.ascontiguousarray(tensor[:, :, :lags]).reshape(T, N * lags)
+
+def clear_memo():
+    _memo.clear()
@@ -0,0 +1,201 @@
+"""
+Run instrumentation: wall time, CPU time and peak traced memory per stage and
+per series, optional cProfile dumps per stage, and a trace-event JSON file
+(open in chrome://tracing or https://ui.perfetto.dev).
+Everything here is a no-op unless a Recorder is active (main.py --instrument).
+Work done in worker processes is measured there (run_measured) and the records
+are shipped back with the task result.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+_active = None
+
+class Recorder:
+    """
+    Collects one record per span: name, cat ("stage" or "series"), series,
+    start (epoch seconds), wall_s, cpu_s, peak_bytes (None without memory
+    tracing; peak allocation above the level at span entry), pid.
+    """
+    def __init__(self, memory=True, profile_dir=None):
+        self.memory = memory
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.records = []
+        self.started = time.time()
+        self.pid = os.getpid()
+        self._stack = []
+
+    def add(self, record):
+        self.records.append(record)
+
+    def absorb(self, records):
+        self.records.extend(records)
+
+    def summary(self, cat=None):
+        """
+        Totals per (cat, name, series), slowest first.
+        """
+        totals = {}
+        for r in self.records:
+            if cat and r["cat"] != cat:
+                continue
+            key = (r["cat"], r["name"], r.get("series"))
+            t = totals.setdefault(key, {"cat": key[0], "name": key[1], "series": key[2], "calls": 0,
+                                        "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": None})
+            t["calls"] += 1
+            t["wall_s"] += r["wall_s"]
+            t["cpu_s"] += r["cpu_s"]
+            if r.get("peak_bytes") is not None:
+                t["peak_bytes"] = max(t["peak_bytes"] or 0, r["peak_bytes"])
+        return sorted(totals.values(), key=lambda t: t["wall_s"], reverse=True)
+
+    def trace_events(self):
+        events = []
+        for r in self.records:
+            args = {"cpu_s": round(r["cpu_s"], 6)}
+            if r.get("series") is not None:
+                args["series"] = r["series"]
+            if r.get("peak_bytes") is not None:
+                args["peak_bytes"] = r["peak_bytes"]
+            label = r["name"] if r.get("series") is None else f"{r['name']}:{r['series']}"
+            events.append({"name": label, "cat": r["cat"], "ph": "X",
+                           "ts": round((r["start"] - self.started) * 1e6),
+                           "dur": round(r["wall_s"] * 1e6), "pid": r["pid"], "tid": r.get("tid", 0),
+                           "args": args})
+        return events
+
+    def write(self, out_dir):
+        """
+        Write timings.json (records + summary) and trace.json; returns their paths.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        timings = out_dir / "timings.json"
+        timings.write_text(json.dumps({"records": self.records, "summary": self.summary()}, indent=2))
+        trace = out_dir / "trace.json"
+        trace.write_text(json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}))
+        return timings, trace
+
+def active():
+    """
+    The Recorder of this process, if any. Forked workers inherit the parent's
+    module state, so a Recorder only counts in the process that created it.
+    """
+    if _active is not None and _active.pid == os.getpid():
+        return _active
+    return None
+
+def enabled():
+    return active() is not None
+
+@contextmanager
+def recording(memory=True, profile_dir=None):
+    """
+    Activate a Recorder for the duration of the block and yield it.
+    """
+    global _active
+    previous = _active
+    rec = Recorder(memory=memory, profile_dir=profile_dir)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = rec
+    try:
+        yield rec
+    finally:
+        _active = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+@contextmanager
+def span(name, cat="series", series=None):
+    """
+    Measure the enclosed block. Nested spans each report their own peak: before
+    a child resets the tracemalloc peak, the parent's peak so far is saved on the stack.
+    """
+    rec = active()
+    if rec is None:
+        yield
+        return
+    tracing = rec.memory and tracemalloc.is_tracing()
+    frame = {"seen": 0}
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if rec._stack:
+            rec._stack[-1]["seen"] = max(rec._stack[-1]["seen"], peak)
+        tracemalloc.reset_peak()
+        frame["base"] = current
+    rec._stack.append(frame)
+    start, t0, c0 = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        rec._stack.pop()
+        peak = None
+        if tracing:
+            top = max(tracemalloc.get_traced_memory()[1], frame["seen"])
+            peak = top - frame["base"]
+            if rec._stack:
+                rec._stack[-1]["seen"] = max(rec._stack[-1]["seen"], top)
+        rec.add({"name": name, "cat": cat, "series": series, "start": start, "wall_s": wall, "cpu_s": cpu,
+                 "peak_bytes": peak, "pid": os.getpid(), "tid": threading.get_ident()})
+
+@contextmanager
+def profiled(name):
+    """
+    cProfile the enclosed block into <profile_dir>/<name>.prof when profiling is on.
+    """
+    rec = active()
+    if rec is None or rec.profile_dir is None:
+        yield
+        return
+    import cProfile
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        rec.profile_dir.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(rec.profile_dir / f"{name}.prof")
+
+def task_wrapper(fn, args, name, series=None):
+    """
+    (callable, args) that runs fn(*args) under a span and returns (result, records);
+    see run_measured. Used by the process-pool helpers when a Recorder is active.
+    """
+    return run_measured, (fn, args, name, series, active().memory)
+
+def run_measured(fn, args, name, series=None, memory=True):
+    """
+    fn(*args) measured as one span. In a worker process a private Recorder is used
+    and its records are returned for the parent to absorb; in the parent process the
+    span goes straight to the active Recorder and no records are returned.
+    """
+    if enabled():
+        with span(name, "series", series):
+            return fn(*args), []
+    with recording(memory=memory) as rec:
+        with span(name, "series", series):
+            out = fn(*args)
+    return out, rec.records
+
+def timing_table(rec, top=15):
+    """
+    Markdown table of stage times followed by the slowest per-series spans.
+    """
+    def mib(b):
+        return "" if b is None else f"{b / 2**20:.1f}"
+    lines = ["| Stage | Series | Calls | Wall (s) | CPU (s) | Peak (MiB) |",
+             "|---|---|---|---|---|---|"]
+    rows = [t for t in rec.summary("stage")] + rec.summary("series")[:top]
+    for t in rows:
+        lines.append(f"| {t['name']} | {t['series'] or ''} | {t['calls']} | {t['wall_s']:.3f} | "
+                     f"{t['cpu_s']:.3f} | {mib(t['peak_bytes'])} |")
+    return "\n".join(lines)
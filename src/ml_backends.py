@@ -0,0 +1,70 @@
+"""
+Registry of ML baseline backends.
+Each backend is a factory (params, n_jobs) -> unfitted scikit-learn style
+estimator, registered under the name used by config.ML_MODEL; its parameters
+come from config.ML_PARAMS[name] and can be overridden per call.
+n_jobs is the thread budget for one fit: callers that already run fits in
+parallel processes pass 1, serial callers pass ML_PARAMS' setting.
+
+    rf     random forest with bounded depth / leaf size, trees built in parallel
+    hgb    histogram gradient boosting (binned features, fast on long panels)
+    ridge  closed-form ridge regression (Cholesky on the normal equations)
+    lr     ordinary least squares
+"""
+from config import ML_PARAMS
+
+BACKENDS = {}
+
+def register(name):
+    def wrap(factory):
+        BACKENDS[name] = factory
+        return factory
+    return wrap
+
+def backend_params(name, **overrides):
+    params = dict(ML_PARAMS.get(name, {}))
+    params.update({k: v for k, v in overrides.items() if v is not None})
+    return params
+
+def make_model(name, n_jobs=None, **overrides):
+    """
+    Unfitted estimator for backend `name` with ML_PARAMS[name] plus overrides.
+    n_jobs=None uses the backend's configured thread count.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ML backend '{name}'. Choose from: {', '.join(sorted(BACKENDS))}")
+    params = backend_params(name, **overrides)
+    configured = params.pop("n_jobs", None)
+    return BACKENDS[name](params, configured if n_jobs is None else n_jobs)
+
+@register("rf")
+def _random_forest(params, n_jobs):
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_jobs=n_jobs, **params)
+
+@register("hgb")
+def _hist_gradient_boosting(params, n_jobs):
+    # threads come from OpenMP (OMP_NUM_THREADS); sklearn has no per-estimator setting
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    return HistGradientBoostingRegressor(**params)
+
+@register("ridge")
+def _ridge(params, n_jobs):
+    from sklearn.linear_model import Ridge
+    return Ridge(solver="cholesky", **params)
+
+@register("lr")
+def _linear(params, n_jobs):
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression(**params)
+
+def ridge_alpha(name):
+    """
+    Penalty of a linear backend (0 for "lr"), or None if `name` is not linear.
+    Lets the backtest update linear backends incrementally instead of refitting.
+    """
+    if name == "lr":
+        return 0.0
+    if name == "ridge":
+        return float(backend_params("ridge").get("alpha", 1.0))
+    return None
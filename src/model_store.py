@@ -0,0 +1,39 @@
+"""
+Per-indicator store of fitted SARIMA parameters (one JSON file per series).
+Monthly refreshes reuse the last estimates (warm start or filter-only update)
+instead of re-optimising every model from default starting values.
+"""
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+def _path(store_dir, name):
+    return Path(store_dir) / f"sarima_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(name))}.json"
+
+def series_hash(series):
+    """
+    Hash of a series' dates and values, used to check the stored fit's history is unchanged.
+    """
+    h = hashlib.sha256()
+    h.update(np.asarray(series.index.asi8).tobytes())
+    h.update(np.asarray(series.to_numpy(), dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+def load_record(store_dir, name):
+    p = _path(store_dir, name)
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text())
+    except (OSError, ValueError):
+        return None
+
+def save_record(store_dir, name, record):
+    p = _path(store_dir, name)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    record = dict(record, updated=datetime.now().isoformat(timespec="seconds"))
+    p.write_text(json.dumps(record, indent=2, default=str))
+    return p
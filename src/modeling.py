@@ -1,56 +1,150 @@
 
 """
-Modeling: SARIMA (univariate per series), VAR (placeholder), and ML lag-based baseline (RF or LR).
+Modeling: SARIMA (univariate per series), a joint VAR (src/var_model.py), and ML lag-based baseline (RF or LR).
 Saves forecasts and some diagnostics.
 """
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error
+from concurrent.futures import ProcessPoolExecutor
+from src import instrument
 from src.utils import savefig_obj
-from config import SARIMA_DEFAULTS, LAGS, ML_MODEL
+from src.features import panel_lags, lag_names
+from src.model_store import load_record, save_record, series_hash
+from src.order_search import select_order
+from config import (SARIMA_DEFAULTS, LAGS, ML_MODEL, MODEL_WORKERS, KEEP_MODEL_OBJECTS,
+                    SARIMA_INCREMENTAL, SARIMA_UPDATE_MODE, SARIMA_REFIT_EVERY, SARIMA_DRIFT_Z, MODEL_STORE_DIR,
+                    SARIMA_ORDER_SELECTION, SARIMA_SEARCH, VAR)
 
-def sarima_fit_forecast(series, periods, order=None, seasonal_order=None, enforce_stationarity=False):
+def _llf_stats(fit, start=0):
+    llf = np.asarray(fit.llf_obs)[start:]
+    return float(llf.mean()), float(llf.std())
+
+def fit_sarima(series, order=None, seasonal_order=None, enforce_stationarity=False, store_dir=None, name=None,
+               adf=None, search_jobs=None):
+    """
+    Fit SARIMA to a series. Returns (results, kind) where kind is "cold", "warm" or "filter".
+    order="auto" selects (order, seasonal_order) with order_search.select_order, using the
+    series' stationarity result `adf` for d and caching the choice in store_dir.
+    With a store_dir, the last stored parameters for `name` are reused when only new
+    observations were appended: "filter" applies them to the extended series without
+    re-optimising, "warm" re-optimises from them (config.SARIMA_UPDATE_MODE).
+    A cold refit happens when nothing usable is stored, the history was revised,
+    every SARIMA_REFIT_EVERY updates, or when the new observations' log-likelihood
+    drifts more than SARIMA_DRIFT_Z standard deviations below the fitted sample's.
+    """
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
     series = series.dropna()
+    if order == "auto":
+        order, seasonal_order = select_order(series, name=name, adf=adf, cache_dir=store_dir, n_jobs=search_jobs)
     if order is None:
         order = SARIMA_DEFAULTS['order']
     if seasonal_order is None:
         seasonal_order = SARIMA_DEFAULTS['seasonal_order']
     model = SARIMAX(series, order=order, seasonal_order=seasonal_order,
                     enforce_stationarity=enforce_stationarity, enforce_invertibility=False)
-    fit = model.fit(disp=False)
+    if store_dir is None:
+        return model.fit(disp=False), "cold"
+
+    rec = load_record(store_dir, name)
+    fit, kind = None, "cold"
+    usable = (
+        rec is not None
+        and tuple(rec["order"]) == tuple(order)
+        and tuple(rec["seasonal_order"]) == tuple(seasonal_order)
+        and rec["param_names"] == list(model.param_names)
+        and len(series) >= rec["nobs"]
+    )
+    if usable:
+        params = np.asarray(rec["params"])
+        appended = series_hash(series.iloc[:rec["nobs"]]) == rec["history_hash"]
+        n_new = len(series) - rec["nobs"]
+        due = rec["updates_since_refit"] + (1 if n_new else 0) >= SARIMA_REFIT_EVERY
+        if not appended:
+            # history was revised: re-optimise, but start from the old estimates
+            fit, kind = model.fit(start_params=params, disp=False), "warm"
+        elif not due:
+            fit = model.filter(params) if SARIMA_UPDATE_MODE == "filter" else \
+                model.fit(start_params=params, disp=False)
+            kind = SARIMA_UPDATE_MODE
+            if n_new:
+                new_llf = float(np.mean(np.asarray(fit.llf_obs)[-n_new:]))
+                scale = rec["llf_std"] / np.sqrt(n_new)
+                if new_llf < rec["llf_mean"] - SARIMA_DRIFT_Z * scale:
+                    print(f"[SARIMA] {name}: likelihood drift on new data, refitting.")
+                    fit, kind = None, "cold"
+    if fit is None:
+        fit = model.fit(disp=False)
+
+    burn = model.loglikelihood_burn
+    if kind == "filter":
+        llf_mean, llf_std = rec["llf_mean"], rec["llf_std"]
+        updates = rec["updates_since_refit"] + (1 if len(series) > rec["nobs"] else 0)
+    else:
+        llf_mean, llf_std = _llf_stats(fit, burn)
+        updates = 0 if kind == "cold" else rec["updates_since_refit"] + 1
+    save_record(store_dir, name, {
+        "order": list(order),
+        "seasonal_order": list(seasonal_order),
+        "param_names": list(model.param_names),
+        "params": [float(v) for v in np.asarray(fit.params)],
+        "nobs": int(len(series)),
+        "last_date": series.index[-1].strftime("%Y-%m-%d"),
+        "history_hash": series_hash(series),
+        "fit_kind": kind,
+        "updates_since_refit": updates,
+        "llf_mean": llf_mean,
+        "llf_std": llf_std,
+    })
+    return fit, kind
+
+def forecast_from_fit(fit, periods):
     pred = fit.get_forecast(steps=periods)
     forecast = pred.predicted_mean
     conf = pred.conf_int()
+    return forecast, conf
+
+def sarima_fit_forecast(series, periods, order=None, seasonal_order=None, enforce_stationarity=False,
+                        store_dir=None, name=None, adf=None):
+    fit, _ = fit_sarima(series, order=order, seasonal_order=seasonal_order,
+                        enforce_stationarity=enforce_stationarity, store_dir=store_dir, name=name, adf=adf)
+    forecast, conf = forecast_from_fit(fit, periods)
     return fit, forecast, conf
 
-def build_lag_features(df, lags=LAGS):
-    X = pd.DataFrame(index=df.index)
-    for col in df.columns:
-        for lag in range(1, lags+1):
-            X[f"{col}_lag_{lag}"] = df[col].shift(lag)
-    return X
-
-def ml_lag_forecast(df, target_col, periods, lags=LAGS, model_type=ML_MODEL):
-    X = build_lag_features(df, lags=lags)
-    y = df[[target_col]]
-    data = X.join(y).dropna()
-    if len(data) <= periods:
+def build_lag_features(df, lags=LAGS, as_array=False, dtype=np.float64):
+    """
+    Lagged copies of every column (1..lags), from the shared lag tensor of the panel.
+    Returns a DataFrame, or (ndarray of `dtype`, column names) with as_array=True; the
+    array may be a read-only view of the tensor, so copy it before writing to it.
+    """
+    X = panel_lags(df.to_numpy(), lags, dtype=dtype)
+    names = lag_names(df.columns, lags)
+    if as_array:
+        return X, names
+    return pd.DataFrame(X.astype(np.float64, copy=False), index=df.index, columns=names)
+
+def ml_lag_forecast(df, target_col, periods, lags=LAGS, model_type=ML_MODEL, n_jobs=None, X=None):
+    """
+    Fit backend `model_type` (src/ml_backends.py) on the lags of every column and
+    score the last `periods` rows. n_jobs: threads for the fit (None = ML_PARAMS).
+    X: the panel's lag matrix, panel_lags(df.to_numpy(), lags); callers fitting
+    several targets build it once and pass it, instead of once per target.
+    """
+    from sklearn.metrics import mean_squared_error
+    from src.ml_backends import make_model
+    if X is None:
+        X = panel_lags(df.to_numpy(), lags)
+    y = df[target_col].to_numpy(dtype=np.float64)
+    # rows where every lag and the target are known
+    keep = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+    X, y, index = X[keep], y[keep], df.index[keep]
+    if len(y) <= periods:
         raise RuntimeError("Not enough data for ML forecast.")
-    train = data.iloc[:-periods]
-    test = data.iloc[-periods:]
-    X_train = train.drop(columns=[target_col])
-    y_train = train[target_col]
-    X_test = test.drop(columns=[target_col])
-    y_test = test[target_col]
-    if model_type == "rf":
-        model = RandomForestRegressor(n_estimators=200, random_state=42)
-    else:
-        model = LinearRegression()
+    X_train, X_test = X[:-periods], X[-periods:]
+    y_train = y[:-periods]
+    y_test = pd.Series(y[-periods:], index=index[-periods:], name=target_col)
+    model = make_model(model_type, n_jobs=n_jobs)
     model.fit(X_train, y_train)
     preds = model.predict(X_test)
     mse = mean_squared_error(y_test, preds)
@@ -58,42 +152,248 @@ def ml_lag_forecast(df, target_col, periods, lags=LAGS, model_type=ML_MODEL):
     preds_s = pd.Series(preds, index=y_test.index, name=f"{target_col}_ml_pred")
     return model, preds_s, y_test, mse
 
-def run_modeling_pipeline(df, forecast_periods=12, out_dir="outputs"):
+class ForecastResult:
+    """
+    What downstream stages read from one SARIMA fit. The full SARIMAXResults
+    (design matrices, filter output, covariances) is only kept when keep_fit=True.
+    impulse holds the MA weights psi_0..psi_{h-1} of the forecast errors and resid the
+    one-step residuals after the burn-in; src/scenarios.py simulates paths from them.
+    """
+    __slots__ = ("aic", "forecast", "conf", "params", "order", "seasonal_order", "fit_kind", "fit",
+                 "impulse", "resid")
+
+    def __init__(self, aic, forecast, conf, params=None, order=None, seasonal_order=None, fit_kind=None, fit=None,
+                 impulse=None, resid=None):
+        self.aic = aic
+        self.forecast = forecast
+        self.conf = conf
+        self.params = params
+        self.order = order
+        self.seasonal_order = seasonal_order
+        self.fit_kind = fit_kind
+        self.fit = fit
+        self.impulse = impulse
+        self.resid = resid
+
+    @classmethod
+    def from_fit(cls, fit, forecast, conf, fit_kind=None, keep_fit=False):
+        steps = len(forecast)
+        resid = fit.resid.iloc[fit.model.loglikelihood_burn:] if isinstance(fit.resid, pd.Series) else None
+        return cls(aic=float(fit.aic), forecast=forecast, conf=conf,
+                   params=pd.Series(np.asarray(fit.params), index=fit.model.param_names),
+                   order=tuple(fit.model.order), seasonal_order=tuple(fit.model.seasonal_order),
+                   fit_kind=fit_kind, fit=fit if keep_fit else None,
+                   impulse=np.asarray(fit.impulse_responses(steps=steps - 1), dtype=np.float64).ravel()[:steps],
+                   resid=resid)
+
+class MLResult:
+    """
+    Holdout predictions and error of the ML baseline; the fitted estimator
+    is only kept when keep_model=True.
+    """
+    __slots__ = ("preds", "y_test", "mse", "model")
+
+    def __init__(self, preds, y_test, mse, model=None):
+        self.preds = preds
+        self.y_test = y_test
+        self.mse = float(mse)
+        self.model = model
+
+def fit_sarima_task(col, series, periods, keep_models=False, store_dir=None, order=None, adf=None, search_jobs=1):
+    """
+    Fit SARIMA for one indicator. Runs in a worker process, so it never raises:
+    returns (col, ForecastResult or None, error or None).
+    """
+    try:
+        fit, kind = fit_sarima(series, order=order, store_dir=store_dir, name=col, adf=adf, search_jobs=search_jobs)
+        forecast, conf = forecast_from_fit(fit, periods)
+        # make forecast index
+        start = series.index[-1] + pd.offsets.MonthBegin()
+        forecast.index = pd.date_range(start=start, periods=periods, freq='M')
+        conf.index = forecast.index
+        return col, ForecastResult.from_fit(fit, forecast, conf, fit_kind=kind, keep_fit=keep_models), None
+    except Exception as e:
+        return col, None, e
+
+def fit_ml_task(col, df, periods, keep_models=False, n_jobs=1, X=None):
+    """
+    Fit the ML lag baseline for one indicator; same contract as fit_sarima_task.
+    X: the panel's lag matrix (see ml_lag_forecast).
+    """
+    try:
+        model, preds, y_test, mse = ml_lag_forecast(df, col, periods=periods, n_jobs=n_jobs, X=X)
+        return col, MLResult(preds, y_test, mse, model=model if keep_models else None), None
+    except Exception as e:
+        return col, None, e
+
+def fit_ml_block_task(cols, df, periods, keep_models=False, n_jobs=1, X=None):
+    """
+    fit_ml_task for several targets of one panel, so the panel and its lag matrix
+    are sent to a worker once per block rather than once per target.
+    Returns (cols, [(col, result, error) per target], None).
+    """
+    out = []
+    for col in cols:
+        with instrument.span("fit_ml", series=col):
+            out.append(fit_ml_task(col, df, periods, keep_models, n_jobs, X))
+    return cols, out, None
+
+def ml_blocks(cols, n_blocks):
+    n_blocks = max(1, min(n_blocks, len(cols)))
+    return [list(b) for b in np.array_split(np.asarray(cols, dtype=object), n_blocks) if len(b)]
+
+def unpack_blocks(outs):
+    """
+    Flatten fit_ml_block_task outputs to (col, result, error); a block whose worker
+    crashed fails each of its targets with that error.
+    """
+    flat = []
+    for cols, res, err in outs:
+        flat += [(col, None, err) for col in cols] if err is not None else res
+    return flat
+
+def run_tasks(tasks, executor=None):
+    """
+    Run (fn, args) tasks serially or on an executor. Results come back in task
+    order regardless of completion order; a crashed worker only fails its own task.
+    When instrumentation is on, each task is timed per series (in the worker).
+    """
+    measured = instrument.enabled()
+    if measured:
+        # block tasks carry a list of series as their first argument
+        calls = [instrument.task_wrapper(fn, args, fn.__name__.replace("_task", ""),
+                                         args[0] if isinstance(args[0], str) else f"{len(args[0])} series")
+                 for fn, args in tasks]
+    else:
+        calls = tasks
+    if executor is None:
+        outs = [fn(*args) for fn, args in calls]
+    else:
+        futures = [executor.submit(fn, *args) for fn, args in calls]
+        outs = []
+        for (fn, args), fut in zip(tasks, futures):
+            try:
+                outs.append(fut.result())
+            except Exception as e:
+                outs.append(((args[0], None, e), []) if measured else (args[0], None, e))
+    if not measured:
+        return outs
+    results = []
+    for out, records in outs:
+        instrument.active().absorb(records)
+        results.append(out)
+    return results
+
+def sarima_figure(history, forecast, conf, col):
+    from src.render import new_figure
+    fig, (ax,) = new_figure(figsize=(10,4), nrows=1)
+    ax.plot(history.index, history, label="history")
+    ax.plot(forecast.index, forecast, label="sarima_forecast")
+    ax.fill_between(forecast.index, conf.iloc[:,0], conf.iloc[:,1], alpha=0.2)
+    ax.set_title(f"SARIMA forecast: {col}")
+    ax.legend()
+    return fig
+
+def ml_figure(y_test, preds, col, mse):
+    from src.render import new_figure
+    # plot ml preds vs actual
+    fig, (ax,) = new_figure(figsize=(10,4), nrows=1)
+    ax.plot(y_test.index, y_test, label=y_test.name)
+    ax.plot(preds.index, preds, label=preds.name)
+    ax.set_title(f"ML lag baseline: {col} (MSE={mse:.3f})")
+    ax.legend()
+    return fig
+
+def plot_model_results(df, model_res, out_dir="outputs"):
+    """
+    Per-series SARIMA and ML figures for a run_modeling_pipeline result.
+    """
+    for col, res in model_res.get("sarima", {}).items():
+        savefig_obj(sarima_figure, out_dir, f"sarima_{col}.png",
+                    df[col], res.forecast, res.conf, col, per_series=True)
+    for col, res in model_res.get("ml", {}).items():
+        savefig_obj(ml_figure, out_dir, f"ml_{col}.png",
+                    res.y_test, res.preds, col, res.mse, per_series=True)
+
+def sarima_options(store_dir=None):
+    """
+    (store_dir, order) for fit_sarima_task under the current config: the parameter
+    store is used for incremental refits or auto order selection.
+    """
+    if store_dir is None and (SARIMA_INCREMENTAL or SARIMA_ORDER_SELECTION == "auto"):
+        store_dir = MODEL_STORE_DIR
+    return store_dir, ("auto" if SARIMA_ORDER_SELECTION == "auto" else None)
+
+def ml_holdout_periods(n_rows, forecast_periods):
+    return min(forecast_periods, max(3, n_rows // 6))
+
+def run_modeling_pipeline(df, forecast_periods=12, out_dir="outputs", n_jobs=None, executor=None, plots=True,
+                          keep_models=None, store_dir=None, adf=None):
+    """
+    Fit SARIMA and the ML baseline for every column, and one VAR across all of them
+    (config.VAR; result under "var", None when disabled or infeasible).
+    n_jobs: worker processes (default config.MODEL_WORKERS; 1 = serial in-process).
+    executor: an existing pool to submit to instead of creating one.
+    plots: also write per-series figures (see plot_model_results).
+    keep_models: keep SARIMAXResults / fitted estimators on the result records
+    (default config.KEEP_MODEL_OBJECTS); otherwise only compact records are returned.
+    store_dir: SARIMA parameter store for incremental refits (default
+    config.MODEL_STORE_DIR when SARIMA_INCREMENTAL is on; see fit_sarima).
+    adf: {col: stationarity result} from run_stats, used for differencing when SARIMA_ORDER_SELECTION="auto".
+    """
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    n_jobs = MODEL_WORKERS if n_jobs is None else n_jobs
+    keep_models = KEEP_MODEL_OBJECTS if keep_models is None else keep_models
+    store_dir, order = sarima_options(store_dir)
+    adf = adf or {}
+    # parallelise the order search itself only when series are fitted serially
+    serial = executor is None and n_jobs == 1
+    search_jobs = SARIMA_SEARCH.get("n_jobs") if serial else 1
+    ml_periods = ml_holdout_periods(len(df), forecast_periods)
+    cols = list(df.columns)
+    tasks = [(fit_sarima_task, (col, df[col], forecast_periods, keep_models, store_dir, order, adf.get(col), search_jobs))
+             for col in cols]
+    # threads inside each ML fit only when nothing else runs in parallel
+    ml_threads = None if serial else 1
+    # one lag matrix for every ML target, sliced from the float64 tensor Granger and the
+    # VAR use; targets go out in one block per worker so X is pickled once per worker
+    X = panel_lags(df.to_numpy(), LAGS)
+    workers = 1 if serial else (getattr(executor, "_max_workers", None) or n_jobs or os.cpu_count() or 1)
+    tasks += [(fit_ml_block_task, (block, df, ml_periods, keep_models, ml_threads, X))
+              for block in ml_blocks(cols, workers)]
+
+    if executor is not None or serial:
+        results = run_tasks(tasks, executor)
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = run_tasks(tasks, pool)
+    results = results[:len(cols)] + unpack_blocks(results[len(cols):])
+
     sarima_results = {}
     ml_results = {}
-    for col in df.columns:
-        try:
-            fit, forecast, conf = sarima_fit_forecast(df[col], periods=forecast_periods)
-            # make forecast index
-            start = df.index[-1] + pd.offsets.MonthBegin()
-            forecast.index = pd.date_range(start=start, periods=forecast_periods, freq='M')
-            conf.index = forecast.index
-            sarima_results[col] = {"fit": fit, "forecast": forecast, "conf": conf}
-            # plot
-            fig, ax = plt.subplots(figsize=(10,4))
-            df[col].plot(ax=ax, label="history")
-            forecast.plot(ax=ax, label="sarima_forecast")
-            ax.fill_between(forecast.index, conf.iloc[:,0], conf.iloc[:,1], alpha=0.2)
-            ax.set_title(f"SARIMA forecast: {col}")
-            ax.legend()
-            savefig_obj(fig, out_dir, f"sarima_{col}.png")
-        except Exception as e:
-            print("SARIMA failed:", col, e)
+    for col, res, err in results[:len(cols)]:
+        if err is not None:
+            print("SARIMA failed:", col, err)
+            continue
+        sarima_results[col] = res
+    if store_dir is not None and sarima_results:
+        kinds = pd.Series([r.fit_kind for r in sarima_results.values()]).value_counts()
+        print("SARIMA fits:", ", ".join(f"{n} {k}" for k, n in kinds.items()))
+    for col, res, err in results[len(cols):]:
+        if err is not None:
+            print("ML baseline failed for", col, err)
+            continue
+        ml_results[col] = res
 
-        # ML baseline (try)
+    var_result = None
+    if VAR["enabled"]:
+        from src.var_model import run_var
         try:
-            model, preds, y_test, mse = ml_lag_forecast(df, col, periods=min(forecast_periods, max(3, len(df)//6)))
-            ml_results[col] = {"model": model, "preds": preds, "y_test": y_test, "mse": mse}
-            # plot ml preds vs actual
-            fig, ax = plt.subplots(figsize=(10,4))
-            combined = pd.concat([y_test, preds], axis=1)
-            combined.plot(ax=ax)
-            ax.set_title(f"ML lag baseline: {col} (MSE={mse:.3f})")
-            savefig_obj(fig, out_dir, f"ml_{col}.png")
+            var_result = run_var(df, forecast_periods, adf=adf, out_dir=out_dir)
         except Exception as e:
-            print("ML baseline failed for", col, e)
-
-    # Optionally VAR modeling could be added here
-    return {"sarima": sarima_results, "ml": ml_results}
+            print("VAR skipped:", e)
+    model_res = {"sarima": sarima_results, "ml": ml_results, "var": var_result}
+    if plots:
+        plot_model_results(df, model_res, out_dir)
+    return model_res
@@ -0,0 +1,124 @@
+"""
+SARIMA order selection.
+Searches (p,d,q)(P,D,Q,s) over a small grid in parallel. Every candidate first
+gets a short, capped optimisation; only the best few by information criterion
+are fitted to convergence. d comes from the stationarity results of run_stats
+when available, and the selected order is cached per series and data fingerprint.
+"""
+import hashlib
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+import numpy as np
+from src.model_store import series_hash
+from config import SARIMA_DEFAULTS, SARIMA_SEARCH, ADF_ALPHA
+
+CACHE_ENTRIES = 12
+
+def differencing_from_adf(adf, alpha=ADF_ALPHA, default=None):
+    """
+    The differencing order decided by stationarity.run_stationarity ("d"); for
+    bare ADF results, d=0 if the test rejects a unit root at `alpha`, else d=1.
+    """
+    if adf and adf.get("d") is not None:
+        return adf["d"]
+    if not adf or adf.get("pvalue") is None:
+        return default
+    return 0 if adf["pvalue"] < alpha else 1
+
+def candidate_orders(d, D, s, max_p, max_q, max_P, max_Q):
+    """
+    Grid of (order, seasonal_order), simplest models first.
+    """
+    grid = [((p, d, q), (P, D, Q, s))
+            for p, q, P, Q in product(range(max_p + 1), range(max_q + 1), range(max_P + 1), range(max_Q + 1))]
+    return sorted(grid, key=lambda c: (c[0][0] + c[0][2] + c[1][0] + c[1][2], c))
+
+def score_candidate(series, order, seasonal_order, criterion="aic", maxiter=None):
+    """
+    Information criterion of one candidate (inf if the fit fails).
+    """
+    import warnings
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = SARIMAX(series, order=order, seasonal_order=seasonal_order,
+                            enforce_stationarity=False, enforce_invertibility=False)
+            kwargs = {"disp": False}
+            if maxiter is not None:
+                kwargs["maxiter"] = maxiter
+            fit = model.fit(**kwargs)
+        ic = float(getattr(fit, criterion))
+        return ic if np.isfinite(ic) else np.inf
+    except Exception:
+        return np.inf
+
+def _score_all(series, candidates, criterion, maxiter, n_jobs):
+    if n_jobs == 1 or len(candidates) == 1:
+        return [score_candidate(series, o, so, criterion, maxiter) for o, so in candidates]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(score_candidate, series, o, so, criterion, maxiter) for o, so in candidates]
+        return [f.result() for f in futures]
+
+def _cache_path(cache_dir, name):
+    return Path(cache_dir) / f"order_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(name))}.json"
+
+def _fingerprint(series, space):
+    h = hashlib.sha256()
+    h.update(series_hash(series).encode())
+    h.update(json.dumps(space, sort_keys=True).encode())
+    return h.hexdigest()
+
+def select_order(series, name=None, adf=None, d=None, D=None, cache_dir=None, n_jobs=None, **search):
+    """
+    Best (order, seasonal_order) for `series` over the SARIMA_SEARCH grid.
+    adf: the run_stats stationarity result for this series (sets d); search: overrides of SARIMA_SEARCH.
+    With cache_dir and name, a previous selection for identical data and search space is reused.
+    """
+    opts = dict(SARIMA_SEARCH, **search)
+    series = series.dropna()
+    default_order, default_seasonal = SARIMA_DEFAULTS["order"], SARIMA_DEFAULTS["seasonal_order"]
+    if d is None:
+        d = differencing_from_adf(adf, default=default_order[1])
+    if D is None:
+        D = default_seasonal[1]
+    s = opts.get("s", default_seasonal[3])
+    space = {"d": d, "D": D, "s": s, **{k: opts[k] for k in ("max_p", "max_q", "max_P", "max_Q", "criterion")}}
+
+    cache_path, fp = None, None
+    if cache_dir is not None and name is not None:
+        cache_path, fp = _cache_path(cache_dir, name), _fingerprint(series, space)
+        if cache_path.exists():
+            try:
+                hit = json.loads(cache_path.read_text()).get(fp)
+            except (OSError, ValueError):
+                hit = None
+            if hit:
+                return tuple(hit["order"]), tuple(hit["seasonal_order"])
+
+    candidates = candidate_orders(d, D, s, opts["max_p"], opts["max_q"], opts["max_P"], opts["max_Q"])
+    n_jobs = opts.get("n_jobs") if n_jobs is None else n_jobs
+    criterion = opts["criterion"]
+    # 1) cheap pass: capped iterations, keep the best few
+    rough = _score_all(series, candidates, criterion, opts["prune_iter"], n_jobs)
+    ranked = [c for ic, c in sorted(zip(rough, candidates), key=lambda t: t[0]) if np.isfinite(ic)]
+    finalists = ranked[:opts["keep"]] or [(tuple(default_order), tuple(default_seasonal))]
+    # 2) converge the finalists only
+    final = _score_all(series, finalists, criterion, None, n_jobs)
+    best_ic, (order, seasonal_order) = min(zip(final, finalists), key=lambda t: t[0])
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            entries = json.loads(cache_path.read_text()) if cache_path.exists() else {}
+        except (OSError, ValueError):
+            entries = {}
+        entries[fp] = {"order": list(order), "seasonal_order": list(seasonal_order),
+                       criterion: None if not np.isfinite(best_ic) else best_ic, "space": space}
+        # keep the most recent selections only
+        entries = dict(list(entries.items())[-CACHE_ENTRIES:])
+        cache_path.write_text(json.dumps(entries, indent=2))
+    return tuple(order), tuple(seasonal_order)
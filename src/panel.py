@@ -0,0 +1,155 @@
+"""
+Compact panel: one C-contiguous 2-D array (rows = dates, columns = series)
+with a shared DatetimeIndex. float32 by default (config.PANEL_DTYPE), half
+the memory of pandas' float64 frames; numeric code that needs float64 converts
+its own copy. Date windows are searchsorted row slices (views), gap filling
+works in place, and to_frame() / column() hand out views, not copies.
+"""
+import numpy as np
+import pandas as pd
+from config import PANEL_DTYPE
+
+def row_window(index, start=None, end=None):
+    """
+    Rows of a sorted DatetimeIndex with start <= date <= end, as a slice.
+    """
+    lo = index.searchsorted(pd.Timestamp(start), side="left") if start is not None else 0
+    hi = index.searchsorted(pd.Timestamp(end), side="right") if end is not None else len(index)
+    return slice(lo, max(lo, hi))
+
+def period_bins(index, freq):
+    """
+    (labels, starts) of the resample(freq) bins of a sorted DatetimeIndex:
+    bin i covers rows starts[i] to starts[i+1] - 1 and may be empty.
+    Labels follow pandas' resample exactly.
+    """
+    counts = pd.Series(np.zeros(len(index), dtype=np.int8), index=index).resample(freq).size()
+    sizes = counts.to_numpy()
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+    return counts.index, starts, sizes
+
+def bin_means(x, starts, sizes):
+    """
+    NaN-skipping mean of a 1-D array over consecutive row bins (NaN for bins with no values),
+    summed in float64.
+    """
+    if len(x) == 0:
+        return np.full(len(starts), np.nan)
+    valid = ~np.isnan(x)
+    sums = np.add.reduceat(np.where(valid, x, 0.0), starts, dtype=np.float64)
+    counts = np.add.reduceat(valid, starts, dtype=np.intp)
+    # reduceat returns the start element for an empty bin
+    counts[sizes == 0] = 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def fill_gaps(values):
+    """
+    Forward-fill then back-fill NaNs down each column of a 2-D array, in place.
+    Only columns with gaps are touched.
+    """
+    gaps = np.flatnonzero(np.isnan(values).any(axis=0))
+    if len(values) == 0 or len(gaps) == 0:
+        return values
+    rows = np.arange(len(values))[:, None]
+    for block in (values, values[::-1]):          # the reversed view back-fills
+        sub = block[:, gaps]
+        # position of the last non-NaN row at or above each row
+        idx = np.where(np.isnan(sub), 0, rows)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        block[:, gaps] = np.take_along_axis(sub, idx, axis=0)
+    return values
+
+class Panel:
+    """
+    values (T, N) C-contiguous array, index DatetimeIndex of length T, columns list of N names.
+    """
+    __slots__ = ("values", "index", "columns")
+
+    def __init__(self, values, index, columns):
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape != (len(index), len(columns)):
+            raise ValueError(f"values of shape {values.shape} do not match {len(index)} dates x {len(columns)} columns")
+        self.values = values
+        self.index = index
+        self.columns = list(columns)
+
+    @classmethod
+    def empty(cls, index, columns, dtype=None):
+        return cls(np.full((len(index), len(columns)), np.nan, dtype=dtype or PANEL_DTYPE), index, columns)
+
+    @classmethod
+    def from_frame(cls, df, dtype=None):
+        """
+        Panel over a DatetimeIndex-ed frame, rows sorted by date. The data is copied
+        once, column by column, into the new array.
+        """
+        order = None if df.index.is_monotonic_increasing else np.argsort(df.index.to_numpy(), kind="stable")
+        index = df.index if order is None else df.index[order]
+        panel = cls.empty(index, df.columns, dtype)
+        for j, (_, s) in enumerate(df.items()):
+            x = s.to_numpy()
+            panel.values[:, j] = x if order is None else x[order]
+        return panel
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def window(self, start=None, end=None):
+        """
+        Rows with start <= date <= end, sharing this panel's memory.
+        """
+        rows = row_window(self.index, start, end)
+        return Panel(self.values[rows], self.index[rows], self.columns)
+
+    def column(self, name):
+        """
+        One series as a (strided) view into the panel.
+        """
+        return self.values[:, self.columns.index(name)]
+
+    def resample(self, freq):
+        """
+        New panel of NaN-skipping bin means (like DataFrame.resample(freq).mean()).
+        """
+        labels, starts, sizes = period_bins(self.index, freq)
+        out = Panel.empty(labels, self.columns, self.dtype)
+        for j in range(len(self.columns)):
+            out.values[:, j] = bin_means(self.values[:, j], starts, sizes)
+        return out
+
+    def fill(self):
+        """
+        Forward- then back-fill gaps in place; returns self.
+        """
+        fill_gaps(self.values)
+        return self
+
+    def drop_sparse(self, thresh):
+        """
+        Panel without the columns that have fewer than `thresh` values
+        (self when every column is kept).
+        """
+        keep = (~np.isnan(self.values)).sum(axis=0) >= thresh
+        if keep.all():
+            return self
+        return Panel(np.ascontiguousarray(self.values[:, keep]), self.index,
+                     [c for c, k in zip(self.columns, keep) if k])
+
+    def to_frame(self):
+        """
+        DataFrame view of the panel (no copy: writes to either side show in both).
+        """
+        return pd.DataFrame(self.values, index=self.index, columns=self.columns, copy=False)
@@ -0,0 +1,162 @@
+"""
+Stage runner with content-hashed checkpoints.
+Each stage is fingerprinted from its inputs (DataFrame contents or upstream
+fingerprints), the config values it reads and the source of the modules it runs.
+A stage whose fingerprint matches its last checkpoint is skipped and its saved
+outputs are reused.
+"""
+import hashlib
+import json
+import pickle
+from pathlib import Path
+import config
+from src import instrument
+
+class Stage:
+    """
+    One pipeline step. `inputs` name upstream stages whose outputs are passed to
+    `func` positionally; `config_keys` and `modules` feed the fingerprint.
+    Stages with checkpoint=False always run (their output is still hashed).
+    """
+    def __init__(self, name, func, inputs=(), config_keys=(), modules=(), checkpoint=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.config_keys = list(config_keys)
+        self.modules = list(modules)
+        self.checkpoint = checkpoint
+
+def content_hash(obj):
+    """
+    Stable hash of a DataFrame/Series (values, index and column names); None for anything else.
+    """
+    import pandas as pd
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h = hashlib.sha256()
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        names = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+        h.update(json.dumps([str(c) for c in names]).encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps([str(t) for t in obj.dtypes]).encode())
+        return h.hexdigest()
+    return None
+
+def code_hash(modules):
+    h = hashlib.sha256()
+    for rel in modules:
+        p = Path(config.BASE_DIR) / rel
+        h.update(rel.encode())
+        h.update(p.read_bytes() if p.exists() else b"")
+    return h.hexdigest()
+
+def config_snapshot(keys):
+    return json.dumps({k: getattr(config, k, None) for k in keys}, sort_keys=True, default=str)
+
+def fingerprint(stage, input_hashes):
+    h = hashlib.sha256()
+    h.update(stage.name.encode())
+    h.update(code_hash(stage.modules).encode())
+    h.update(config_snapshot(stage.config_keys).encode())
+    for name in stage.inputs:
+        h.update(f"{name}={input_hashes[name]}".encode())
+    return h.hexdigest()
+
+def _paths(checkpoint_dir, name):
+    checkpoint_dir = Path(checkpoint_dir)
+    return checkpoint_dir / f"{name}.pkl", checkpoint_dir / f"{name}.json"
+
+def _read_meta(checkpoint_dir, name):
+    data_path, meta_path = _paths(checkpoint_dir, name)
+    if not (data_path.exists() and meta_path.exists()):
+        return None
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def _save(checkpoint_dir, name, value, meta):
+    Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+    data_path, meta_path = _paths(checkpoint_dir, name)
+    with open(data_path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    meta_path.write_text(json.dumps(meta, indent=2))
+
+def _load(checkpoint_dir, name):
+    data_path, _ = _paths(checkpoint_dir, name)
+    with open(data_path, "rb") as f:
+        return pickle.load(f)
+
+def downstream_of(stages, names):
+    """
+    The given stages plus every stage that (transitively) consumes them.
+    """
+    out = set(names)
+    for st in stages:
+        if any(i in out for i in st.inputs):
+            out.add(st.name)
+    return out
+
+def upstream_of(stages, names):
+    """
+    The given stages plus everything they (transitively) depend on.
+    """
+    by_name = {st.name: st for st in stages}
+    out, todo = set(), list(names)
+    while todo:
+        n = todo.pop()
+        if n in out:
+            continue
+        out.add(n)
+        todo.extend(by_name[n].inputs)
+    return out
+
+def run_stages(stages, targets=None, force=(), force_from=(), checkpoint_dir=None):
+    """
+    Run `stages` (given in dependency order) up to `targets` (default: all).
+    force: stage names to rerun regardless of their fingerprint.
+    force_from: stage names to rerun together with everything downstream.
+    Returns {stage name: output} for the stages that ran, plus any skipped
+    stage that was loaded (because a later stage or `targets` needed it).
+    """
+    checkpoint_dir = Path(checkpoint_dir or config.CHECKPOINT_DIR)
+    names = [st.name for st in stages]
+    for n in list(force) + list(force_from) + list(targets or []):
+        if n not in names:
+            raise ValueError(f"Unknown stage '{n}'. Choose from: {', '.join(names)}")
+    needed = upstream_of(stages, targets) if targets else set(names)
+    forced = set(force) | downstream_of(stages, force_from)
+
+    results, hashes, pending = {}, {}, {}
+
+    def get(name):
+        if name in pending:
+            results[name] = _load(checkpoint_dir, name)
+            del pending[name]
+        return results[name]
+
+    for st in stages:
+        if st.name not in needed:
+            continue
+        fp = fingerprint(st, hashes)
+        meta = _read_meta(checkpoint_dir, st.name) if st.checkpoint else None
+        if meta is not None and meta.get("fingerprint") == fp and st.name not in forced:
+            print(f"[Pipeline] {st.name}: inputs unchanged, reusing checkpoint.")
+            pending[st.name] = True
+            hashes[st.name] = meta["output_hash"]
+            continue
+        args = [get(i) for i in st.inputs]
+        with instrument.span(st.name, cat="stage"), instrument.profiled(st.name):
+            value = st.func(*args)
+        results[st.name] = value
+        hashes[st.name] = content_hash(value) or fp
+        if st.checkpoint:
+            _save(checkpoint_dir, st.name, value, {
+                "stage": st.name,
+                "fingerprint": fp,
+                "output_hash": hashes[st.name],
+            })
+    # make explicitly requested outputs available to the caller
+    for name in list(pending):
+        if targets and name in targets:
+            get(name)
+    return results
@@ -0,0 +1,90 @@
+"""
+On-disk cache for raw daily ticker prices.
+One Parquet file per ticker plus a small JSON sidecar recording the date range
+that has already been downloaded, so repeat runs only fetch what is missing.
+"""
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+
+def _safe_name(ticker):
+    # tickers such as ^GSPC, DX-Y.NYB or CL=F are not all valid file names
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", ticker)
+
+def cache_paths(cache_dir, ticker):
+    cache_dir = Path(cache_dir)
+    stem = _safe_name(ticker)
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.json"
+
+def read_meta(cache_dir, ticker):
+    _, meta_path = cache_paths(cache_dir, ticker)
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def read_cached(cache_dir, ticker):
+    """
+    Return (series, meta) for a cached ticker, or (None, None) if nothing usable is cached.
+    """
+    data_path, _ = cache_paths(cache_dir, ticker)
+    meta = read_meta(cache_dir, ticker)
+    if meta is None or not data_path.exists():
+        return None, None
+    try:
+        df = pd.read_parquet(data_path)
+    except Exception as e:
+        print(f"[Cache] Could not read {data_path}: {e}")
+        return None, None
+    s = df.iloc[:, 0]
+    s.index = pd.to_datetime(s.index)
+    s.name = ticker
+    return s, meta
+
+def write_cached(cache_dir, ticker, series, start, end):
+    """
+    Store the daily series for a ticker and record the [start, end) window it covers.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    data_path, meta_path = cache_paths(cache_dir, ticker)
+    series = series[~series.index.duplicated(keep="last")].sort_index()
+    series.rename("value").to_frame().to_parquet(data_path)
+    meta = {
+        "ticker": ticker,
+        "start": pd.Timestamp(start).strftime("%Y-%m-%d"),
+        "end": pd.Timestamp(end).strftime("%Y-%m-%d"),
+        "rows": int(len(series)),
+        "first_obs": series.index.min().strftime("%Y-%m-%d") if len(series) else None,
+        "last_obs": series.index.max().strftime("%Y-%m-%d") if len(series) else None,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return meta
+
+def covered_end(end):
+    """
+    A window can only be marked as covered up to today; later dates have not happened yet.
+    """
+    today = pd.Timestamp.today().normalize()
+    return min(pd.Timestamp(end), today)
+
+def missing_windows(meta, start, end):
+    """
+    Date windows [a, b) that must be fetched so the cache covers [start, end).
+    Windows always touch the cached range, so coverage stays contiguous.
+    """
+    start, end = pd.Timestamp(start), covered_end(end)
+    if meta is None:
+        return [(start, end)] if start < end else []
+    c_start, c_end = pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+    windows = []
+    if start < c_start:
+        windows.append((start, c_start))
+    if end > c_end:
+        windows.append((c_end, end))
+    return windows
@@ -0,0 +1,117 @@
+"""
+Headless figure rendering.
+Figures are built with the object-oriented Figure API on the Agg canvas, so no
+pyplot global state is involved, and can be rendered in a pool of worker processes.
+utils.savefig_obj is the single entry point; settings come from config (PLOT_*).
+"""
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import config
+from src import instrument
+
+_pool = None
+_pending = []
+
+def new_figure(figsize=(10, 4), nrows=None, ncols=1, **subplot_kw):
+    """
+    A Figure on its own Agg canvas. With nrows, also returns the axes (always a list).
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    if nrows is None:
+        return fig
+    axes = fig.subplots(nrows, ncols, squeeze=False, **subplot_kw).ravel().tolist()
+    return fig, axes
+
+def should_render(per_series=False):
+    mode = config.PLOT_MODE
+    if mode == "none":
+        return False
+    if mode == "summary":
+        return not per_series
+    return True
+
+def output_path(out_dir, name):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / Path(name).with_suffix("." + config.PLOT_FORMAT.lstrip("."))
+
+def write_figure(fig, path, dpi=None):
+    fig.savefig(path, bbox_inches='tight', dpi=dpi or config.PLOT_DPI)
+    return path
+
+def render_task(builder, args, path, dpi):
+    """
+    Build and save one figure; runs in a worker process so it never raises.
+    """
+    try:
+        return write_figure(builder(*args), path, dpi), None
+    except Exception as e:
+        return path, e
+
+def _absorb(out):
+    # measured tasks return (result, records); see instrument.run_measured
+    out, records = out
+    if instrument.enabled():
+        instrument.active().absorb(records)
+    return out
+
+def _report(path, err):
+    if err is not None:
+        print(f"Render failed for {Path(path).name}: {err}")
+    else:
+        print("Saved:", path)
+
+def submit(builder, args, path):
+    """
+    Render builder(*args) to path: in the open render pool, or right away if there is none.
+    """
+    fn, fn_args = render_task, (builder, args, path, config.PLOT_DPI)
+    measured = instrument.enabled()
+    if measured:
+        fn, fn_args = instrument.task_wrapper(fn, fn_args, builder.__name__, Path(path).stem)
+    if _pool is None:
+        out = fn(*fn_args)
+        path, err = _absorb(out) if measured else out
+        _report(path, err)
+        return None if err else path
+    _pending.append((_pool.submit(fn, *fn_args), measured))
+    return path
+
+def drain():
+    """
+    Wait for queued figures, in submission order.
+    """
+    while _pending:
+        fut, measured = _pending.pop(0)
+        try:
+            out = fut.result()
+            _report(*(_absorb(out) if measured else out))
+        except Exception as e:
+            print("Render worker failed:", e)
+
+@contextmanager
+def render_pool(workers=None):
+    """
+    Render figures submitted inside the block on `workers` processes
+    (default config.PLOT_WORKERS; 1 renders inline). Waits for all figures on exit.
+    """
+    global _pool
+    workers = config.PLOT_WORKERS if workers is None else workers
+    if workers == 1 or _pool is not None or config.PLOT_MODE == "none":
+        yield
+        return
+    _pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield
+    finally:
+        try:
+            drain()
+        finally:
+            _pool.shutdown()
+            _pool = None
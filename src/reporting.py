@@ -3,37 +3,38 @@
 Generate markdown report with automatic formal macroeconomic narrative.
 """
 
+import os
+from datetime import datetime
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import json
+from src import instrument
 
 def generate_macro_narrative(df, stats_res, model_res, cognitive_flags):
     """
     Creates a formal, professional macroeconomic commentary.
     """
 
-    corr = stats_res.get("corr")
     sarima = model_res.get("sarima", {})
     ml = model_res.get("ml", {})
 
     # ---------------------------
     # 1. Identify key positive & negative correlations
     # ---------------------------
-    corr_un = corr.unstack()
-    corr_un = corr_un.dropna()
-    corr_un = corr_un[corr_un.index.get_level_values(0) != corr_un.index.get_level_values(1)]
-    corr_sorted = corr_un.sort_values(ascending=False)
-
-    top_pos = corr_sorted.head(3)
-    top_neg = corr_sorted.tail(3)
+    # each pair once, strongest first (see correlation.top_pairs)
+    corr_top = stats_res.get("corr_top")
+    if corr_top is None:
+        from src.correlation import top_pairs
+        corr_top = top_pairs(df)
+    top_pos, top_neg = corr_top["positive"], corr_top["negative"]
 
     # ---------------------------
     # 2. Identify strongest SARIMA trends
     # ---------------------------
     trend_lines = []
     for ind, res in sarima.items():
-        fc = res["forecast"]
+        fc = res.forecast
         if fc is not None and len(fc) > 1:
             direction = "rising" if fc.iloc[-1] > df[ind].iloc[-1] else "declining"
             trend_lines.append(f"{ind} appears {direction} over the forecast horizon.")
@@ -64,13 +65,20 @@ def generate_macro_narrative(df, stats_res, model_res, cognitive_flags):
         "and major equity indices."
     )
     narrative.append("\n**Most positively correlated pairs:**")
-    for (a,b),v in top_pos.items():
+    for a, b, v in top_pos:
         narrative.append(f"- {a} and {b}: correlation {v:.2f}")
 
     narrative.append("\n**Most negatively correlated pairs:**")
-    for (a,b),v in top_neg.items():
+    for a, b, v in top_neg:
         narrative.append(f"- {a} and {b}: correlation {v:.2f}")
 
+    leads = stats_res.get("lead_lag") or []
+    if leads:
+        narrative.append("\n**Strongest lead/lag relationships:**")
+        for d in leads:
+            narrative.append(f"- {d['leader']} leads {d['follower']} by {d['lag']} period(s): "
+                             f"correlation {d['corr']:.2f}")
+
     # SARIMA trend summary
     narrative.append("\n### Forecasted Macro Trends\n")
     if trend_lines:
@@ -104,12 +112,72 @@ def generate_macro_narrative(df, stats_res, model_res, cognitive_flags):
     return "\n".join(narrative)
 
 
-def generate_report(df, stats_res, model_res, cognitive_flags, out_dir="outputs/report"):
+def _num(v):
+    # JSON has no NaN / inf; dashboards get null instead
+    if v is None:
+        return None
+    v = float(v)
+    return v if np.isfinite(v) else None
+
+def _points(forecast, lower, upper):
+    return [{"horizon": h, "date": d.strftime("%Y-%m-%d"), "mean": _num(m), "lower": _num(lo), "upper": _num(up)}
+            for h, (d, m, lo, up) in enumerate(zip(forecast.index, forecast, lower, upper), start=1)]
+
+def analysis_summary(df, stats_res, model_res, cognitive_flags):
+    """
+    Everything the report states, as plain JSON types: per-indicator SARIMA and VAR
+    forecasts with their bands (one point per horizon), ML holdout errors, ADF,
+    Granger p-values and the cognitive labels. This is what src/serving.py loads.
+    """
+    forecasts = {str(col): {} for col in df.columns}
+    for col, res in model_res.get("sarima", {}).items():
+        forecasts[str(col)]["sarima"] = {
+            "order": list(res.order) if res.order else None,
+            "seasonal_order": list(res.seasonal_order) if res.seasonal_order else None,
+            "aic": _num(res.aic),
+            "points": _points(res.forecast, res.conf.iloc[:, 0], res.conf.iloc[:, 1]),
+        }
+    var = model_res.get("var")
+    if var is not None:
+        for col in var.columns:
+            forecasts[str(col)]["var"] = {
+                "order": var.order,
+                "points": _points(var.forecast[col], var.lower[col], var.upper[col]),
+            }
+    granger = [{"cause": str(x), "effect": str(y), "pvalue": _num(p)}
+               for (x, y), p in stats_res.get("granger", {}).items()]
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "time_range": {"start": df.index.min().strftime("%Y-%m-%d"), "end": df.index.max().strftime("%Y-%m-%d")},
+        "indicators": [str(c) for c in df.columns],
+        "forecasts": forecasts,
+        "ml": {str(col): {"mse": _num(res.mse)} for col, res in model_res.get("ml", {}).items()},
+        "var": None if var is None else {"order": var.order, "ic": var.ic, "differenced": var.differenced,
+                                         "nobs": var.nobs},
+        "adf": stats_res.get("adf"),
+        "granger": granger,
+        "cognitive": cognitive_flags,
+    }
+
+def write_summary(path, summary):
+    """
+    Write the summary JSON under a temporary name and rename it into place, so a
+    reader (the serving layer) never sees a half-written file.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(summary, default=str, indent=2))
+    os.replace(tmp, path)
+    return path
+
+def generate_report(df, stats_res, model_res, cognitive_flags, out_dir="outputs/report", universe=None):
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     md = []
     md.append("# Macroeconomic Analysis Report\n")
+    if universe:
+        md.append(f"**Universe:** {universe['name']} (scope {universe.get('geo_scope')})\n")
     md.append(f"**Time range:** {df.index.min().date()} to {df.index.max().date()}\n")
     md.append("**Indicators analyzed:** " + ", ".join(df.columns) + "\n")
     md.append("\n---\n")
@@ -131,29 +199,48 @@ def generate_report(df, stats_res, model_res, cognitive_flags, out_dir="outputs/
     # SARIMA summary
     md.append("\n### SARIMA Forecast Diagnostics\n")
     for k, v in model_res.get("sarima", {}).items():
-        if v.get("fit") is not None:
-            md.append(f"- {k}: AIC={v['fit'].aic:.2f}")
+        if v.aic is not None:
+            md.append(f"- {k}: AIC={v.aic:.2f}")
 
     # ML
     md.append("\n### Machine Learning Baseline\n")
     for k,v in model_res.get("ml", {}).items():
-        md.append(f"- {k}: MSE={v.get('mse'):.4f}")
+        md.append(f"- {k}: MSE={v.mse:.4f}")
+
+    # VAR
+    var = model_res.get("var")
+    if var is not None:
+        from src.var_model import strongest_responses
+        md.append("\n### Vector Autoregression (joint model)\n")
+        md.append(f"VAR({var.order}) selected by {var.ic.upper()}, fitted on "
+                  f"{'first differences' if var.differenced else 'levels'} ({var.nobs} observations).\n")
+        last = var.forecast.index[-1].date()
+        for k in var.columns:
+            md.append(f"- {k}: {var.forecast[k].iloc[-1]:.2f} by {last} "
+                      f"(band {var.lower[k].iloc[-1]:.2f} to {var.upper[k].iloc[-1]:.2f})")
+        responses = strongest_responses(var)
+        if responses:
+            md.append("\n**Largest impulse responses after 12 periods** (in residual s.d. of the response):")
+            for imp, resp, v in responses:
+                md.append(f"- shock to {imp} -> {resp}: {v:+.2f}")
 
     # Cognitive flags
     md.append("\n### Structural vs Temporary Indicator Classification\n")
     for k,v in cognitive_flags.items():
         md.append(f"- {k}: {v.get('label')} (score {v.get('score')})")
 
+    # Timing of this run (only when the pipeline runs with --instrument)
+    rec = instrument.active()
+    if rec is not None and rec.records:
+        md.append("\n### Run Timing\n")
+        md.append("Stages completed before the report, then the slowest per-series steps.\n")
+        md.append(instrument.timing_table(rec))
+
     # Write markdown + JSON
     md_path = out_dir / "report_summary.md"
     md_path.write_text("\n".join(md))
 
-    (out_dir / "analysis_summary.json").write_text(
-        json.dumps({
-            "adf": stats_res.get("adf"),
-            "cognitive": cognitive_flags
-        }, default=str, indent=2)
-    )
+    write_summary(out_dir / "analysis_summary.json", analysis_summary(df, stats_res, model_res, cognitive_flags))
 
     print("Report written to:", md_path)
     return md_path
@@ -0,0 +1,188 @@
+"""
+Monte Carlo scenarios: joint future paths for every indicator.
+Each SARIMA forecast error is a moving average of future shocks,
+e_h = sum_k psi_k * eps_{h-k}, with the psi weights stored on ForecastResult.
+Shocks are drawn jointly across indicators, either Gaussian with the
+(Ledoit-Wolf shrunk) correlation of the models' one-step residuals, or by
+bootstrapping whole dates of those residuals, which keeps their
+cross-sectional dependence and fat tails. Paths are generated `chunk` at a
+time as (chunk, horizon, series) arrays and folded into running statistics:
+a fixed-range histogram per (horizon, series) for quantiles, exact counts for
+tail probabilities and decline breadth, and the most extreme joint paths for
+downside / upside scenarios. Memory is bounded by the chunk size, not n_paths.
+"""
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import SCENARIOS
+
+SPAN_SD = 8.0   # histogram range: forecast mean +- SPAN_SD analytic standard deviations
+SUMMARY_COLUMNS = ["indicator", "last", "forecast", "median", "downside", "upside", "prob_decline"]
+
+def _skipped(reason):
+    print("Scenarios skipped:", reason)
+    return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+def _shock_model(sarima, cols):
+    """
+    (scales (N,), correlation Cholesky factor (N, N), aligned residual rows (m, N)).
+    """
+    from sklearn.covariance import ledoit_wolf
+    resid = pd.concat({c: sarima[c].resid for c in cols}, axis=1).dropna()
+    scales = np.array([np.sqrt(sarima[c].params["sigma2"]) if "sigma2" in sarima[c].params.index
+                       else np.nanstd(sarima[c].resid) for c in cols])
+    rows = resid.to_numpy(dtype=np.float64)
+    if len(rows) < 3:
+        return scales, np.eye(len(cols)), rows
+    sd = rows.std(axis=0)
+    sd[sd == 0] = 1.0
+    cov, _ = ledoit_wolf(rows / sd)
+    d = np.sqrt(np.diag(cov))
+    corr = cov / np.outer(d, d)
+    return scales, np.linalg.cholesky(corr), rows
+
+def _toeplitz(impulse, horizon):
+    # T[n, h, j] = psi_n[h - j] for j <= h: maps shocks at steps j to errors at step h
+    N = impulse.shape[0]
+    T = np.zeros((N, horizon, horizon))
+    for h in range(horizon):
+        T[:, h, :h + 1] = impulse[:, h::-1]
+    return T
+
+class _Extremes:
+    """
+    The k lowest- and k highest-scoring paths' end values seen so far.
+    """
+    def __init__(self, k, n_series):
+        self.k = k
+        self.scores = {"downside": np.empty(0), "upside": np.empty(0)}
+        self.ends = {"downside": np.empty((0, n_series)), "upside": np.empty((0, n_series))}
+
+    def add(self, scores, ends):
+        for side, sign in (("downside", 1.0), ("upside", -1.0)):
+            s = np.concatenate([self.scores[side], sign * scores])
+            e = np.concatenate([self.ends[side], ends])
+            if len(s) > self.k:
+                keep = np.argpartition(s, self.k - 1)[:self.k]
+                s, e = s[keep], e[keep]
+            self.scores[side], self.ends[side] = s, e
+
+def simulate_paths(mean, impulse, scales, chol, rows, n_paths, chunk, method, rng):
+    """
+    Yield (chunk, horizon, N) arrays of simulated levels until n_paths are drawn.
+    """
+    horizon, N = mean.shape
+    T = _toeplitz(impulse, horizon)
+    done = 0
+    while done < n_paths:
+        c = min(chunk, n_paths - done)
+        if method == "bootstrap":
+            eps = rows[rng.integers(len(rows), size=(c, horizon))]
+        else:
+            eps = (rng.standard_normal((c, horizon, N)) @ chol.T) * scales
+        yield mean + np.einsum("nhj,cjn->chn", T, eps)
+        done += c
+
+def run_scenarios(df, model_res, out_dir=None, n_paths=None, chunk=None, method=None, seed=None):
+    """
+    Simulate joint paths from the SARIMA results in model_res and write
+    scenario_quantiles.csv, scenario_tails.csv, scenario_summary.csv and
+    scenario_meta.json to out_dir. Returns the summary DataFrame (one row per indicator),
+    empty when there is nothing to simulate (e.g. every SARIMA fit failed).
+    """
+    n_paths = n_paths or SCENARIOS["n_paths"]
+    chunk = chunk or SCENARIOS["chunk"]
+    method = method or SCENARIOS["method"]
+    seed = SCENARIOS["seed"] if seed is None else seed
+    quantiles = np.asarray(SCENARIOS["quantiles"])
+    thresholds = np.asarray(SCENARIOS["thresholds"])
+    bins = SCENARIOS["bins"]
+
+    sarima = model_res.get("sarima", {})
+    cols = [c for c in df.columns if c in sarima and getattr(sarima[c], "impulse", None) is not None
+            and sarima[c].resid is not None]
+    if not cols:
+        return _skipped("no SARIMA results with impulse weights to simulate from")
+    index = sarima[cols[0]].forecast.index
+    mean = np.column_stack([sarima[c].forecast.to_numpy() for c in cols])
+    impulse = np.stack([sarima[c].impulse for c in cols])
+    horizon, N = mean.shape
+    scales, chol, rows = _shock_model(sarima, cols)
+    if method == "bootstrap" and len(rows) < 2:
+        return _skipped("too few common residual dates to bootstrap")
+    last = df[cols].ffill().iloc[-1].to_numpy(dtype=np.float64)
+
+    # fixed histogram range per (horizon, series) from the analytic forecast s.d.
+    sd = np.sqrt(np.cumsum(impulse.T ** 2, axis=0)) * (rows.std(axis=0) if method == "bootstrap" else scales)
+    sd = np.where(sd > 0, sd, 1.0)
+    lo, width = mean - SPAN_SD * sd, 2 * SPAN_SD * sd / bins
+    cells = horizon * N
+    hist = np.zeros(cells * (bins + 2), dtype=np.int64)
+    base = np.arange(cells).reshape(horizon, N) * (bins + 2)
+    levels = last * (1 + thresholds[:, None])           # (K, N)
+    below = np.zeros((len(thresholds), horizon, N), dtype=np.int64)
+    breadth = np.zeros(N + 1, dtype=np.int64)
+    declines = np.zeros(N, dtype=np.int64)
+    total = np.zeros((horizon, N))
+    extremes = _Extremes(max(1, int(round(SCENARIOS["tail_share"] * n_paths))), N)
+
+    rng = np.random.default_rng(seed)
+    for paths in simulate_paths(mean, impulse, scales, chol, rows, n_paths, chunk, method, rng):
+        # bin 0 / bins+1 collect values outside the range
+        idx = np.clip(np.floor((paths - lo) / width).astype(np.int64) + 1, 0, bins + 1)
+        hist += np.bincount((idx + base).ravel(), minlength=hist.size)
+        below += (paths[None] < levels[:, None, None, :]).sum(axis=1)
+        ends = paths[:, -1, :]
+        down = ends < last
+        declines += down.sum(axis=0)
+        breadth += np.bincount(down.sum(axis=1), minlength=N + 1)
+        total += paths.sum(axis=0)
+        extremes.add(((ends - mean[-1]) / sd[-1]).mean(axis=1), ends)
+
+    # quantiles by linear interpolation inside the histogram bin that crosses each level
+    cum = np.cumsum(hist.reshape(horizon, N, bins + 2), axis=2)
+    qvals = np.empty((len(quantiles), horizon, N))
+    for i, q in enumerate(quantiles):
+        target = q * n_paths
+        b = np.clip((cum < target).sum(axis=2), 1, bins)        # first bin reaching target
+        prev = np.take_along_axis(cum, (b - 1)[..., None], axis=2)[..., 0]
+        here = np.take_along_axis(cum, b[..., None], axis=2)[..., 0]
+        frac = np.where(here > prev, (target - prev) / np.maximum(here - prev, 1), 0.5)
+        qvals[i] = lo + (b - 1 + np.clip(frac, 0, 1)) * width
+    probs = below / n_paths
+
+    dates = [d.strftime("%Y-%m-%d") for d in index]
+    qframe = pd.DataFrame({
+        "date": np.repeat(dates, N), "horizon": np.repeat(np.arange(1, horizon + 1), N),
+        "indicator": np.tile(cols, horizon), "mean": (total / n_paths).ravel(),
+        **{f"q{q * 100:g}": qvals[i].ravel() for i, q in enumerate(quantiles)},
+    })
+    tails = pd.DataFrame([
+        {"indicator": c, "horizon": h + 1, "date": dates[h], "change": float(t),
+         "level": float(levels[k, n]), "prob": float(probs[k, h, n] if t < 0 else 1 - probs[k, h, n]),
+         "side": "below" if t < 0 else "above"}
+        for k, t in enumerate(thresholds) for h in range(horizon) for n, c in enumerate(cols)
+    ])
+    median = qvals[np.argmin(np.abs(quantiles - 0.5))][-1]
+    summary = pd.DataFrame({
+        "indicator": cols, "last": last, "forecast": mean[-1], "median": median,
+        "downside": extremes.ends["downside"].mean(axis=0), "upside": extremes.ends["upside"].mean(axis=0),
+        "prob_decline": declines / n_paths,
+    })
+    print(f"Scenarios: {n_paths:,} {method} paths x {N} series x {horizon} periods")
+
+    if out_dir is not None:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        qframe.to_csv(out_dir / "scenario_quantiles.csv", index=False)
+        tails.to_csv(out_dir / "scenario_tails.csv", index=False)
+        summary.to_csv(out_dir / "scenario_summary.csv", index=False)
+        (out_dir / "scenario_meta.json").write_text(json.dumps({
+            "n_paths": n_paths, "method": method, "seed": seed, "horizon": horizon, "series": N,
+            "tail_share": SCENARIOS["tail_share"],
+            # breadth[k]: share of paths where k indicators end below their last value
+            "breadth": (breadth / n_paths).round(6).tolist(),
+        }, indent=2))
+        print("Scenarios written to:", out_dir)
+    return summary
@@ -0,0 +1,178 @@
+"""
+Local HTTP/JSON service over the last pipeline run.
+Loads REPORT_DIR/analysis_summary.json into an in-memory index whose responses
+are serialised once at load time, so a request is a dict lookup and a socket
+write. The file's mtime is checked (at most every reload_interval seconds)
+on requests; a newer file is loaded and swapped in whole, so readers always
+see one consistent run.
+
+    GET /health                          run timestamp and index size
+    GET /indicators                      names, models and horizons
+    GET /forecast/<indicator>            every horizon and model
+    GET /forecast/<indicator>/<h>        one horizon (1-based), every model
+    GET /stats/<indicator>               ADF, cognitive label, ML error, Granger in/out
+    GET /granger?cause=X&effect=Y        Granger p-values, filtered by either side
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+from config import REPORT_DIR, SERVING
+
+SUMMARY_FILE = "analysis_summary.json"
+
+def _dump(obj):
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+class ForecastIndex:
+    """
+    Prebuilt response bodies for one analysis summary, keyed by route.
+    """
+    def __init__(self, summary, mtime=None):
+        self.generated = summary.get("generated")
+        self.mtime = mtime
+        self.indicators = list(summary.get("indicators", []))
+        self.granger = summary.get("granger", [])
+        forecasts = summary.get("forecasts", {})
+        adf, cognitive, ml = summary.get("adf") or {}, summary.get("cognitive") or {}, summary.get("ml") or {}
+
+        self.causes, self.effects = causes, effects = {}, {}
+        for g in self.granger:
+            causes.setdefault(g["cause"], []).append(g)
+            effects.setdefault(g["effect"], []).append(g)
+
+        self.bodies = {}
+        listing = []
+        for name in self.indicators:
+            models = forecasts.get(name, {})
+            horizons = {}
+            for model, fc in models.items():
+                for pt in fc.get("points", []):
+                    h = horizons.setdefault(pt["horizon"], {"indicator": name, "horizon": pt["horizon"],
+                                                            "date": pt["date"]})
+                    h[model] = {"mean": pt["mean"], "lower": pt["lower"], "upper": pt["upper"]}
+            for h, body in horizons.items():
+                self.bodies[("forecast", name, h)] = _dump(body)
+            self.bodies[("forecast", name)] = _dump({"indicator": name, "models": models})
+            self.bodies[("stats", name)] = _dump({
+                "indicator": name,
+                "adf": adf.get(name),
+                "cognitive": cognitive.get(name),
+                "ml": ml.get(name),
+                "granger_causes": causes.get(name, []),
+                "granger_caused_by": effects.get(name, []),
+            })
+            listing.append({"indicator": name, "models": sorted(models), "horizons": max(horizons, default=0)})
+        self.bodies[("indicators",)] = _dump({"indicators": listing})
+        self.bodies[("health",)] = _dump({"status": "ok", "generated": self.generated, "mtime": mtime,
+                                          "indicators": len(self.indicators)})
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        mtime = path.stat().st_mtime
+        return cls(json.loads(path.read_text()), mtime=mtime)
+
+    def granger_body(self, cause=None, effect=None):
+        if cause is not None:
+            rows = [g for g in self.causes.get(cause, []) if effect is None or g["effect"] == effect]
+        elif effect is not None:
+            rows = self.effects.get(effect, [])
+        else:
+            rows = self.granger
+        return _dump({"granger": rows})
+
+class SummaryStore:
+    """
+    The current ForecastIndex for a summary file, reloaded when the file changes.
+    """
+    def __init__(self, path, reload_interval=None):
+        self.path = Path(path)
+        self.reload_interval = SERVING["reload_interval"] if reload_interval is None else reload_interval
+        self.index = ForecastIndex.load(self.path)
+        self.reloads = 0
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval and self._lock.acquire(blocking=False):
+            # one thread checks; the others keep serving the index they have
+            try:
+                self._checked = now
+                self.maybe_reload()
+            finally:
+                self._lock.release()
+        return self.index
+
+    def maybe_reload(self):
+        try:
+            mtime = self.path.stat().st_mtime
+            if mtime == self.index.mtime:
+                return False
+            self.index = ForecastIndex.load(self.path)
+        except (OSError, ValueError) as e:
+            print("Serving: reload failed, keeping the previous index:", e)
+            return False
+        self.reloads += 1
+        print("Serving: reloaded", self.path, f"(generated {self.index.generated})")
+        return True
+
+NOT_FOUND = _dump({"error": "not found"})
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    store = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        index = self.store.current()
+        if parts == ["granger"]:
+            q = parse_qs(url.query)
+            body = index.granger_body(cause=q.get("cause", [None])[0], effect=q.get("effect", [None])[0])
+        else:
+            key = tuple(parts)
+            if len(parts) == 3 and parts[0] == "forecast" and parts[2].isdigit():
+                key = ("forecast", parts[1], int(parts[2]))
+            body = index.bodies.get(key)
+        self._send(200 if body is not None else 404, body if body is not None else NOT_FOUND)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(path=None, host=None, port=None, reload_interval=None):
+    """
+    A ThreadingHTTPServer answering from the summary at `path` (default
+    REPORT_DIR/analysis_summary.json); port 0 picks a free port.
+    """
+    path = Path(path or REPORT_DIR / SUMMARY_FILE)
+    if not path.exists():
+        raise FileNotFoundError(f"No analysis summary at {path}; run `python main.py report` first")
+    store = SummaryStore(path, reload_interval=reload_interval)
+    handler = type("Handler", (ForecastHandler,), {"store": store})
+    server = ThreadingHTTPServer((host or SERVING["host"], SERVING["port"] if port is None else port), handler)
+    server.daemon_threads = True
+    server.store = store
+    return server
+
+def serve(path=None, host=None, port=None):
+    server = make_server(path, host, port)
+    host, port = server.server_address[:2]
+    print(f"Serving {server.store.path} on http://{host}:{port} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
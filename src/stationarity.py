@@ -0,0 +1,152 @@
+"""
+Stationarity tests across a panel: ADF (and optionally KPSS) per column, run
+in blocks on a worker pool. The ADF lag chosen by the AIC search is cached per
+series and data fingerprint, so unchanged series skip the search (the test
+with the cached lag gives the same statistic). mode="fixed" never searches:
+it reuses the last cached lag for the series, or a rule-of-thumb lag.
+Each result carries the differencing order `d` that SARIMA order search uses.
+"""
+import json
+import os
+import warnings
+from pathlib import Path
+import numpy as np
+from src import instrument
+from src.model_store import series_hash
+from config import STATIONARITY, MODEL_STORE_DIR
+
+CACHE_FILE = "adf_lags.json"
+BLOCK_SIZE = 8   # series per worker task; single ADF fits are too small to ship one by one
+
+def default_lag(nobs):
+    """
+    Said-Dickey style rule of thumb, (nobs-1)^(1/3), used by mode="fixed" without a cached lag.
+    """
+    return int(np.floor(np.cbrt(max(nobs - 1, 1))))
+
+def adf_test(series, lag=None):
+    """
+    ADF with a constant. lag=None searches lags by AIC; otherwise the given lag is used as is.
+    """
+    from statsmodels.tsa.stattools import adfuller
+    s = series.dropna()
+    if len(s) < 10:
+        return {"adf_stat": None, "pvalue": None}
+    if lag is None:
+        res = adfuller(s, autolag='AIC')
+    else:
+        res = adfuller(s, maxlag=min(lag, len(s) // 2 - 2), autolag=None)
+    return {"adf_stat": res[0], "pvalue": res[1], "lag": int(res[2]), "nobs": int(res[3]),
+            "crit": {k: float(v) for k, v in res[4].items()}}
+
+def kpss_test(series):
+    """
+    KPSS level-stationarity test (null: stationary).
+    """
+    from statsmodels.tsa.stattools import kpss
+    s = series.dropna()
+    if len(s) < 10:
+        return {"kpss_stat": None, "kpss_pvalue": None}
+    with warnings.catch_warnings():
+        # p-values are clipped to the table range [0.01, 0.1]; statsmodels warns when they are
+        warnings.simplefilter("ignore")
+        stat, pvalue, _, _ = kpss(s, regression="c", nlags="auto")
+    return {"kpss_stat": float(stat), "kpss_pvalue": float(pvalue)}
+
+def differencing_order(result, alpha):
+    """
+    d=0 when ADF rejects a unit root at `alpha` and (if run) KPSS does not reject
+    stationarity; d=1 otherwise. None when the test could not run.
+    """
+    if result.get("pvalue") is None:
+        return None
+    stationary = result["pvalue"] < alpha
+    if result.get("kpss_pvalue") is not None:
+        stationary = stationary and result["kpss_pvalue"] >= alpha
+    return 0 if stationary else 1
+
+def test_block(label, items, alpha, kpss=False):
+    """
+    Test [(col, series, lag or None)] in one task. Same contract as the modeling
+    tasks: returns (label, [(col, result, error)], None).
+    """
+    out = []
+    for col, series, lag in items:
+        with instrument.span("adf", series=col):
+            try:
+                res = adf_test(series, lag=lag)
+                if kpss:
+                    res.update(kpss_test(series))
+                res["d"] = differencing_order(res, alpha)
+                out.append((col, res, None))
+            except Exception as e:
+                out.append((col, None, e))
+    return label, out, None
+
+def _read_cache(cache_dir):
+    path = Path(cache_dir) / CACHE_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _write_cache(cache_dir, cache):
+    path = Path(cache_dir) / CACHE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+
+def run_stationarity(df, mode=None, kpss=None, alpha=None, n_jobs=None, cache_dir=None, executor=None):
+    """
+    {col: {"adf_stat", "pvalue", "lag", "nobs", "crit", "d"[, "kpss_stat", "kpss_pvalue"]}}.
+    mode: "aic" (search lags unless cached for identical data) or "fixed"
+    (no search); defaults come from config.STATIONARITY.
+    cache_dir: where the lag cache lives (default config.MODEL_STORE_DIR); False disables it.
+    """
+    from src.modeling import run_tasks
+    mode = mode or STATIONARITY["mode"]
+    kpss = STATIONARITY["kpss"] if kpss is None else kpss
+    alpha = STATIONARITY["alpha"] if alpha is None else alpha
+    n_jobs = STATIONARITY["n_jobs"] if n_jobs is None else n_jobs
+    cache_dir = MODEL_STORE_DIR if cache_dir is None else cache_dir
+    cache = _read_cache(cache_dir) if cache_dir else {}
+
+    items, fingerprints = [], {}
+    for col in df.columns:
+        s = df[col].dropna()
+        fingerprints[col] = series_hash(s)
+        hit = cache.get(str(col))
+        if mode == "fixed":
+            lag = hit["lag"] if hit else (STATIONARITY.get("fixed_lag") or default_lag(len(s)))
+        else:
+            lag = hit["lag"] if hit and hit["fingerprint"] == fingerprints[col] else None
+        items.append((col, s, lag))
+
+    blocks = [items[i:i + BLOCK_SIZE] for i in range(0, len(items), BLOCK_SIZE)]
+    tasks = [(test_block, (f"block{i}", block, alpha, kpss)) for i, block in enumerate(blocks)]
+    if executor is not None or n_jobs == 1 or len(blocks) == 1:
+        outs = run_tasks(tasks, executor)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(len(blocks), n_jobs or os.cpu_count() or 1)) as pool:
+            outs = run_tasks(tasks, pool)
+
+    results, searched = {}, 0
+    for (_, block_out, err), block in zip(outs, blocks):
+        if err is not None:
+            block_out = [(col, None, err) for col, _, _ in block]
+        for (col, res, err), (_, _, lag) in zip(block_out, block):
+            if err is not None or res is None:
+                print("ADF failed:", col, err)
+                results[col] = {"adf_stat": None, "pvalue": None, "d": None}
+                continue
+            res["mode"] = mode
+            results[col] = res
+            if lag is None and "lag" in res:
+                searched += 1
+                cache[str(col)] = {"fingerprint": fingerprints[col], "lag": res["lag"]}
+    if cache_dir and searched:
+        _write_cache(cache_dir, cache)
+    print(f"Stationarity: {len(results)} series, {searched} lag searches ({mode} mode)")
+    return results
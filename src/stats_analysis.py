@@ -4,35 +4,113 @@ Statistical analysis: stationarity tests (ADF), Granger causality, pairwise stat
 """
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.stattools import adfuller, grangercausalitytests
+from src import instrument
+from src.features import lag_tensor
+from config import CORRELATION
 
 def run_adf(series):
-    s = series.dropna()
-    if len(s) < 10:
-        return {"adf_stat": None, "pvalue": None}
-    res = adfuller(s, autolag='AIC')
-    return {"adf_stat": res[0], "pvalue": res[1]}
+    from src.stationarity import adf_test
+    return adf_test(series)
 
-def run_granger(df, maxlag=4):
+def granger_pairwise(df, maxlag=4):
+    """
+    Reference implementation: one statsmodels grangercausalitytests call per ordered pair.
+    """
+    from statsmodels.tsa.stattools import grangercausalitytests
     results = {}
     cols = df.columns
     for y in cols:
-        for x in cols:
-            if x == y:
+        with instrument.span("granger", series=y):
+            for x in cols:
+                if x == y:
+                    continue
+                try:
+                    test = grangercausalitytests(df[[y, x]].dropna(), maxlag=maxlag, verbose=False)
+                    pvals = [test[l+1][0]['ssr_chi2test'][1] for l in range(maxlag)]
+                    results[(x, y)] = min(pvals)
+                except Exception:
+                    results[(x, y)] = None
+    return results
+
+def granger_batched(df, maxlag=4):
+    """
+    All-pairs Granger causality (ssr chi2 test, as in statsmodels) with stacked least squares.
+    The lag tensor is built once and shared with the ML baseline and the VAR. For each lag order and target y the restricted model
+    [const, y lags] is factorised once (QR) and shared by every candidate x: by
+    Frisch-Waugh the unrestricted SSR only needs the x lags projected off that basis,
+    so all x are solved together as a batch of small (lag x lag) systems.
+    Expects a panel without missing values. Returns {(x, y): min p-value over lags}.
+    """
+    from scipy.stats import chi2
+    values = df.to_numpy(dtype=np.float64)
+    T, N = values.shape
+    lags = lag_tensor(values, maxlag, dtype=np.float64)
+    cols = list(df.columns)
+    pmin = np.full((N, N), np.inf)          # pmin[x, y]
+    infeasible = np.zeros((N, N), dtype=bool)
+
+    for L in range(1, maxlag + 1):
+        n = T - L
+        y_all = values[L:]
+        X = np.ascontiguousarray(lags[L:, :, :L]).reshape(n, N * L)
+        # a constant series (over this sample) makes the test undefined for its pairs
+        const = np.ptp(y_all, axis=0) == 0
+        ones = np.ones((n, 1))
+        for j in range(N):
+            with instrument.span("granger", series=cols[j]):
+                if const[j]:
+                    infeasible[:, j] = True
+                    continue
+                Q, _ = np.linalg.qr(np.hstack([X[:, j*L:(j+1)*L], ones]))
+                y = y_all[:, j]
+                e = y - Q @ (Q.T @ y)
+                ssr_r = e @ e
+                Z = (X - Q @ (Q.T @ X)).reshape(n, N, L)
+                G = np.einsum('tnl,tnk->nlk', Z, Z)
+                b = np.einsum('tnl,t->nl', Z, e)
+                G[j], b[j] = np.eye(L), 0.0
+                try:
+                    sol = np.linalg.solve(G, b[..., None])[..., 0]
+                except np.linalg.LinAlgError:
+                    sol = np.einsum('nlk,nk->nl', np.linalg.pinv(G), b)
+                ssr_u = ssr_r - (b * sol).sum(axis=1)
+                tss = ((y - y.mean()) ** 2).sum()
+                bad = const | (ssr_u <= 0) | (ssr_u / tss < np.finfo(float).eps)
+                infeasible[bad, j] = True
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    stat = n * (ssr_r - ssr_u) / ssr_u
+                pmin[:, j] = np.minimum(pmin[:, j], chi2.sf(stat, L))
+
+    results = {}
+    for j, y in enumerate(cols):
+        for i, x in enumerate(cols):
+            if i == j:
                 continue
-            try:
-                test = grangercausalitytests(df[[y, x]].dropna(), maxlag=maxlag, verbose=False)
-                pvals = [test[l+1][0]['ssr_chi2test'][1] for l in range(maxlag)]
-                results[(x, y)] = min(pvals)
-            except Exception:
-                results[(x, y)] = None
+            results[(x, y)] = None if infeasible[i, j] else float(pmin[i, j])
     return results
 
-def run_stats(df, out_dir=None):
-    # ADF per series
-    adf_res = {col: run_adf(df[col]) for col in df.columns}
-    # Correlation matrix
-    corr = df.corr()
+def run_granger(df, maxlag=4, method="batched"):
+    """
+    Min ssr-chi2 p-value over lags 1..maxlag for every ordered pair, keyed (x, y) for "x -> y".
+    method="pairwise" (or a panel with gaps) uses the per-pair statsmodels loop.
+    """
+    if method == "pairwise" or df.isna().any().any():
+        return granger_pairwise(df, maxlag=maxlag)
+    return granger_batched(df, maxlag=maxlag)
+
+def run_stats(df, out_dir=None, cache_dir=None, adf=None):
+    """
+    Stationarity, correlations and Granger causality for a panel. adf: precomputed
+    {col: stationarity result} (e.g. shared between batch universes) to skip the tests.
+    """
+    from src.stationarity import run_stationarity
+    # ADF (+ KPSS) per series, in parallel with cached lag selection
+    adf_res = adf if adf is not None else run_stationarity(df, cache_dir=cache_dir)
+    from src.correlation import correlation_matrix, top_pairs, lead_lag
+    # Correlations: the full matrix only for moderate panels, top pairs always
+    corr = correlation_matrix(df) if df.shape[1] <= CORRELATION["full_max"] else None
+    corr_top = top_pairs(df)
+    leads = lead_lag(df)
     # Granger causality (brief)
     try:
         granger = run_granger(df.dropna(), maxlag=4)
@@ -43,8 +121,8 @@ def run_stats(df, out_dir=None):
     if out_dir:
         with open(f"{out_dir}/adf_summary.txt", "w") as f:
             for k, v in adf_res.items():
-                f.write(f"{k}: adf_stat={v['adf_stat']}, p={v['pvalue']}\n")
+                f.write(f"{k}: adf_stat={v['adf_stat']}, p={v['pvalue']}, lag={v.get('lag')}, d={v.get('d')}\n")
         with open(f"{out_dir}/granger_summary.txt", "w") as f:
             for (x,y), p in granger.items():
                 f.write(f"{x} -> {y}: p={p}\n")
-    return {"adf": adf_res, "corr": corr, "granger": granger}
+    return {"adf": adf_res, "corr": corr, "corr_top": corr_top, "lead_lag": leads, "granger": granger}
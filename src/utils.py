@@ -1,27 +1,37 @@
 # src/utils.py
-import os
-from pathlib import Path
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-def savefig_obj(fig, out_dir, name):
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    path = out_dir / name
-    fig.savefig(path, bbox_inches='tight', dpi=150)
-    plt.close(fig)
-    print("Saved:", path)
-    return path
+def savefig_obj(fig, out_dir, name, *args, per_series=False):
+    """
+    Single entry point for writing figures.
+    `fig` is a Figure (saved now) or a builder that returns one when called with
+    *args; builders run in the render pool when one is open (see src/render.py).
+    Per-series figures are skipped with PLOT_MODE="summary", everything with "none".
+    Returns the output path, or None if the figure was skipped.
+    """
+    from matplotlib.figure import Figure
+    from src import render
+    if not render.should_render(per_series):
+        return None
+    path = render.output_path(out_dir, name)
+    if isinstance(fig, Figure):
+        render.write_figure(fig, path)
+        print("Saved:", path)
+        return path
+    return render.submit(fig, args, path)
 
 def ensure_index_datetime(df):
-    df = df.copy()
-    if not isinstance(df.index, pd.DatetimeIndex):
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'])
-            df = df.set_index('Date')
-        else:
-            raise ValueError("DataFrame must have a DatetimeIndex or a 'Date' column")
+    """
+    df itself when it already has a DatetimeIndex (no copy); otherwise a new
+    frame indexed by its 'Date' column. The caller's frame is never modified.
+    """
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df
+    if 'Date' not in df.columns:
+        raise ValueError("DataFrame must have a DatetimeIndex or a 'Date' column")
+    df = df.set_index('Date')
+    df.index = pd.to_datetime(df.index)
     return df
 
 def rolling_snr(series, window=6):
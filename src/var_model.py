@@ -0,0 +1,231 @@
+"""
+Vector autoregression fitted once across the whole panel.
+All equations are solved together as one least-squares problem whose design
+comes from the shared lag tensor (features.lag_tensor), the same array the ML
+baseline and the Granger tests slice. Lag orders 1..maxlags are compared by
+information criterion on a common sample; the chosen model gives joint
+forecasts with MSE-based bands for every indicator and orthogonalised impulse
+responses for all shocks at once, as one (horizon, response, impulse) array.
+With differencing, the VAR runs on first differences (whose lags are taken from
+the level tensor) and forecasts / responses are accumulated back to levels.
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.features import lag_tensor
+from config import VAR
+
+class VARResult:
+    """
+    Fitted VAR(p): intercept (N,), coefs (p, N, N) with coefs[l, i, j] the effect of
+    series j at lag l+1 on series i, residual covariance sigma, forecasts and
+    bands (DataFrames, one column per indicator, in levels) and irf (H+1, N, N),
+    irf[h, i, j] = response of level i, h periods after a one-s.d. shock to j.
+    """
+    __slots__ = ("order", "ic", "criteria", "differenced", "nobs", "columns", "intercept", "coefs", "sigma",
+                 "forecast", "lower", "upper", "irf")
+
+    def __init__(self, order, ic, criteria, differenced, nobs, columns, intercept, coefs, sigma,
+                 forecast=None, lower=None, upper=None, irf=None):
+        self.order = order
+        self.ic = ic
+        self.criteria = criteria
+        self.differenced = differenced
+        self.nobs = nobs
+        self.columns = columns
+        self.intercept = intercept
+        self.coefs = coefs
+        self.sigma = sigma
+        self.forecast = forecast
+        self.lower = lower
+        self.upper = upper
+        self.irf = irf
+
+def modelled_lags(values, maxlags, difference=False):
+    """
+    (Y, L, first): the modelled series Y (levels or first differences, (T, N)), its
+    lags L[t, j, l-1] for l = 1..maxlags, and the first row where all of them are known.
+    """
+    d = int(bool(difference))
+    tensor = lag_tensor(values, maxlags + d, dtype=np.float64)
+    if d:
+        # Δy[t-l] = y[t-l] - y[t-l-1], read straight off the level lags
+        Y = values - tensor[:, :, 0]
+        L = tensor[:, :, :maxlags] - tensor[:, :, 1:maxlags + 1]
+    else:
+        Y, L = values, tensor[:, :, :maxlags]
+    return Y, L, maxlags + d
+
+def _design(L, p, rows):
+    # [1, y_{t-1} (all series), ..., y_{t-p}]: the statsmodels coefficient layout
+    lagged = L[rows, :, :p].transpose(0, 2, 1)
+    n, N = lagged.shape[0], lagged.shape[2]
+    Z = np.empty((n, 1 + N * p))
+    Z[:, 0] = 1.0
+    Z[:, 1:] = lagged.reshape(n, N * p)
+    return Z
+
+def _ols(Y, L, p, start):
+    rows = slice(start, None)
+    Z = _design(L, p, rows)
+    B, *_ = np.linalg.lstsq(Z, Y[rows], rcond=None)
+    resid = Y[rows] - Z @ B
+    return B, resid
+
+def max_feasible_lag(n_series, nobs, maxlags):
+    """
+    Largest p <= maxlags that leaves more observations than parameters per equation.
+    """
+    p = maxlags
+    while p > 0 and nobs - p <= 1 + n_series * p:
+        p -= 1
+    return p
+
+def select_order(values, maxlags=None, ic=None, difference=False):
+    """
+    (p, {p: {"aic", "bic", "hqic"}}) over p = 1..maxlags, every order fitted on the
+    same sample (rows from maxlags on), with the criteria statsmodels uses.
+    """
+    maxlags = VAR["maxlags"] if maxlags is None else maxlags
+    ic = ic or VAR["ic"]
+    T, N = values.shape
+    maxlags = max_feasible_lag(N, T - int(bool(difference)), maxlags)
+    if maxlags < 1:
+        raise ValueError(f"{T} observations are too few for a VAR in {N} series")
+    Y, L, first = modelled_lags(values, maxlags, difference)
+    n = T - first
+    criteria = {}
+    for p in range(1, maxlags + 1):
+        _, resid = _ols(Y, L, p, first)
+        _, logdet = np.linalg.slogdet(resid.T @ resid / n)
+        free = p * N * N + N
+        criteria[p] = {"aic": logdet + 2.0 * free / n,
+                       "bic": logdet + np.log(n) * free / n,
+                       "hqic": logdet + 2.0 * np.log(np.log(n)) * free / n}
+    best = min(criteria, key=lambda p: criteria[p][ic])
+    return best, criteria
+
+def fit_var(values, p, difference=False):
+    """
+    OLS fit of VAR(p) on the full sample: (intercept, coefs, sigma, nobs), sigma
+    with the degrees-of-freedom correction.
+    """
+    T, N = values.shape
+    Y, L, first = modelled_lags(values, p, difference)
+    B, resid = _ols(Y, L, p, first)
+    n = len(resid)
+    sigma = resid.T @ resid / (n - 1 - N * p)
+    coefs = B[1:].reshape(p, N, N).transpose(0, 2, 1)
+    return B[0], coefs, sigma, n
+
+def ma_coefs(coefs, horizon):
+    """
+    MA(inf) coefficients Psi_0..Psi_horizon as one (horizon+1, N, N) array.
+    """
+    p, N, _ = coefs.shape
+    psi = np.zeros((horizon + 1, N, N))
+    psi[0] = np.eye(N)
+    for h in range(1, horizon + 1):
+        m = min(h, p)
+        # Psi_h = sum_l A_l Psi_{h-l}, l = 1..m
+        psi[h] = np.einsum("lij,ljk->ik", coefs[:m], psi[h - m:h][::-1])
+    return psi
+
+def forecast_path(history, intercept, coefs, steps):
+    """
+    Point forecasts of the modelled series for `steps` periods after `history` (T, N).
+    """
+    p = coefs.shape[0]
+    window = list(history[-p:][::-1])       # most recent first
+    out = np.empty((steps, len(intercept)))
+    for h in range(steps):
+        y = intercept + np.einsum("lij,lj->i", coefs, np.asarray(window[:p]))
+        out[h] = y
+        window.insert(0, y)
+    return out
+
+def forecast_var(values, intercept, coefs, sigma, steps, difference=False, alpha=None):
+    """
+    Level forecasts (steps, N) with lower / upper bands at `alpha` from the MSE
+    matrices sum_i C_i Sigma C_i' (C = Psi, or its running sum for differences).
+    """
+    from scipy.stats import norm
+    alpha = VAR["alpha"] if alpha is None else alpha
+    modelled = np.diff(values, axis=0) if difference else values
+    point = forecast_path(modelled, intercept, coefs, steps)
+    C = ma_coefs(coefs, steps - 1)
+    if difference:
+        point = values[-1] + np.cumsum(point, axis=0)
+        C = np.cumsum(C, axis=0)
+    var = np.cumsum(np.einsum("hij,jk,hik->hi", C, sigma, C), axis=0)
+    half = norm.ppf(1 - alpha / 2) * np.sqrt(var)
+    return point, point - half, point + half
+
+def impulse_responses(coefs, sigma, horizon, difference=False):
+    """
+    Orthogonalised responses to every shock at once: (horizon+1, N, N), [h, i, j] =
+    response of series i (levels) h periods after a one-s.d. shock to series j.
+    """
+    P = np.linalg.cholesky(sigma)
+    irf = ma_coefs(coefs, horizon) @ P
+    return np.cumsum(irf, axis=0) if difference else irf
+
+def _wants_difference(setting, adf):
+    if setting == "auto":
+        return any((res or {}).get("d") == 1 for res in (adf or {}).values())
+    return bool(setting)
+
+def strongest_responses(res, horizon=12, k=5):
+    """
+    The k largest cross-series impulse responses at `horizon`, scaled by each
+    response series' residual s.d.: [(impulse, response, scaled value)].
+    """
+    h = min(horizon, res.irf.shape[0] - 1)
+    scaled = res.irf[h] / np.sqrt(np.diag(res.sigma))[:, None]
+    np.fill_diagonal(scaled, 0.0)
+    order = np.argsort(-np.abs(scaled), axis=None)[:k]
+    out = []
+    for flat in order:
+        i, j = np.unravel_index(flat, scaled.shape)
+        if scaled[i, j] != 0:
+            out.append((res.columns[j], res.columns[i], float(scaled[i, j])))
+    return out
+
+def run_var(df, periods, adf=None, out_dir=None, maxlags=None, ic=None, difference=None):
+    """
+    Select, fit and forecast a VAR on the complete rows of `df`. Writes
+    var_forecast.csv (date, indicator, forecast, lower, upper) and var_irf.csv
+    (rows: impulse, horizon; columns: responses) to out_dir. Returns a VARResult.
+    """
+    ic = ic or VAR["ic"]
+    panel = df.dropna()
+    values = panel.to_numpy(dtype=np.float64)
+    constant = np.ptp(values, axis=0) == 0
+    if constant.any():
+        raise ValueError("constant series: " + ", ".join(map(str, panel.columns[constant])))
+    diff = _wants_difference(VAR["difference"] if difference is None else difference, adf)
+    p, criteria = select_order(values, maxlags=maxlags, ic=ic, difference=diff)
+    intercept, coefs, sigma, nobs = fit_var(values, p, difference=diff)
+    point, lower, upper = forecast_var(values, intercept, coefs, sigma, periods, difference=diff)
+    irf = impulse_responses(coefs, sigma, VAR["irf_horizon"], difference=diff)
+
+    start = panel.index[-1] + pd.offsets.MonthBegin()
+    index = pd.date_range(start=start, periods=periods, freq="M")
+    cols = list(panel.columns)
+    frame = lambda a: pd.DataFrame(a, index=index, columns=cols)
+    res = VARResult(order=p, ic=ic, criteria=criteria, differenced=diff, nobs=nobs, columns=cols,
+                    intercept=intercept, coefs=coefs, sigma=sigma,
+                    forecast=frame(point), lower=frame(lower), upper=frame(upper), irf=irf)
+    print(f"VAR({p}) by {ic.upper()} on {'differences' if diff else 'levels'}: {len(cols)} series, {nobs} obs")
+
+    if out_dir is not None:
+        out_dir = Path(out_dir)
+        long = pd.concat({"forecast": res.forecast.stack(), "lower": res.lower.stack(),
+                          "upper": res.upper.stack()}, axis=1)
+        long.index.names = ["date", "indicator"]
+        long.to_csv(out_dir / "var_forecast.csv")
+        H = irf.shape[0]
+        irf_df = pd.DataFrame(irf.transpose(2, 0, 1).reshape(len(cols) * H, len(cols)), columns=cols,
+                              index=pd.MultiIndex.from_product([cols, range(H)], names=["impulse", "horizon"]))
+        irf_df.to_csv(out_dir / "var_irf.csv")
+    return res
@@ -0,0 +1,69 @@
+"""
+Walk-forward backtests: incremental linear / SARIMA updates against refitting at every origin.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from src.backtest import (rolling_origins, split_blocks, ml_block_task, sarima_block_task, _refit_block,
+                          run_backtests)
+from src.features import panel_lags
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+ORDER, SEASONAL = (1, 0, 0), (0, 0, 0, 0)
+
+def panel(T=60, N=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N)).cumsum(axis=0)
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=[f"x{i}" for i in range(N)])
+
+def lagged(df, col, lags=2):
+    X = panel_lags(df.to_numpy(), lags)
+    keep = ~np.isnan(X).any(axis=1)
+    return X[keep], df[col].to_numpy()[keep]
+
+def test_origins_and_blocks():
+    origins = rolling_origins(20, 10, 3)
+    assert origins == list(range(10, 18))
+    blocks = split_blocks(origins, 3)
+    assert [o for b in blocks for o in b] == origins and len(blocks) == 3
+    assert split_blocks(origins[:2], 8) == [[10], [11]]
+
+@pytest.mark.parametrize("model_type", ["lr", "ridge"])
+def test_incremental_linear_matches_refit(model_type):
+    X, y = lagged(panel(), "x0")
+    origins = rolling_origins(len(y), 30, 3)
+    fast = ml_block_task(origins, X, y, 3, model_type)
+    slow = _refit_block(X, y, origins, 3, model_type)
+    np.testing.assert_allclose(np.array(fast), np.array(slow), rtol=1e-7, atol=1e-9)
+
+def test_linear_predictions_do_not_depend_on_blocks():
+    X, y = lagged(panel(), "x1")
+    origins = rolling_origins(len(y), 30, 3)
+    whole = ml_block_task(origins, X, y, 3, "lr")
+    parts = [p for b in split_blocks(origins, 4) for p in ml_block_task(b, X, y, 3, "lr")]
+    np.testing.assert_allclose(np.array(parts), np.array(whole), rtol=1e-9)
+
+def test_sarima_extension_matches_filtering_each_origin():
+    values = panel()["x0"].to_numpy()
+    origins = [40, 41, 42, 43]
+    preds = sarima_block_task(origins, values, 3, order=ORDER, seasonal_order=SEASONAL)
+    first = SARIMAX(values[:40], order=ORDER, seasonal_order=SEASONAL, enforce_stationarity=False,
+                    enforce_invertibility=False).fit(disp=False)
+    for o, p in zip(origins, preds):
+        ref = SARIMAX(values[:o], order=ORDER, seasonal_order=SEASONAL, enforce_stationarity=False,
+                      enforce_invertibility=False).filter(first.params).forecast(3)
+        np.testing.assert_allclose(p, ref, rtol=1e-8)
+
+def test_run_backtests_is_the_same_serial_and_parallel(tmp_path):
+    df = panel(T=50)
+    kwargs = dict(horizon=2, min_train=30, model_type="lr", lags=2, models=("ml",))
+    serial = run_backtests(df, tmp_path / "serial", n_jobs=1, **kwargs)
+    parallel = run_backtests(df, tmp_path / "parallel", n_jobs=2, **kwargs)
+    pd.testing.assert_frame_equal(serial, parallel, rtol=1e-9)
+    assert set(serial["indicator"]) == set(df.columns) and set(serial["step"]) == {1, 2}
+    detail = pd.read_csv(tmp_path / "serial" / "backtest_x0.csv")
+    assert len(detail) == 2 * len(rolling_origins(len(df) - 2, 30, 2))
+    np.testing.assert_allclose(detail["ml_err"], detail["actual"] - detail["ml_pred"])
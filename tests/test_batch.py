@@ -0,0 +1,72 @@
+"""
+Multi-universe batch runs: shared sources, shared preparation and deduplicated fits.
+"""
+import json
+import pandas as pd
+import pytest
+from src import batch, stationarity
+from src.batch import load_universes, collect_union, prepare_universes, source_key, run_batch
+from src.data_prep import prepare_dataset
+from tests.test_yahoo_cache import FakeDownload
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def yahoo(name, ticker):
+    return {"name": name, "type": "yahoo", "ticker": ticker}
+
+UNIVERSES = [
+    {"name": "US", "indicators": [yahoo("SP500", "^GSPC"), yahoo("GOLD", "GC=F")],
+     "start": "2015-01-01", "end": "2020-12-31"},
+    {"name": "EU", "indicators": [yahoo("STOXX", "^STOXX"), yahoo("GOLD_EUR", "GC=F")],
+     "start": "2015-01-01", "end": "2020-12-31"},
+    {"name": "OLD", "indicators": [yahoo("SP500", "^GSPC")], "start": "2014-01-01", "end": "2018-12-31"},
+]
+
+def defined(tmp_path, defs=UNIVERSES):
+    path = tmp_path / "universes.json"
+    path.write_text(json.dumps(defs))
+    return load_universes(path)
+
+@pytest.fixture(autouse=True)
+def local_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "RAW_DIR", tmp_path / "raw")
+    monkeypatch.setattr(stationarity, "MODEL_STORE_DIR", tmp_path / "store")
+
+def test_load_universes_validates(tmp_path):
+    us = defined(tmp_path)
+    assert [u["name"] for u in us] == ["US", "EU", "OLD"] and us[1]["geo_scope"] == "EU"
+    with pytest.raises(ValueError):
+        defined(tmp_path, UNIVERSES + [UNIVERSES[0]])
+    with pytest.raises(ValueError):
+        defined(tmp_path, [{"name": "X", "indicators": [{"type": "ftp", "path": "x"}]}])
+
+def test_each_source_is_collected_once_over_the_union(tmp_path):
+    fake = FakeDownload()
+    raw = collect_union(defined(tmp_path), downloader=fake)
+    assert list(raw.columns) == ["yahoo:^GSPC", "yahoo:GC=F", "yahoo:^STOXX"]
+    assert len(fake.calls) == 1 and sorted(fake.calls[0][0]) == sorted(["^GSPC", "GC=F", "^STOXX"])
+    assert fake.calls[0][1] == pd.Timestamp("2014-01-01")
+
+def test_universe_panels_match_preparing_each_alone(tmp_path):
+    universes = defined(tmp_path)
+    raw = collect_union(universes, downloader=FakeDownload())
+    shared, members = prepare_universes(raw, universes)
+    assert set(shared) == {("2015-01-01", "2020-12-31"), ("2014-01-01", "2018-12-31")}
+    for u in universes:
+        ids, names = members[u["name"]]
+        assert names == [ind["name"] for ind in u["indicators"]]
+        alone = prepare_dataset(raw[[source_key(ind) for ind in u["indicators"]]], start=u["start"], end=u["end"])
+        got = shared[(u["start"], u["end"])][ids]
+        pd.testing.assert_frame_equal(got.set_axis(alone.columns, axis=1), alone)
+
+def test_shared_series_are_fitted_once(tmp_path):
+    universes = defined(tmp_path, UNIVERSES[:2])
+    reports = run_batch(universes, out_root=tmp_path / "out", n_jobs=1, downloader=FakeDownload(), plots=False,
+                        store_dir=tmp_path / "store", periods=3)
+    assert set(reports) == {"US", "EU"}
+    meta = json.loads((tmp_path / "out" / "batch_summary.json").read_text())
+    # GC=F is listed twice but prepared, tested and fitted once
+    assert (meta["sources"], meta["sarima_fits"], meta["ml_fits"]) == (3, 3, 4)
+    us = json.loads((tmp_path / "out" / "US" / "report" / "analysis_summary.json").read_text())
+    eu = json.loads((tmp_path / "out" / "EU" / "report" / "analysis_summary.json").read_text())
+    assert us["forecasts"]["GOLD"]["sarima"] == eu["forecasts"]["GOLD_EUR"]["sarima"]
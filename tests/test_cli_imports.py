@@ -0,0 +1,12 @@
+"""
+The CLI must parse arguments without loading any heavy library (see benchmarks/bench_imports.py).
+"""
+import pytest
+from benchmarks.bench_imports import HEAVY, import_profile
+
+@pytest.mark.parametrize("args", [["--help"], ["report", "--help"], ["serve", "--help"]])
+def test_help_imports_no_heavy_modules(args):
+    rows = import_profile(args)
+    assert rows, "no -X importtime output"
+    imported = {mod.split(".")[0] for mod, *_ in rows}
+    assert not imported & set(HEAVY)
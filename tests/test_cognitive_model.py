@@ -0,0 +1,45 @@
+"""
+Panel scoring (panel_scores, score_history, evaluate_signals) against the per-series hype_vs_structural.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.cognitive_model import hype_vs_structural, panel_scores, score_history, evaluate_signals
+
+def panel(T=40, N=5, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N)).cumsum(axis=0) + 50
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=[f"x{i}" for i in range(N)])
+
+def test_panel_scores_match_per_series():
+    df = panel()
+    out = panel_scores(df)
+    for col in df.columns:
+        assert out[col] == pytest.approx(hype_vs_structural(df[col]), abs=1e-12)
+
+def test_short_panel_scores_nan():
+    df = panel(T=7)
+    assert panel_scores(df).isna().all()
+    assert hype_vs_structural(df["x0"]) is None
+
+@pytest.mark.parametrize("window", [3, 6])
+def test_history_matches_expanding_reference(window):
+    df = panel(T=30)
+    out = score_history(df, window=window)
+    assert out.iloc[:window + 1].isna().all().all()
+    for t in range(window + 1, len(df)):
+        for col in df.columns:
+            ref = hype_vs_structural(df[col].iloc[:t + 1], window=window)
+            assert out[col].iloc[t] == pytest.approx(ref, abs=1e-9), (t, col)
+    pd.testing.assert_series_equal(out.iloc[-1], panel_scores(df, window), check_names=False, atol=1e-9)
+
+def test_evaluate_signals_mixes_dense_and_gappy_columns():
+    df = panel()
+    df.iloc[[3, 10], 1] = np.nan
+    flags = evaluate_signals(df)
+    assert list(flags) == list(df.columns)
+    for col in df.columns:
+        ref = hype_vs_structural(df[col])
+        assert flags[col]["score"] == pytest.approx(ref, abs=1e-12)
+        assert flags[col]["label"] == ("structural" if ref > 0.2 else "temporary/hype")
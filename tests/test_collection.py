@@ -0,0 +1,126 @@
+"""
+Concurrent collection (collect_all_indicators) with injected downloader / FRED fetcher.
+"""
+import threading
+import time
+import pandas as pd
+import pytest
+from config import FRED_API_ENVVAR
+from src.data_collection import collect_all_indicators
+from src.raw_cache import read_cached
+from tests.test_yahoo_cache import FakeDownload
+
+FAST = {"retries": 3, "backoff": 0.0}
+
+def fred(name):
+    return {"name": name, "type": "fred", "fred_id": name}
+
+def observations(series_id):
+    index = pd.date_range("2015-01-01", "2016-12-31", freq="D")
+    return pd.Series(1.0, index=index, name=series_id)
+
+@pytest.fixture(autouse=True)
+def fred_key(monkeypatch):
+    monkeypatch.setenv(FRED_API_ENVVAR, "test-key")
+
+def test_fred_errors_are_retried(tmp_path):
+    calls = []
+    def flaky(series_id, api_key, start=None, end=None):
+        calls.append(series_id)
+        if len(calls) < 3:
+            raise OSError("connection reset")
+        return observations(series_id)
+    df = collect_all_indicators(tmp_path, fred_fetcher=flaky, indicators=[fred("A")], settings=FAST,
+                                start="2015-01-01", end="2016-12-31")
+    assert len(calls) == 3
+    assert list(df.columns) == ["A"]
+
+def test_empty_yahoo_download_is_retried(tmp_path):
+    fake = FakeDownload()
+    def first_empty(tickers, **kwargs):
+        if not fake.calls:
+            fake.calls.append(None)
+            return pd.DataFrame()
+        return fake(tickers, **kwargs)
+    df = collect_all_indicators(tmp_path, downloader=first_empty, settings=FAST,
+                                indicators=[{"name": "AAA", "type": "yahoo", "ticker": "AAA"}],
+                                start="2015-01-01", end="2016-12-31")
+    assert len(fake.calls) == 2
+    assert df["AAA"].notna().all()
+
+def test_retries_give_up_after_the_limit(tmp_path):
+    calls = []
+    def down(series_id, api_key, start=None, end=None):
+        calls.append(series_id)
+        raise OSError("unreachable")
+    with pytest.raises(RuntimeError):
+        collect_all_indicators(tmp_path, fred_fetcher=down, indicators=[fred("A")],
+                               settings={"retries": 2, "backoff": 0.0})
+    assert len(calls) == 3
+
+def test_deadline_drops_slow_jobs(tmp_path):
+    def fetch(series_id, api_key, start=None, end=None):
+        if series_id == "SLOW":
+            time.sleep(2.0)
+        return observations(series_id)
+    t0 = time.perf_counter()
+    df = collect_all_indicators(tmp_path, fred_fetcher=fetch, indicators=[fred("FAST"), fred("SLOW")],
+                                settings={**FAST, "deadline": 0.5}, start="2015-01-01", end="2016-12-31")
+    assert time.perf_counter() - t0 < 1.5
+    assert list(df.columns) == ["FAST"]
+
+def test_per_source_concurrency_cap(tmp_path):
+    lock = threading.Lock()
+    active, peak = [0], [0]
+    def fetch(series_id, api_key, start=None, end=None):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return observations(series_id)
+    names = [f"S{i}" for i in range(8)]
+    df = collect_all_indicators(tmp_path, fred_fetcher=fetch, indicators=[fred(n) for n in names],
+                                settings={**FAST, "concurrency": {"fred": 2}},
+                                start="2015-01-01", end="2016-12-31")
+    assert list(df.columns) == names
+    assert peak[0] == 2
+
+def yahoo(ticker):
+    return {"name": ticker, "type": "yahoo", "ticker": ticker}
+
+def test_weekend_tail_is_covered_without_retries(tmp_path):
+    fake = FakeDownload()
+    # cache up to Saturday 2017-12-30; extending to Monday asks for a weekend only
+    collect_all_indicators(tmp_path, downloader=fake, indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end="2017-12-30")
+    collect_all_indicators(tmp_path, downloader=fake, indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end="2018-01-01")
+    assert len(fake.calls) == 2
+    assert read_cached(tmp_path / "yahoo_cache", "AAA")[1]["end"] == "2018-01-01"
+    collect_all_indicators(tmp_path, downloader=fake, indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end="2018-01-01")
+    assert len(fake.calls) == 2
+
+def test_empty_tail_ending_today_is_not_retried(tmp_path):
+    today = pd.Timestamp.today().normalize()
+    cached_to = today - pd.offsets.BDay(2)
+    collect_all_indicators(tmp_path, downloader=FakeDownload(), indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end=cached_to)
+    unpublished = FakeDownload(fail_from=cached_to)
+    collect_all_indicators(tmp_path, downloader=unpublished, indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end=today + pd.Timedelta(days=30))
+    assert len(unpublished.calls) == 1
+    # not marked covered: the next run asks for those days again
+    assert read_cached(tmp_path / "yahoo_cache", "AAA")[1]["end"] == cached_to.strftime("%Y-%m-%d")
+
+def test_covered_cache_does_not_import_yfinance(tmp_path):
+    import sys
+    collect_all_indicators(tmp_path, downloader=FakeDownload(), indicators=[yahoo("AAA")], settings=FAST,
+                           start="2015-01-01", end="2016-12-31")
+    sys.modules.pop("yfinance", None)
+    df = collect_all_indicators(tmp_path, indicators=[yahoo("AAA")], settings=FAST,
+                                start="2015-01-01", end="2016-12-31")
+    assert "yfinance" not in sys.modules
+    assert list(df.columns) == ["AAA"]
@@ -0,0 +1,63 @@
+"""
+Blocked correlation engine against DataFrame.corr() and brute-force pair rankings.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation import correlation_matrix, top_pairs, lead_lag
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def panel(T=60, N=7, seed=0, gaps=0.0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N))
+    values[:, 1] += values[:, 0]
+    values[:, 2] -= 2 * values[:, 0]
+    if gaps:
+        values[rng.random(values.shape) < gaps] = np.nan
+    return pd.DataFrame(values, columns=[f"s{i}" for i in range(N)])
+
+@pytest.mark.parametrize("gaps", [0.0, 0.15])
+@pytest.mark.parametrize("block", [2, 3, 256])
+def test_matrix_matches_pandas(gaps, block):
+    df = panel(gaps=gaps)
+    df["flat"] = 1.0
+    pd.testing.assert_frame_equal(correlation_matrix(df, block=block), df.corr(), atol=1e-12, rtol=0)
+
+def test_lagged_matrix_pairs_x_with_future_y():
+    df = panel()
+    out = correlation_matrix(df, block=3, lag=2)
+    for x in df.columns:
+        for y in df.columns:
+            assert out.loc[x, y] == pytest.approx(df[x].corr(df[y].shift(-2)), abs=1e-12)
+
+def ranked_pairs(df):
+    c = df.corr()
+    cols = list(df.columns)
+    pairs = [(a, b, c.loc[a, b]) for i, a in enumerate(cols) for b in cols[i + 1:] if not np.isnan(c.loc[a, b])]
+    return sorted(pairs, key=lambda p: -p[2])
+
+@pytest.mark.parametrize("gaps", [0.0, 0.15])
+def test_top_pairs_match_a_full_sort(gaps):
+    df = panel(N=9, gaps=gaps)
+    ref = ranked_pairs(df)
+    out = top_pairs(df, k=3, block=2)
+    assert [p[:2] for p in out["positive"]] == [p[:2] for p in ref[:3]]
+    assert [p[:2] for p in out["negative"]] == [p[:2] for p in ref[::-1][:3]]
+    assert out["positive"][0][2] == pytest.approx(ref[0][2], abs=1e-12)
+
+def test_lead_lag_finds_the_planted_leader():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=80)
+    df = panel(T=80, N=4, seed=2)
+    df["lead"] = x
+    df["follow"] = np.r_[rng.normal(size=2), x[:-2]] + 0.1 * rng.normal(size=80)
+    best = lead_lag(df, max_lag=3, k=2, block=2)[0]
+    assert (best["leader"], best["follower"], best["lag"]) == ("lead", "follow", 2)
+    assert best["corr"] == pytest.approx(df["lead"].corr(df["follow"].shift(-2)), abs=1e-12)
+
+def test_lead_lag_reports_each_pair_once():
+    out = lead_lag(panel(N=5), max_lag=3, k=10, block=2)
+    pairs = [(d["leader"], d["follower"]) for d in out]
+    assert len(pairs) == len(set(pairs)) == 10
+    assert all(a != b for a, b in pairs)
@@ -0,0 +1,59 @@
+"""
+Parquet dataset store: round trips, column / date selections and row-group pruning.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from src.dataset_store import write_panel, read_panel, read_meta, dataset_paths
+
+def monthly(T=40, seed=0, dtype=np.float64):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2015-01-31", periods=T, freq="M", name="Date")
+    df = pd.DataFrame(rng.normal(size=(T, 3)).astype(dtype), index=index, columns=["b", "a", "c"])
+    df.iloc[4, 1] = np.nan
+    return df
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_round_trip(tmp_path, dtype):
+    df = monthly(dtype=dtype)
+    write_panel(df, "prepared", root=tmp_path)
+    back = read_panel("prepared", root=tmp_path)
+    pd.testing.assert_frame_equal(back, df)
+    assert back.index.freqstr == df.index.freqstr
+    pd.testing.assert_frame_equal(pd.read_parquet(dataset_paths("prepared", tmp_path)[0]).set_index("date"),
+                                  df.rename_axis("date"), check_freq=False)
+
+def test_one_row_group_per_year(tmp_path):
+    df = monthly()
+    write_panel(df, "prepared", root=tmp_path)
+    meta = read_meta("prepared", root=tmp_path)
+    assert meta["row_group_years"] == [2015, 2016, 2017, 2018]
+    assert meta["columns"] == ["b", "a", "c"] and meta["rows"] == len(df)
+    assert pq.ParquetFile(dataset_paths("prepared", tmp_path)[0]).num_row_groups == 4
+
+def test_column_and_date_selection_matches_slicing(tmp_path):
+    df = monthly()
+    write_panel(df, "prepared", root=tmp_path)
+    back = read_panel("prepared", columns=["c", "a"], start="2016-03-01", end="2017-06-30", root=tmp_path)
+    pd.testing.assert_frame_equal(back, df.loc["2016-03-01":"2017-06-30", ["c", "a"]], check_freq=False)
+
+def test_daily_raw_panel_round_trip(tmp_path):
+    index = pd.bdate_range("2019-12-20", "2020-01-10", name="Date")
+    raw = pd.DataFrame({"SP500": np.arange(len(index), dtype=float)}, index=index)
+    write_panel(raw, "raw", root=tmp_path)
+    pd.testing.assert_frame_equal(read_panel("raw", root=tmp_path), raw)
+
+def test_rewrite_replaces_the_dataset(tmp_path):
+    write_panel(monthly(), "prepared", root=tmp_path)
+    newer = monthly(T=14, seed=1)
+    write_panel(newer, "prepared", root=tmp_path)
+    pd.testing.assert_frame_equal(read_panel("prepared", root=tmp_path), newer)
+    assert not list(tmp_path.glob(".*.tmp"))
+
+def test_missing_dataset_and_columns(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_panel("nothing", root=tmp_path)
+    write_panel(monthly(), "prepared", root=tmp_path)
+    with pytest.raises(KeyError):
+        read_panel("prepared", columns=["a", "zz"], root=tmp_path)
@@ -0,0 +1,59 @@
+"""
+Lag design matrices against the old pandas shift() chain, and the shared lag tensor memo.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src import features
+from src.features import lag_matrix, lag_names, lag_tensor, panel_lags
+from src.modeling import build_lag_features
+
+def panel(T=30, N=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N))
+    values[5, 1] = np.nan
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=["a", "b", "c"][:N])
+
+def shifted(df, lags):
+    # the original construction: one shifted column per (series, lag)
+    return pd.DataFrame({f"{col}_lag_{lag}": df[col].shift(lag) for col in df.columns
+                         for lag in range(1, lags + 1)}, index=df.index)
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    features.clear_memo()
+    yield
+    features.clear_memo()
+
+@pytest.mark.parametrize("lags", [1, 3, 7])
+def test_lag_matrix_matches_shift(lags):
+    df = panel()
+    ref = shifted(df, lags)
+    X = lag_matrix(df.to_numpy(), lags, dtype=np.float64)
+    assert X.shape == ref.shape
+    np.testing.assert_array_equal(X, ref.to_numpy())
+    assert lag_names(df.columns, lags) == list(ref.columns)
+
+def test_build_lag_features_frame_matches_shift():
+    df = panel()
+    pd.testing.assert_frame_equal(build_lag_features(df, lags=4), shifted(df, 4))
+    X, names = build_lag_features(df, lags=4, as_array=True)
+    assert names == list(shifted(df, 4).columns)
+    np.testing.assert_array_equal(X, shifted(df, 4).to_numpy())
+
+def test_one_dimensional_input_is_one_series():
+    s = panel()["a"].to_numpy()
+    np.testing.assert_array_equal(lag_matrix(s, 2, dtype=np.float64), shifted(panel()[["a"]], 2).to_numpy())
+
+@pytest.mark.parametrize("lags", [2, features.LAG_DEPTH, features.LAG_DEPTH + 2])
+def test_panel_lags_slices_the_tensor(lags):
+    df = panel(T=40)
+    np.testing.assert_array_equal(panel_lags(df.to_numpy(), lags), shifted(df, lags).to_numpy())
+
+def test_memo_is_shared_across_panel_dtypes():
+    df = panel()
+    tensor = lag_tensor(df.to_numpy(dtype=np.float32), 2)
+    assert lag_tensor(df.to_numpy(dtype=np.float32).astype(np.float64), 3) is tensor
+    assert tensor.dtype == np.float64 and tensor.shape[2] >= features.LAG_DEPTH
+    assert lag_tensor(df.to_numpy() + 1.0, 2) is not tensor
@@ -0,0 +1,52 @@
+"""
+granger_batched against the per-pair statsmodels reference (granger_pairwise).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.stats_analysis import granger_batched, granger_pairwise, run_granger
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def panel(T=80, N=4, seed=0, gaps=0.0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N)).cumsum(axis=0)
+    # make x0 lead x1 so some p-values are small
+    values[1:, 1] += 0.8 * values[:-1, 0]
+    if gaps:
+        values[rng.random(values.shape) < gaps] = np.nan
+    index = pd.date_range("2010-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=[f"x{i}" for i in range(N)])
+
+def assert_same(a, b):
+    assert a.keys() == b.keys()
+    for k in a:
+        if b[k] is None:
+            assert a[k] is None, k
+        else:
+            assert a[k] == pytest.approx(b[k], rel=1e-9, abs=1e-12), k
+
+def test_batched_matches_pairwise_on_filled_panel():
+    # gaps filled the way prepare_dataset fills them
+    df = panel(gaps=0.05).ffill().bfill()
+    assert_same(granger_batched(df, maxlag=4), granger_pairwise(df, maxlag=4))
+    assert granger_batched(df, maxlag=4)[("x0", "x1")] < 1e-6
+
+def test_panel_with_gaps_uses_the_reference():
+    df = panel(gaps=0.05)
+    assert_same(run_granger(df, maxlag=3), granger_pairwise(df, maxlag=3))
+
+def test_constant_series_pairs_are_none():
+    df = panel()
+    df["x2"] = 1.0
+    out = granger_batched(df, maxlag=3)
+    assert_same(out, granger_pairwise(df, maxlag=3))
+    assert all(out[(x, "x2")] is None for x in ("x0", "x1", "x3"))
+    assert out[("x2", "x0")] is None
+    assert out[("x0", "x1")] is not None
+
+def test_too_short_panel_returns_none():
+    df = panel(T=8, N=3)
+    out = granger_batched(df, maxlag=4)
+    assert all(v is None for v in out.values())
+    assert_same(out, granger_pairwise(df, maxlag=4))
@@ -0,0 +1,66 @@
+"""
+ML backend registry, and the ML baseline against sklearn fitted on the pandas-built lag features.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from src.ml_backends import BACKENDS, make_model, backend_params, ridge_alpha
+from src.modeling import ml_lag_forecast
+from config import ML_PARAMS, LAGS
+
+def panel(T=60, N=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N)).cumsum(axis=0)
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=[f"x{i}" for i in range(N)])
+
+def test_every_configured_backend_is_registered():
+    assert set(ML_PARAMS) == set(BACKENDS)
+
+def test_params_and_overrides():
+    rf = make_model("rf", n_jobs=1, n_estimators=7)
+    assert isinstance(rf, RandomForestRegressor)
+    assert (rf.n_estimators, rf.n_jobs, rf.max_depth) == (7, 1, ML_PARAMS["rf"]["max_depth"])
+    assert make_model("rf").n_jobs == ML_PARAMS["rf"]["n_jobs"]
+    assert backend_params("ridge", alpha=None) == ML_PARAMS["ridge"]
+    assert make_model("ridge", alpha=3.0).alpha == 3.0
+    with pytest.raises(ValueError, match="Unknown ML backend"):
+        make_model("svm")
+
+def test_ridge_alpha_marks_linear_backends():
+    assert ridge_alpha("lr") == 0.0
+    assert ridge_alpha("ridge") == ML_PARAMS["ridge"]["alpha"]
+    assert ridge_alpha("rf") is None and ridge_alpha("hgb") is None
+
+def test_ridge_backend_matches_the_closed_form():
+    rng = np.random.default_rng(1)
+    X, y = rng.normal(size=(50, 4)), rng.normal(size=50)
+    model = make_model("ridge", alpha=2.0).fit(X, y)
+    Xc, yc = X - X.mean(axis=0), y - y.mean()
+    coef = np.linalg.solve(Xc.T @ Xc + 2.0 * np.eye(4), Xc.T @ yc)
+    np.testing.assert_allclose(model.coef_, coef, rtol=1e-10)
+
+def reference(df, col, periods, estimator):
+    # the original feature build: shifted columns, joined and dropna'd
+    X = pd.concat({f"{c}_lag_{l}": df[c].shift(l) for c in df.columns for l in range(1, LAGS + 1)}, axis=1)
+    data = X.join(df[col]).dropna()
+    train, test = data.iloc[:-periods], data.iloc[-periods:]
+    estimator.fit(train[X.columns].to_numpy(), train[col].to_numpy())
+    return pd.Series(estimator.predict(test[X.columns].to_numpy()), index=test.index)
+
+@pytest.mark.parametrize("name, estimator", [
+    ("lr", LinearRegression()),
+    ("ridge", Ridge(alpha=ML_PARAMS["ridge"]["alpha"], solver="cholesky")),
+    ("rf", RandomForestRegressor(**dict(ML_PARAMS["rf"], n_estimators=20, n_jobs=1))),
+])
+def test_baseline_matches_sklearn_on_pandas_features(name, estimator, monkeypatch):
+    if name == "rf":
+        monkeypatch.setitem(ML_PARAMS, "rf", dict(ML_PARAMS["rf"], n_estimators=20))
+    df = panel()
+    _, preds, y_test, mse = ml_lag_forecast(df, "x1", periods=6, model_type=name, n_jobs=1)
+    ref = reference(df, "x1", 6, estimator)
+    np.testing.assert_allclose(preds.to_numpy(), ref.to_numpy(), rtol=1e-8)
+    assert list(preds.index) == list(ref.index)
+    assert mse == pytest.approx(float(np.mean((y_test.to_numpy() - ref.to_numpy()) ** 2)))
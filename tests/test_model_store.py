@@ -0,0 +1,85 @@
+"""
+Incremental SARIMA refits through the model store: filter / warm updates, drift and periodic cold refits.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from src import modeling
+from src.model_store import load_record, series_hash
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+ORDER, SEASONAL = (1, 1, 0), (0, 0, 0, 0)
+
+def series(T=72, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.Series(rng.normal(size=T).cumsum() + 100, index=index, name="x")
+
+def fit(s, store):
+    return modeling.fit_sarima(s, order=ORDER, seasonal_order=SEASONAL, store_dir=store, name="x")
+
+def reference(s):
+    return SARIMAX(s, order=ORDER, seasonal_order=SEASONAL, enforce_stationarity=False,
+                   enforce_invertibility=False)
+
+def test_series_hash_tracks_values_and_dates():
+    s = series()
+    assert series_hash(s) == series_hash(s.copy())
+    assert series_hash(s) != series_hash(s + 1e-9)
+    assert series_hash(s) != series_hash(s.set_axis(s.index + pd.offsets.MonthEnd()))
+
+def test_cold_fit_without_a_store_matches_statsmodels():
+    s = series()
+    res, kind = fit(s, None)
+    assert kind == "cold"
+    np.testing.assert_allclose(res.params, reference(s).fit(disp=False).params, rtol=1e-8)
+
+def test_appended_month_is_filtered_with_the_stored_parameters(tmp_path):
+    s = series(73)
+    cold, kind = fit(s.iloc[:-1], tmp_path)
+    assert kind == "cold"
+    res, kind = fit(s, tmp_path)
+    assert kind == "filter"
+    np.testing.assert_allclose(res.params, cold.params)
+    assert res.llf == pytest.approx(reference(s).filter(cold.params).llf, rel=1e-10)
+    rec = load_record(tmp_path, "x")
+    assert (rec["nobs"], rec["fit_kind"], rec["updates_since_refit"]) == (73, "filter", 1)
+    assert rec["history_hash"] == series_hash(s)
+
+def test_warm_mode_reoptimises_to_the_cold_optimum(tmp_path, monkeypatch):
+    monkeypatch.setattr(modeling, "SARIMA_UPDATE_MODE", "warm")
+    s = series(73)
+    fit(s.iloc[:-1], tmp_path)
+    res, kind = fit(s, tmp_path)
+    assert kind == "warm"
+    np.testing.assert_allclose(res.params, reference(s).fit(disp=False).params, rtol=1e-3)
+
+def test_revised_history_is_warm_refitted(tmp_path):
+    s = series()
+    fit(s, tmp_path)
+    revised = s.copy()
+    revised.iloc[10] += 5.0
+    _, kind = fit(revised, tmp_path)
+    assert kind == "warm"
+
+def test_refit_every_forces_a_cold_fit(tmp_path, monkeypatch):
+    monkeypatch.setattr(modeling, "SARIMA_REFIT_EVERY", 2)
+    s = series(74)
+    kinds = [fit(s.iloc[:n], tmp_path)[1] for n in (72, 73, 74)]
+    assert kinds == ["cold", "filter", "cold"]
+    assert load_record(tmp_path, "x")["updates_since_refit"] == 0
+
+def test_likelihood_drift_forces_a_cold_fit(tmp_path):
+    s = series(73)
+    fit(s.iloc[:-1], tmp_path)
+    s.iloc[-1] += 50.0
+    _, kind = fit(s, tmp_path)
+    assert kind == "cold"
+
+def test_order_change_ignores_the_stored_fit(tmp_path):
+    s = series()
+    fit(s, tmp_path)
+    _, kind = modeling.fit_sarima(s, order=(0, 1, 1), seasonal_order=SEASONAL, store_dir=tmp_path, name="x")
+    assert kind == "cold"
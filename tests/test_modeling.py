@@ -0,0 +1,79 @@
+"""
+run_tasks and run_modeling_pipeline: process-pool results against the serial in-process run,
+and the compact result records against the statsmodels fit they summarise.
+"""
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from src.modeling import run_tasks, run_modeling_pipeline, fit_sarima_task, fit_ml_task, ForecastResult, MLResult
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def panel(T=72, N=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(T, N)).cumsum(axis=0) + 100
+    index = pd.date_range("2015-01-31", periods=T, freq="M")
+    return pd.DataFrame(values, index=index, columns=[f"x{i}" for i in range(N)])
+
+def square_task(col, x):
+    return col, x * x, None
+
+def crash_task(col, x):
+    raise ValueError(f"bad {col}")
+
+def test_pool_results_come_back_in_task_order():
+    tasks = [(square_task, (f"s{i}", i)) for i in range(12)]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert run_tasks(tasks, pool) == run_tasks(tasks)
+
+def test_crashed_task_fails_only_itself():
+    tasks = [(square_task, ("a", 2)), (crash_task, ("b", 3)), (square_task, ("c", 4))]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        out = run_tasks(tasks, pool)
+    assert out[0] == ("a", 4, None) and out[2] == ("c", 16, None)
+    col, res, err = out[1]
+    assert (col, res) == ("b", None) and isinstance(err, ValueError)
+
+def test_pipeline_is_the_same_serial_and_parallel(tmp_path):
+    df = panel()
+    kwargs = dict(forecast_periods=6, plots=False)
+    serial = run_modeling_pipeline(df, out_dir=tmp_path / "serial", n_jobs=1, store_dir=tmp_path / "s1", **kwargs)
+    parallel = run_modeling_pipeline(df, out_dir=tmp_path / "parallel", n_jobs=2, store_dir=tmp_path / "s2",
+                                     **kwargs)
+    assert list(serial["sarima"]) == list(parallel["sarima"]) == list(df.columns)
+    assert list(serial["ml"]) == list(parallel["ml"]) == list(df.columns)
+    for col in df.columns:
+        a, b = serial["sarima"][col], parallel["sarima"][col]
+        pd.testing.assert_series_equal(a.forecast, b.forecast)
+        assert a.aic == pytest.approx(b.aic)
+        pd.testing.assert_series_equal(serial["ml"][col].preds, parallel["ml"][col].preds)
+        assert serial["ml"][col].mse == pytest.approx(parallel["ml"][col].mse)
+
+def test_forecast_result_matches_the_fit():
+    s = panel()["x0"]
+    _, full, err = fit_sarima_task("x0", s, 6, keep_models=True)
+    assert err is None
+    fit = full.fit
+    forecast = fit.get_forecast(6)
+    np.testing.assert_allclose(full.forecast.to_numpy(), forecast.predicted_mean.to_numpy())
+    np.testing.assert_allclose(full.conf.to_numpy(), forecast.conf_int().to_numpy())
+    assert full.forecast.index[0] == pd.Timestamp("2021-01-31")
+    assert full.aic == pytest.approx(fit.aic)
+    assert list(full.params.index) == list(fit.model.param_names)
+    np.testing.assert_allclose(full.impulse, np.asarray(fit.impulse_responses(steps=5)).ravel())
+    pd.testing.assert_series_equal(full.resid, fit.resid.iloc[fit.model.loglikelihood_burn:])
+
+def test_compact_records_drop_the_model_objects():
+    df = panel()
+    _, compact, _ = fit_sarima_task("x0", df["x0"], 6)
+    _, full, _ = fit_sarima_task("x0", df["x0"], 6, keep_models=True)
+    assert compact.fit is None and full.fit is not None
+    pd.testing.assert_series_equal(compact.forecast, full.forecast)
+    assert len(pickle.dumps(compact)) * 5 < len(pickle.dumps(full))
+    _, ml, _ = fit_ml_task("x0", df, 6)
+    assert isinstance(ml, MLResult) and ml.model is None
+    assert not hasattr(ml, "__dict__") and not hasattr(compact, "__dict__")
+    roundtrip = pickle.loads(pickle.dumps(compact))
+    assert isinstance(roundtrip, ForecastResult) and roundtrip.order == compact.order
@@ -0,0 +1,59 @@
+"""
+Pruned SARIMA order search against an exhaustive, fully converged search of the same grid.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src import order_search
+from src.order_search import candidate_orders, differencing_from_adf, score_candidate, select_order
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+GRID = {"max_p": 2, "max_q": 1, "max_P": 0, "max_Q": 0, "s": 0, "n_jobs": 1}
+
+def ar2(T=150, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.zeros(T)
+    e = rng.normal(size=T)
+    for t in range(2, T):
+        x[t] = 0.6 * x[t - 1] - 0.3 * x[t - 2] + e[t]
+    return pd.Series(x, index=pd.date_range("2010-01-31", periods=T, freq="M"))
+
+def exhaustive(series, d):
+    candidates = candidate_orders(d, 0, 0, GRID["max_p"], GRID["max_q"], 0, 0)
+    return min(candidates, key=lambda c: score_candidate(series, *c))
+
+def test_candidates_are_sorted_simplest_first():
+    grid = candidate_orders(1, 1, 12, 1, 1, 1, 0)
+    assert len(grid) == 8
+    assert grid[0] == ((0, 1, 0), (0, 1, 0, 12))
+    sizes = [o[0] + o[2] + so[0] + so[2] for o, so in grid]
+    assert sizes == sorted(sizes)
+
+def test_differencing_from_adf():
+    assert differencing_from_adf({"d": 0, "pvalue": 0.9}) == 0
+    assert differencing_from_adf({"pvalue": 0.01}, alpha=0.05) == 0
+    assert differencing_from_adf({"pvalue": 0.2}, alpha=0.05) == 1
+    assert differencing_from_adf(None, default=1) == 1
+
+@pytest.mark.parametrize("keep", [2, 6])
+def test_pruned_search_matches_exhaustive(keep):
+    s = ar2()
+    order = select_order(s, d=0, D=0, keep=keep, **GRID)
+    assert order == exhaustive(s, 0)
+
+def test_d_comes_from_the_stationarity_result():
+    s = ar2().cumsum()
+    order, _ = select_order(s, adf={"d": 1}, D=0, keep=6, **GRID)
+    assert order[1] == 1
+    assert (order, (0, 0, 0, 0)) == exhaustive(s, 1)
+
+def test_selection_is_cached_per_data(tmp_path, monkeypatch):
+    s = ar2()
+    first = select_order(s, name="x", d=0, D=0, cache_dir=tmp_path, keep=2, **GRID)
+    def unreachable(*args, **kwargs):
+        raise AssertionError("cached selection was searched again")
+    monkeypatch.setattr(order_search, "score_candidate", unreachable)
+    assert select_order(s, name="x", d=0, D=0, cache_dir=tmp_path, keep=2, **GRID) == first
+    with pytest.raises(AssertionError):
+        select_order(s.iloc[:-1], name="x", d=0, D=0, cache_dir=tmp_path, keep=2, **GRID)
@@ -0,0 +1,78 @@
+"""
+Panel / prepare_panel against the pandas chain prepare_dataset used before
+(copy, date filter, resample().mean(), ffill().bfill(), dropna(thresh)).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.panel import Panel, fill_gaps
+from src.data_prep import prepare_dataset, prepare_panel
+from config import FREQ
+
+def raw(seed=0, shuffle=False):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2014-11-03", "2019-02-27", name="Date")
+    df = pd.DataFrame({" SP500 ": rng.normal(size=len(index)).cumsum() + 100,
+                       "VIX": rng.normal(size=len(index)) + 20,
+                       "GOLD": rng.normal(size=len(index)).cumsum() + 50,
+                       "NEW": np.nan}, index=index)
+    df.loc[rng.random(len(df)) < 0.2, "VIX"] = np.nan
+    df.loc["2016-03-01":"2016-06-30", "GOLD"] = np.nan       # whole months missing
+    df.loc["2018-06-01":, "NEW"] = 1.0                       # too short to keep
+    return df.sample(frac=1.0, random_state=1) if shuffle else df
+
+def reference(df_raw, start=None, end=None):
+    df = df_raw.copy().sort_index()
+    if start:
+        df = df[df.index >= pd.to_datetime(start)]
+    if end:
+        df = df[df.index <= pd.to_datetime(end)]
+    df = df.resample(FREQ).mean()
+    df = df.ffill().bfill()
+    df = df.dropna(axis=1, thresh=int(len(df) * 0.5))
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_float64_matches_the_pandas_chain(shuffle):
+    df = raw(shuffle=shuffle)
+    before = df.copy()
+    out = prepare_dataset(df, start="2015-01-01", end="2018-12-31", dtype=np.float64)
+    pd.testing.assert_frame_equal(out, reference(df, "2015-01-01", "2018-12-31"), rtol=1e-12)
+    pd.testing.assert_frame_equal(df, before)
+
+def test_float32_panel_is_within_float32_precision():
+    df = raw()
+    out = prepare_panel(df, start="2015-01-01", end="2018-12-31")
+    assert out.dtype == np.float32 and out.values.flags.c_contiguous
+    pd.testing.assert_frame_equal(out.to_frame().astype(np.float64), reference(df, "2015-01-01", "2018-12-31"),
+                                  rtol=1e-6)
+
+def test_date_column_input_and_open_window():
+    df = raw()
+    out = prepare_dataset(df.reset_index(), dtype=np.float64)
+    pd.testing.assert_frame_equal(out, reference(df), rtol=1e-12, check_names=False)
+
+def test_fill_gaps_matches_ffill_bfill():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(30, 5))
+    values[rng.random(values.shape) < 0.4] = np.nan
+    values[:, 3] = np.nan
+    expected = pd.DataFrame(values).ffill().bfill().to_numpy()
+    np.testing.assert_array_equal(fill_gaps(values.copy()), expected)
+
+def test_resample_matches_pandas():
+    df = raw()[["VIX", "GOLD"]]
+    panel = Panel.from_frame(df, dtype=np.float64).resample(FREQ)
+    pd.testing.assert_frame_equal(panel.to_frame(), df.resample(FREQ).mean(), rtol=1e-12, check_names=False)
+
+def test_windows_and_frames_are_views():
+    panel = Panel.from_frame(raw()[["VIX", "GOLD"]], dtype=np.float64)
+    win = panel.window("2016-01-01", "2016-12-31")
+    assert np.shares_memory(win.values, panel.values)
+    assert win.index[0] >= pd.Timestamp("2016-01-01") and win.index[-1] <= pd.Timestamp("2016-12-31")
+    frame = win.to_frame()
+    frame.iloc[0, 0] = -1.0
+    assert win.values[0, 0] == -1.0 and panel.column("VIX") is not None
+    with pytest.raises(ValueError):
+        Panel(np.zeros((3, 2)), panel.index[:3], ["a"])
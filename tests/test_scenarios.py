@@ -0,0 +1,99 @@
+"""
+Monte Carlo scenarios against the analytic Gaussian forecast distribution and exact path quantiles.
+"""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+from src.modeling import ForecastResult
+from src.scenarios import run_scenarios, simulate_paths, _shock_model
+
+H = 4
+PSI = np.array([1.0, 0.8, 0.5, 0.3])
+SIGMA = {"a": 2.0, "b": 0.5}
+
+def setup(rho=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2015-01-31", periods=60, freq="M")
+    z = rng.standard_normal((60, 2))
+    z[:, 1] = rho * z[:, 0] + np.sqrt(1 - rho ** 2) * z[:, 1]
+    fc_index = pd.date_range("2020-01-31", periods=H, freq="M")
+    sarima = {}
+    for j, (col, sigma) in enumerate(SIGMA.items()):
+        forecast = pd.Series(100.0 + np.arange(H), index=fc_index)
+        sarima[col] = ForecastResult(aic=0.0, forecast=forecast, conf=None,
+                                     params=pd.Series({"ar.L1": 0.5, "sigma2": sigma ** 2}),
+                                     impulse=PSI, resid=pd.Series(sigma * z[:, j], index=index))
+    df = pd.DataFrame({"a": np.full(60, 100.0), "b": np.full(60, 100.0)}, index=index)
+    return df, {"sarima": sarima}
+
+def analytic_sd(col):
+    return SIGMA[col] * np.sqrt(np.cumsum(PSI ** 2))
+
+def test_gaussian_quantiles_match_the_analytic_distribution(tmp_path):
+    df, model_res = setup()
+    run_scenarios(df, model_res, out_dir=tmp_path, n_paths=40000, chunk=5000, method="gaussian", seed=1)
+    q = pd.read_csv(tmp_path / "scenario_quantiles.csv")
+    for col in SIGMA:
+        rows = q[q["indicator"] == col].sort_values("horizon")
+        mean = model_res["sarima"][col].forecast.to_numpy()
+        sd = analytic_sd(col)
+        for level in (0.05, 0.25, 0.5, 0.75, 0.95):
+            expected = mean + norm.ppf(level) * sd
+            np.testing.assert_allclose(rows[f"q{level * 100:g}"], expected, atol=0.04 * sd.max())
+        np.testing.assert_allclose(rows["mean"], mean, atol=0.03 * sd.max())
+
+def test_tail_probabilities_match_the_normal_cdf(tmp_path):
+    df, model_res = setup()
+    run_scenarios(df, model_res, out_dir=tmp_path, n_paths=40000, method="gaussian", seed=2)
+    tails = pd.read_csv(tmp_path / "scenario_tails.csv")
+    for row in tails[tails["indicator"] == "a"].itertuples():
+        mean = 100.0 + row.horizon - 1
+        p = norm.cdf(row.level, loc=mean, scale=analytic_sd("a")[row.horizon - 1])
+        assert row.prob == pytest.approx(p if row.side == "below" else 1 - p, abs=0.01)
+
+def test_histogram_quantiles_match_exact_path_quantiles():
+    df, model_res = setup(rho=0.6)
+    sarima = model_res["sarima"]
+    cols = list(SIGMA)
+    mean = np.column_stack([sarima[c].forecast.to_numpy() for c in cols])
+    scales, chol, rows = _shock_model(sarima, cols)
+    paths = np.concatenate(list(simulate_paths(mean, np.stack([PSI, PSI]), scales, chol, rows, 5000, 1000,
+                                               "gaussian", np.random.default_rng(3))))
+    summary = run_scenarios(df, model_res, n_paths=5000, chunk=1000, method="gaussian", seed=3)
+    exact = np.quantile(paths[:, -1, :], 0.5, axis=0)
+    # binned quantile: within one histogram bin (16 s.d. / 512 bins)
+    np.testing.assert_allclose(summary["median"], exact, atol=16 * analytic_sd("a")[-1] / 512)
+    np.testing.assert_allclose(summary["prob_decline"], (paths[:, -1, :] < 100.0).mean(axis=0))
+
+def test_shocks_keep_the_residual_correlation():
+    df, model_res = setup(rho=0.8)
+    sarima = model_res["sarima"]
+    scales, chol, rows = _shock_model(sarima, list(SIGMA))
+    np.testing.assert_allclose(scales, list(SIGMA.values()))
+    paths = np.concatenate(list(simulate_paths(np.zeros((H, 2)), np.stack([PSI, PSI]), scales, chol, rows, 20000,
+                                               4000, "gaussian", np.random.default_rng(4))))
+    r = np.corrcoef(paths[:, -1, 0], paths[:, -1, 1])[0, 1]
+    # the Ledoit-Wolf shrunk correlation, a little below the sample one
+    shrunk = (chol @ chol.T)[0, 1]
+    assert 0.5 < shrunk < np.corrcoef(rows.T)[0, 1]
+    assert r == pytest.approx(shrunk, abs=0.02)
+
+def test_results_do_not_depend_on_the_chunk_size(tmp_path):
+    df, model_res = setup()
+    a = run_scenarios(df, model_res, out_dir=tmp_path / "a", n_paths=3000, chunk=3000, seed=5)
+    b = run_scenarios(df, model_res, out_dir=tmp_path / "b", n_paths=3000, chunk=700, seed=5)
+    pd.testing.assert_frame_equal(a, b)
+    meta = json.loads((tmp_path / "b" / "scenario_meta.json").read_text())
+    assert sum(meta["breadth"]) == pytest.approx(1.0)
+
+def test_bootstrap_resamples_residual_dates(tmp_path):
+    df, model_res = setup(rho=0.5)
+    summary = run_scenarios(df, model_res, n_paths=4000, method="bootstrap", seed=6)
+    assert list(summary["indicator"]) == list(SIGMA)
+    assert (summary["downside"] < summary["median"]).all() and (summary["upside"] > summary["median"]).all()
+
+def test_nothing_to_simulate():
+    df, _ = setup()
+    assert run_scenarios(df, {"sarima": {}}).empty
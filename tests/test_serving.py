@@ -0,0 +1,89 @@
+"""
+HTTP serving of analysis_summary.json: routes against the summary itself, and hot reload.
+"""
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from src.reporting import write_summary
+from src.serving import make_server
+
+def points(base, n=3):
+    return [{"horizon": h, "date": f"2024-0{h}-30", "mean": base + h, "lower": base + h - 1, "upper": base + h + 1}
+            for h in range(1, n + 1)]
+
+def summary(generated="2024-01-01T00:00:00", base=100.0):
+    return {
+        "generated": generated,
+        "indicators": ["SP500", "VIX"],
+        "forecasts": {"SP500": {"sarima": {"order": [1, 1, 1], "points": points(base)},
+                                "var": {"order": 2, "points": points(base + 10)}},
+                      "VIX": {"sarima": {"order": [1, 1, 1], "points": points(20.0)}}},
+        "ml": {"SP500": {"mse": 1.5}},
+        "adf": {"SP500": {"pvalue": 0.4, "d": 1}},
+        "granger": [{"cause": "VIX", "effect": "SP500", "pvalue": 0.01},
+                    {"cause": "SP500", "effect": "VIX", "pvalue": 0.3}],
+        "cognitive": {"VIX": {"score": 0.1, "label": "temporary/hype"}},
+    }
+
+@pytest.fixture
+def served(tmp_path):
+    path = write_summary(tmp_path / "analysis_summary.json", summary())
+    server = make_server(path, host="127.0.0.1", port=0, reload_interval=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    def get(route):
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}{route}", timeout=5) as r:
+                return r.status, json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+    yield path, server, get
+    server.shutdown()
+    server.server_close()
+
+def test_routes_answer_from_the_summary(served):
+    _, _, get = served
+    ref = summary()
+    assert get("/health")[1]["indicators"] == 2
+    listing = get("/indicators")[1]["indicators"]
+    assert listing[0] == {"indicator": "SP500", "models": ["sarima", "var"], "horizons": 3}
+    assert get("/forecast/SP500")[1]["models"] == ref["forecasts"]["SP500"]
+    one = get("/forecast/SP500/2")[1]
+    p = ref["forecasts"]["SP500"]["sarima"]["points"][1]
+    assert one["sarima"] == {k: p[k] for k in ("mean", "lower", "upper")} and one["date"] == p["date"]
+    stats = get("/stats/SP500")[1]
+    assert stats["adf"] == ref["adf"]["SP500"] and stats["ml"] == ref["ml"]["SP500"]
+    assert stats["granger_caused_by"] == [ref["granger"][0]]
+    assert get("/granger?cause=SP500")[1]["granger"] == [ref["granger"][1]]
+    assert get("/granger?effect=SP500")[1]["granger"] == [ref["granger"][0]]
+    assert len(get("/granger")[1]["granger"]) == 2
+
+def test_unknown_routes_are_404(served):
+    _, _, get = served
+    assert get("/forecast/NOPE")[0] == 404
+    assert get("/forecast/SP500/9")[0] == 404
+    assert get("/nothing")[0] == 404
+
+def test_new_summary_is_swapped_in(served):
+    path, server, get = served
+    write_summary(path, summary(generated="2024-02-01T00:00:00", base=200.0))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert get("/health")[1]["generated"] == "2024-02-01T00:00:00"
+    assert get("/forecast/SP500/1")[1]["sarima"]["mean"] == 201.0
+    assert server.store.reloads == 1
+    # unchanged mtime: no reload
+    get("/health")
+    assert server.store.reloads == 1
+
+def test_broken_summary_keeps_the_previous_index(served):
+    path, server, get = served
+    path.write_text("{not json")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert get("/health")[1]["generated"] == "2024-01-01T00:00:00"
+    assert server.store.reloads == 0
@@ -0,0 +1,65 @@
+"""
+run_stationarity against statsmodels' adfuller, and the ADF lag cache.
+"""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.stattools import adfuller
+from src.stationarity import run_stationarity, default_lag, CACHE_FILE
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def panel(T=120, seed=0):
+    rng = np.random.default_rng(seed)
+    e = rng.normal(size=(T, 3))
+    ar = np.zeros(T)
+    for t in range(1, T):
+        ar[t] = 0.3 * ar[t - 1] + e[t, 2]
+    index = pd.date_range("2010-01-31", periods=T, freq="M")
+    return pd.DataFrame({"walk": e[:, 0].cumsum(), "trend": e[:, 1].cumsum() + np.arange(T),
+                         "ar": ar}, index=index)
+
+def test_aic_mode_matches_adfuller(tmp_path):
+    df = panel()
+    out = run_stationarity(df, mode="aic", n_jobs=1, cache_dir=tmp_path)
+    for col in df.columns:
+        stat, pvalue, lag = adfuller(df[col], autolag="AIC")[:3]
+        assert out[col]["adf_stat"] == pytest.approx(stat, rel=1e-10)
+        assert out[col]["pvalue"] == pytest.approx(pvalue, rel=1e-10)
+        assert out[col]["lag"] == lag
+    assert out["ar"]["d"] == 0 and out["walk"]["d"] == 1
+
+def test_cached_lag_skips_the_search_with_the_same_result(tmp_path, capsys):
+    df = panel()
+    first = run_stationarity(df, mode="aic", n_jobs=1, cache_dir=tmp_path)
+    cache = json.loads((tmp_path / CACHE_FILE).read_text())
+    assert set(cache) == set(df.columns)
+    capsys.readouterr()
+    again = run_stationarity(df, mode="aic", n_jobs=1, cache_dir=tmp_path)
+    assert "0 lag searches" in capsys.readouterr().out
+    for col in df.columns:
+        assert again[col]["adf_stat"] == pytest.approx(first[col]["adf_stat"], rel=1e-10)
+        assert again[col]["lag"] == first[col]["lag"]
+
+def test_changed_series_is_searched_again(tmp_path, capsys):
+    df = panel()
+    run_stationarity(df, mode="aic", n_jobs=1, cache_dir=tmp_path)
+    df.iloc[-1, 0] += 1.0
+    capsys.readouterr()
+    out = run_stationarity(df, mode="aic", n_jobs=1, cache_dir=tmp_path)
+    assert "1 lag searches" in capsys.readouterr().out
+    assert out["walk"]["adf_stat"] == pytest.approx(adfuller(df["walk"], autolag="AIC")[0], rel=1e-10)
+
+def test_fixed_mode_uses_the_rule_of_thumb_lag():
+    df = panel()
+    out = run_stationarity(df, mode="fixed", n_jobs=1, cache_dir=False)
+    lag = default_lag(len(df))
+    for col in df.columns:
+        assert out[col]["lag"] == lag
+        assert out[col]["adf_stat"] == pytest.approx(adfuller(df[col], maxlag=lag, autolag=None)[0], rel=1e-10)
+
+def test_too_short_series_has_no_result():
+    df = panel(T=8)
+    out = run_stationarity(df, n_jobs=1, cache_dir=False)
+    assert all(out[c]["pvalue"] is None and out[c]["d"] is None for c in df.columns)
@@ -0,0 +1,79 @@
+"""
+Panel VAR (src/var_model.py) against statsmodels' VAR on the same data.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.api import VAR as SMVAR
+from src import features
+from src.var_model import select_order, fit_var, forecast_var, impulse_responses, run_var, max_feasible_lag
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+def simulate(T=120, seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.array([[0.5, 0.2, 0.0], [0.1, 0.4, 0.1], [0.0, -0.2, 0.3]])
+    y = np.zeros((T, 3))
+    for t in range(1, T):
+        y[t] = 0.1 + A @ y[t - 1] + rng.normal(size=3)
+    return y
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    features.clear_memo()
+
+@pytest.mark.parametrize("difference", [False, True])
+def test_order_criteria_match_statsmodels(difference):
+    values = simulate().cumsum(axis=0) if difference else simulate()
+    p, criteria = select_order(values, maxlags=4, ic="aic", difference=difference)
+    ref = SMVAR(np.diff(values, axis=0) if difference else values).select_order(4, trend="c")
+    for q in range(1, 5):
+        for ic in ("aic", "bic", "hqic"):
+            assert criteria[q][ic] == pytest.approx(ref.ics[ic][q], rel=1e-9)
+    assert p == ref.selected_orders["aic"]
+
+@pytest.mark.parametrize("difference", [False, True])
+def test_fit_forecast_and_irf_match_statsmodels(difference):
+    values = simulate().cumsum(axis=0) if difference else simulate()
+    modelled = np.diff(values, axis=0) if difference else values
+    ref = SMVAR(modelled).fit(2, trend="c")
+    intercept, coefs, sigma, nobs = fit_var(values, 2, difference=difference)
+    np.testing.assert_allclose(intercept, ref.intercept, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(coefs, ref.coefs, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(sigma, ref.sigma_u, rtol=1e-9)
+    assert nobs == ref.nobs
+
+    point, lower, upper = forecast_var(values, intercept, coefs, sigma, 5, difference=difference, alpha=0.05)
+    mean, lo, hi = ref.forecast_interval(modelled[-2:], 5, alpha=0.05)
+    irf = impulse_responses(coefs, sigma, 10, difference=difference)
+    ref_irf = ref.irf(10)
+    if difference:
+        np.testing.assert_allclose(point, values[-1] + np.cumsum(mean, axis=0), rtol=1e-9)
+        np.testing.assert_allclose(irf, ref_irf.orth_cum_effects, rtol=1e-8, atol=1e-12)
+    else:
+        np.testing.assert_allclose(point, mean, rtol=1e-9)
+        np.testing.assert_allclose(lower, lo, rtol=1e-9)
+        np.testing.assert_allclose(upper, hi, rtol=1e-9)
+        np.testing.assert_allclose(irf, ref_irf.orth_irfs, rtol=1e-8, atol=1e-12)
+
+def test_run_var_on_a_panel(tmp_path):
+    index = pd.date_range("2010-01-31", periods=120, freq="M")
+    df = pd.DataFrame(simulate(), index=index, columns=["a", "b", "c"])
+    res = run_var(df, 4, out_dir=tmp_path, maxlags=4, ic="bic", difference=False)
+    ref = SMVAR(df.to_numpy()).fit(maxlags=4, ic="bic", trend="c")
+    assert res.order == ref.k_ar
+    np.testing.assert_allclose(res.forecast.to_numpy(), ref.forecast(df.to_numpy()[-ref.k_ar:], 4), rtol=1e-9)
+    assert res.forecast.index[0] == pd.Timestamp("2020-01-31")
+    out = pd.read_csv(tmp_path / "var_forecast.csv")
+    assert len(out) == 4 * 3
+    assert pd.read_csv(tmp_path / "var_irf.csv").shape[0] == 3 * res.irf.shape[0]
+
+def test_infeasible_panels_raise():
+    assert max_feasible_lag(3, 12, 6) == 2
+    with pytest.raises(ValueError):
+        select_order(simulate(T=4), maxlags=4)
+    index = pd.date_range("2010-01-31", periods=60, freq="M")
+    df = pd.DataFrame(simulate(T=60), index=index, columns=["a", "b", "c"])
+    df["c"] = 1.0
+    with pytest.raises(ValueError, match="constant"):
+        run_var(df, 3)
@@ -0,0 +1,64 @@
+"""
+Raw-data cache in fetch_yahoo_batch, against a local stand-in for yf.download.
+"""
+import numpy as np
+import pandas as pd
+from src.data_collection import fetch_yahoo_batch
+from src.raw_cache import read_cached
+
+class FakeDownload:
+    """
+    Shaped like yf.download(group_by="column"): (field, ticker) columns over business days in [start, end).
+    Windows starting in `fail_from` or later come back empty, as yfinance reports failed tickers.
+    """
+    def __init__(self, fail_from=None):
+        self.calls = []
+        self.fail_from = pd.Timestamp(fail_from) if fail_from else None
+
+    def __call__(self, tickers, start=None, end=None, **kwargs):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        self.calls.append((list(tickers), start, end))
+        if self.fail_from is not None and start >= self.fail_from:
+            return pd.DataFrame()
+        index = pd.bdate_range(start, end - pd.Timedelta(days=1))
+        cols = pd.MultiIndex.from_product([["Close"], list(tickers)])
+        values = np.arange(len(index), dtype=float)[:, None] + np.arange(len(tickers))
+        return pd.DataFrame(values, index=index, columns=cols)
+
+def test_cold_fill_uses_one_batched_call(tmp_path):
+    fake = FakeDownload()
+    df = fetch_yahoo_batch(["^AAA", "BBB"], "2015-01-01", "2017-12-31", cache_dir=tmp_path, downloader=fake)
+    assert len(fake.calls) == 1 and fake.calls[0][0] == ["^AAA", "BBB"]
+    assert list(df.columns) == ["^AAA", "BBB"]
+    s, meta = read_cached(tmp_path, "^AAA")
+    assert (meta["start"], meta["end"]) == ("2015-01-01", "2017-12-31")
+    assert s.index.min() >= pd.Timestamp("2015-01-01")
+
+    # everything is on disk now: a repeat run makes no request
+    again = fetch_yahoo_batch(["^AAA", "BBB"], "2015-01-01", "2017-12-31", cache_dir=tmp_path, downloader=fake)
+    assert len(fake.calls) == 1
+    pd.testing.assert_frame_equal(again, df, check_freq=False)
+
+def test_extended_end_fetches_only_the_tail(tmp_path):
+    fake = FakeDownload()
+    fetch_yahoo_batch(["AAA"], "2015-01-01", "2017-12-31", cache_dir=tmp_path, downloader=fake)
+    df = fetch_yahoo_batch(["AAA"], "2015-01-01", "2019-12-31", cache_dir=tmp_path, downloader=fake)
+    assert len(fake.calls) == 2
+    _, start, end = fake.calls[1]
+    assert (start, end) == (pd.Timestamp("2017-12-31"), pd.Timestamp("2019-12-31"))
+    assert df.index.min() == pd.Timestamp("2015-01-31") and df.index.max() == pd.Timestamp("2019-12-31")
+    assert read_cached(tmp_path, "AAA")[1]["end"] == "2019-12-31"
+
+def test_failed_window_is_not_marked_covered(tmp_path):
+    fetch_yahoo_batch(["AAA"], "2015-01-01", "2017-12-31", cache_dir=tmp_path, downloader=FakeDownload())
+    failing = FakeDownload(fail_from="2017-12-31")
+    df = fetch_yahoo_batch(["AAA"], "2015-01-01", "2019-12-31", cache_dir=tmp_path, downloader=failing)
+    assert df.index.max() == pd.Timestamp("2017-12-31")
+    assert read_cached(tmp_path, "AAA")[1]["end"] == "2017-12-31"
+
+    # the next run asks for the same tail again and fills it
+    fake = FakeDownload()
+    df = fetch_yahoo_batch(["AAA"], "2015-01-01", "2019-12-31", cache_dir=tmp_path, downloader=fake)
+    assert [(c[1], c[2]) for c in fake.calls] == [(pd.Timestamp("2017-12-31"), pd.Timestamp("2019-12-31"))]
+    assert df.index.max() == pd.Timestamp("2019-12-31")
+    assert read_cached(tmp_path, "AAA")[1]["end"] == "2019-12-31"